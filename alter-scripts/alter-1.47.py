@@ -0,0 +1,44 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def create_leaderboard_snapshot():
+    execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_snapshot (
+            id           VARCHAR(36) NOT NULL PRIMARY KEY,
+            board        VARCHAR(50) NOT NULL,
+            period       VARCHAR(7)  NOT NULL,
+            `rows`       JSON        NOT NULL,
+            response     JSON        NOT NULL,
+            frozen       BOOLEAN     NOT NULL DEFAULT FALSE,
+            watermark    DATETIME    NULL,
+            rebuilt_at   DATETIME    NOT NULL,
+            refreshed_at DATETIME    NOT NULL,
+            created_at   DATETIME    NOT NULL,
+            CONSTRAINT leaderboard_snapshot_board_period UNIQUE (board, period)
+        )
+    """)
+
+
+def create_index(table, name, columns):
+    if not execute(f"""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = '{table}' AND index_name = '{name}'
+    """):
+        execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+if __name__ == '__main__':
+    create_leaderboard_snapshot()
+    create_index('karma_activity_log', 'karma_activity_log_updated_at_idx', 'updated_at')
+    create_index('wallet', 'wallet_updated_at_idx', 'updated_at')
+    execute("UPDATE system_setting SET value = '1.47', updated_at = now() WHERE `key` = 'db.version';")
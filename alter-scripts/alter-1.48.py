@@ -0,0 +1,33 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def create_discord_webhook_outbox():
+    execute("""
+        CREATE TABLE IF NOT EXISTS discord_webhook_outbox (
+            id              VARCHAR(36)   NOT NULL PRIMARY KEY,
+            content         VARCHAR(2000) NOT NULL,
+            status          VARCHAR(20)   NOT NULL DEFAULT 'pending',
+            attempts        INT           NOT NULL DEFAULT 0,
+            next_attempt_at DATETIME      NOT NULL,
+            locked_at       DATETIME      NULL,
+            last_error      VARCHAR(500)  NULL,
+            sent_at         DATETIME      NULL,
+            created_at      DATETIME      NOT NULL,
+            INDEX discord_webhook_outbox_status_next_attempt_idx (status, next_attempt_at)
+        )
+    """)
+
+
+if __name__ == '__main__':
+    create_discord_webhook_outbox()
+    execute("UPDATE system_setting SET value = '1.48', updated_at = now() WHERE `key` = 'db.version';")
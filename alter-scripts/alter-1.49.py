@@ -0,0 +1,92 @@
+import os
+import sys
+
+import django
+import pymysql
+
+from connection import db_config, execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+# rollup dimension -> url_shortener_tracker column, 'clicks' counts every click
+dimensions = {
+    'clicks': None,
+    'browser': 'browser',
+    'platform': 'operating_system',
+    'device': 'device_type',
+    'source': 'referrer',
+    'country': 'country',
+    'city': 'city',
+    'region': 'region',
+    'ip_address': 'ip_address',
+}
+
+
+def dimension_value(column, row=''):
+    return "''" if column is None else f"COALESCE({row}{column}, '')"
+
+
+def create_click_rollup():
+    execute("""
+        CREATE TABLE IF NOT EXISTS url_shortener_click_rollup (
+            id               BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            url_shortener_id VARCHAR(36)  NOT NULL,
+            bucket           DATETIME     NOT NULL,
+            dimension        VARCHAR(20)  NOT NULL,
+            dimension_value  VARCHAR(255) NOT NULL,
+            clicks           INT          NOT NULL DEFAULT 0,
+            CONSTRAINT url_shortener_click_rollup_bucket
+                UNIQUE (url_shortener_id, bucket, dimension, dimension_value),
+            CONSTRAINT fk_url_shortener_click_rollup_url
+                FOREIGN KEY (url_shortener_id) REFERENCES url_shortener (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def backfill_click_rollup():
+    # the trigger already runs, so clicks landing meanwhile may have created rows: the
+    # backfill overwrites them in one transaction instead of failing on the unique key
+    with pymysql.connect(**db_config) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM url_shortener_click_rollup")
+            for dimension, column in dimensions.items():
+                cursor.execute(f"""
+                    INSERT INTO url_shortener_click_rollup (url_shortener_id, bucket, dimension, dimension_value, clicks)
+                    SELECT url_shortener_id, DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00'), '{dimension}',
+                           {dimension_value(column)}, COUNT(*)
+                    FROM url_shortener_tracker
+                    WHERE url_shortener_id IS NOT NULL
+                    GROUP BY url_shortener_id, DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00'), {dimension_value(column)}
+                    ON DUPLICATE KEY UPDATE clicks = VALUES(clicks)
+                """)
+        connection.commit()
+
+
+def create_click_rollup_trigger():
+    rows = ",\n".join(
+        f"(NEW.url_shortener_id, click_bucket, '{dimension}', {dimension_value(column, 'NEW.')}, 1)"
+        for dimension, column in dimensions.items()
+    )
+    execute("DROP TRIGGER IF EXISTS url_shortener_tracker_click_rollup")
+    execute(f"""
+        CREATE TRIGGER url_shortener_tracker_click_rollup AFTER INSERT ON url_shortener_tracker
+        FOR EACH ROW
+        BEGIN
+            DECLARE click_bucket DATETIME DEFAULT DATE_FORMAT(NEW.created_at, '%Y-%m-%d %H:00:00');
+            IF NEW.url_shortener_id IS NOT NULL THEN
+                INSERT INTO url_shortener_click_rollup (url_shortener_id, bucket, dimension, dimension_value, clicks)
+                VALUES {rows}
+                ON DUPLICATE KEY UPDATE clicks = clicks + 1;
+            END IF;
+        END
+    """)
+
+
+if __name__ == '__main__':
+    create_click_rollup()
+    create_click_rollup_trigger()
+    backfill_click_rollup()
+    execute("UPDATE system_setting SET value = '1.49', updated_at = now() WHERE `key` = 'db.version';")
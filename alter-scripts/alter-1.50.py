@@ -0,0 +1,57 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def create_import_job():
+    execute("""
+        CREATE TABLE IF NOT EXISTS import_job (
+            id             VARCHAR(36)  NOT NULL PRIMARY KEY,
+            importer       VARCHAR(200) NOT NULL,
+            file           VARCHAR(200) NOT NULL,
+            status         VARCHAR(20)  NOT NULL DEFAULT 'pending',
+            total_rows     INT          NOT NULL DEFAULT 0,
+            processed_rows INT          NOT NULL DEFAULT 0,
+            success_count  INT          NOT NULL DEFAULT 0,
+            failed_count   INT          NOT NULL DEFAULT 0,
+            error          VARCHAR(500) NULL,
+            locked_at      DATETIME     NULL,
+            started_at     DATETIME     NULL,
+            finished_at    DATETIME     NULL,
+            created_by     VARCHAR(36)  NOT NULL,
+            updated_at     DATETIME     NOT NULL,
+            created_at     DATETIME     NOT NULL,
+            INDEX import_job_status_created_at_idx (status, created_at),
+            CONSTRAINT fk_import_job_created_by
+                FOREIGN KEY (created_by) REFERENCES user (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def create_import_job_error():
+    execute("""
+        CREATE TABLE IF NOT EXISTS import_job_error (
+            id           BIGINT        NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            job_id       VARCHAR(36)   NOT NULL,
+            `row_number` INT           NOT NULL,
+            `row`        JSON          NOT NULL,
+            error        VARCHAR(1000) NOT NULL,
+            INDEX import_job_error_job_row_idx (job_id, `row_number`),
+            CONSTRAINT fk_import_job_error_job
+                FOREIGN KEY (job_id) REFERENCES import_job (id) ON DELETE CASCADE
+        )
+    """)
+
+
+if __name__ == '__main__':
+    create_import_job()
+    create_import_job_error()
+    execute("UPDATE system_setting SET value = '1.50', updated_at = now() WHERE `key` = 'db.version';")
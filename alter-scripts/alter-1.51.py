@@ -0,0 +1,130 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def circle_karma(circle):
+    # approved karma of the accepted members of `circle` on tasks of the circle's interest group
+    return f"""
+        SELECT COALESCE(SUM(kal.karma), 0)
+        FROM karma_activity_log kal
+        JOIN task_list t ON t.id = kal.task_id
+        JOIN user_circle_link ucl ON ucl.user_id = kal.user_id
+        WHERE ucl.circle_id = {circle}.id AND ucl.accepted = 1
+          AND kal.appraiser_approved = 1 AND t.ig_id = {circle}.ig_id
+    """
+
+
+def log_karma_delta(row, sign):
+    # adds/removes one karma_activity_log row from the circles its user is an accepted member of
+    return f"""
+        IF {row}.appraiser_approved = 1 THEN
+            UPDATE learning_circle_karma lck
+            JOIN user_circle_link ucl ON ucl.circle_id = lck.circle_id
+            JOIN task_list t ON t.ig_id = lck.ig_id
+            SET lck.karma = lck.karma {sign} {row}.karma, lck.updated_at = now()
+            WHERE ucl.user_id = {row}.user_id AND ucl.accepted = 1 AND t.id = {row}.task_id;
+        END IF;
+    """
+
+
+def create_learning_circle_karma():
+    execute("""
+        CREATE TABLE IF NOT EXISTS learning_circle_karma (
+            circle_id  VARCHAR(36) NOT NULL PRIMARY KEY,
+            ig_id      VARCHAR(36) NOT NULL,
+            karma      INT         NOT NULL DEFAULT 0,
+            updated_at DATETIME    NOT NULL,
+            INDEX learning_circle_karma_ig_karma_idx (ig_id, karma),
+            CONSTRAINT fk_learning_circle_karma_circle
+                FOREIGN KEY (circle_id) REFERENCES learning_circle (id) ON DELETE CASCADE,
+            CONSTRAINT fk_learning_circle_karma_ig
+                FOREIGN KEY (ig_id) REFERENCES interest_group (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def create_refresh_procedure():
+    execute("DROP PROCEDURE IF EXISTS refresh_learning_circle_karma")
+    execute(f"""
+        CREATE PROCEDURE refresh_learning_circle_karma(IN refresh_circle_id VARCHAR(36))
+        BEGIN
+            UPDATE learning_circle_karma lck
+            JOIN learning_circle lc ON lc.id = lck.circle_id
+            SET lck.ig_id = lc.ig_id, lck.karma = ({circle_karma('lc')}), lck.updated_at = now()
+            WHERE lck.circle_id = refresh_circle_id;
+        END
+    """)
+
+
+def create_triggers():
+    triggers = {
+        'karma_activity_log_circle_karma_insert': ('AFTER INSERT ON karma_activity_log', log_karma_delta('NEW', '+')),
+        'karma_activity_log_circle_karma_update': (
+            'AFTER UPDATE ON karma_activity_log',
+            log_karma_delta('OLD', '-') + log_karma_delta('NEW', '+'),
+        ),
+        'karma_activity_log_circle_karma_delete': ('AFTER DELETE ON karma_activity_log', log_karma_delta('OLD', '-')),
+        'user_circle_link_circle_karma_insert': (
+            'AFTER INSERT ON user_circle_link',
+            "IF NEW.accepted = 1 THEN CALL refresh_learning_circle_karma(NEW.circle_id); END IF;",
+        ),
+        'user_circle_link_circle_karma_update': (
+            'AFTER UPDATE ON user_circle_link',
+            """
+            IF NOT (OLD.accepted <=> NEW.accepted) OR OLD.user_id <> NEW.user_id OR OLD.circle_id <> NEW.circle_id THEN
+                CALL refresh_learning_circle_karma(OLD.circle_id);
+                IF OLD.circle_id <> NEW.circle_id THEN
+                    CALL refresh_learning_circle_karma(NEW.circle_id);
+                END IF;
+            END IF;
+            """,
+        ),
+        'user_circle_link_circle_karma_delete': (
+            'AFTER DELETE ON user_circle_link',
+            "IF OLD.accepted = 1 THEN CALL refresh_learning_circle_karma(OLD.circle_id); END IF;",
+        ),
+        'learning_circle_circle_karma_insert': (
+            'AFTER INSERT ON learning_circle',
+            "INSERT IGNORE INTO learning_circle_karma (circle_id, ig_id, karma, updated_at) "
+            "VALUES (NEW.id, NEW.ig_id, 0, now());",
+        ),
+        'learning_circle_circle_karma_update': (
+            'AFTER UPDATE ON learning_circle',
+            "IF OLD.ig_id <> NEW.ig_id THEN CALL refresh_learning_circle_karma(NEW.id); END IF;",
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def backfill_learning_circle_karma():
+    execute(f"""
+        INSERT INTO learning_circle_karma (circle_id, ig_id, karma, updated_at)
+        SELECT lc.id, lc.ig_id, ({circle_karma('lc')}), now()
+        FROM learning_circle lc
+        ON DUPLICATE KEY UPDATE ig_id = VALUES(ig_id), karma = VALUES(karma), updated_at = now()
+    """)
+
+
+if __name__ == '__main__':
+    create_learning_circle_karma()
+    create_refresh_procedure()
+    create_triggers()
+    backfill_learning_circle_karma()
+    execute("UPDATE system_setting SET value = '1.51', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def add_voucher_mail_status():
+    if execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'voucher_log' AND column_name = 'mail_status'
+    """):
+        return
+
+    execute("""
+        ALTER TABLE voucher_log
+            ADD COLUMN mail_status VARCHAR(10)  NOT NULL DEFAULT 'pending',
+            ADD COLUMN mail_error  VARCHAR(500) NULL,
+            ADD COLUMN mailed_at   DATETIME     NULL,
+            ADD INDEX voucher_log_mail_status_idx (mail_status)
+    """)
+    # vouchers issued before delivery was tracked were mailed while they were created
+    execute("UPDATE voucher_log SET mail_status = 'sent'")
+
+
+if __name__ == '__main__':
+    add_voucher_mail_status()
+    execute("UPDATE system_setting SET value = '1.52', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,113 @@
+import os
+import sys
+
+import django
+import pymysql
+
+from connection import db_config, execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def log_karma_delta(row, sign):
+    # adds/removes one karma_activity_log row from its user's karma on the task's interest group
+    return f"""
+        IF {row}.appraiser_approved = 1 THEN
+            INSERT INTO user_ig_karma (user_id, ig_id, karma, updated_at)
+            SELECT {row}.user_id, t.ig_id, {sign}{row}.karma, now()
+            FROM task_list t
+            WHERE t.id = {row}.task_id AND t.ig_id IS NOT NULL
+            ON DUPLICATE KEY UPDATE karma = karma + VALUES(karma), updated_at = now();
+        END IF;
+    """
+
+
+def task_karma_delta(ig, sign):
+    # adds/removes the approved karma of a task from its users' karma on `ig`
+    return f"""
+        INSERT INTO user_ig_karma (user_id, ig_id, karma, updated_at)
+        SELECT kal.user_id, {ig}, {sign}SUM(kal.karma), now()
+        FROM karma_activity_log kal
+        WHERE kal.task_id = NEW.id AND kal.appraiser_approved = 1
+        GROUP BY kal.user_id
+        ON DUPLICATE KEY UPDATE karma = karma + VALUES(karma), updated_at = now();
+    """
+
+
+def create_user_ig_karma():
+    execute("""
+        CREATE TABLE IF NOT EXISTS user_ig_karma (
+            id         BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            user_id    VARCHAR(36) NOT NULL,
+            ig_id      VARCHAR(36) NOT NULL,
+            karma      INT         NOT NULL DEFAULT 0,
+            updated_at DATETIME    NOT NULL,
+            CONSTRAINT user_ig_karma_user_ig UNIQUE (user_id, ig_id),
+            INDEX user_ig_karma_ig_karma_idx (ig_id, karma),
+            CONSTRAINT fk_user_ig_karma_user
+                FOREIGN KEY (user_id) REFERENCES user (id) ON DELETE CASCADE,
+            CONSTRAINT fk_user_ig_karma_ig
+                FOREIGN KEY (ig_id) REFERENCES interest_group (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def create_triggers():
+    triggers = {
+        'karma_activity_log_ig_karma_insert': ('AFTER INSERT ON karma_activity_log', log_karma_delta('NEW', '')),
+        'karma_activity_log_ig_karma_update': (
+            'AFTER UPDATE ON karma_activity_log',
+            log_karma_delta('OLD', '-') + log_karma_delta('NEW', ''),
+        ),
+        'karma_activity_log_ig_karma_delete': ('AFTER DELETE ON karma_activity_log', log_karma_delta('OLD', '-')),
+        'task_list_ig_karma_update': (
+            'AFTER UPDATE ON task_list',
+            f"""
+            IF NOT (OLD.ig_id <=> NEW.ig_id) THEN
+                IF OLD.ig_id IS NOT NULL THEN
+                    {task_karma_delta('OLD.ig_id', '-')}
+                END IF;
+                IF NEW.ig_id IS NOT NULL THEN
+                    {task_karma_delta('NEW.ig_id', '')}
+                END IF;
+            END IF;
+            """,
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def backfill_user_ig_karma():
+    # the triggers already run, so karma approved meanwhile may have created rows: the
+    # backfill overwrites them in one transaction instead of failing on the unique key
+    with pymysql.connect(**db_config) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM user_ig_karma")
+            cursor.execute("""
+                INSERT INTO user_ig_karma (user_id, ig_id, karma, updated_at)
+                SELECT kal.user_id, t.ig_id, SUM(kal.karma), now()
+                FROM karma_activity_log kal
+                JOIN task_list t ON t.id = kal.task_id
+                WHERE kal.appraiser_approved = 1 AND t.ig_id IS NOT NULL
+                GROUP BY kal.user_id, t.ig_id
+                ON DUPLICATE KEY UPDATE karma = VALUES(karma), updated_at = now()
+            """)
+        connection.commit()
+
+
+if __name__ == '__main__':
+    create_user_ig_karma()
+    create_triggers()
+    backfill_user_ig_karma()
+    execute("UPDATE system_setting SET value = '1.53', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import django
+import pymysql
+
+from connection import db_config, execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+from django.core.management import call_command
+
+
+def create_search_document():
+    # the ngram parser drops every token containing a stopword ("a", "i", ...), so the
+    # index is created with stopwords disabled, which only applies to this session
+    with pymysql.connect(**db_config, autocommit=True) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS search_document (
+                    id         BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                    entity     VARCHAR(50) NOT NULL,
+                    entity_id  VARCHAR(36) NOT NULL,
+                    document   TEXT        NOT NULL,
+                    updated_at DATETIME    NOT NULL,
+                    CONSTRAINT search_document_entity_entity_id UNIQUE (entity, entity_id),
+                    FULLTEXT INDEX search_document_document_idx (document) WITH PARSER ngram
+                )
+            """)
+
+
+if __name__ == '__main__':
+    create_search_document()
+    call_command('rebuild_search_index')
+    execute("UPDATE system_setting SET value = '1.54', updated_at = now() WHERE `key` = 'db.version';")
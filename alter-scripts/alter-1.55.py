@@ -0,0 +1,83 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def bump(user):
+    # REPLACE deletes and re-inserts the row, moving the user to the end of the feed
+    return f"REPLACE INTO karma_change_feed (user_id, updated_at) VALUES ({user}, UTC_TIMESTAMP());"
+
+
+def create_karma_change_feed():
+    execute("""
+        CREATE TABLE IF NOT EXISTS karma_change_feed (
+            seq        BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            user_id    VARCHAR(36) NOT NULL,
+            updated_at DATETIME    NOT NULL,
+            CONSTRAINT karma_change_feed_user UNIQUE (user_id),
+            INDEX karma_change_feed_updated_at_idx (updated_at),
+            CONSTRAINT fk_karma_change_feed_user
+                FOREIGN KEY (user_id) REFERENCES user (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def create_triggers():
+    triggers = {
+        'user_ig_karma_feed_insert': ('AFTER INSERT ON user_ig_karma', bump('NEW.user_id')),
+        'user_ig_karma_feed_update': (
+            'AFTER UPDATE ON user_ig_karma',
+            f"IF NOT (OLD.karma <=> NEW.karma) THEN {bump('NEW.user_id')} END IF;",
+        ),
+        'user_ig_karma_feed_delete': ('AFTER DELETE ON user_ig_karma', bump('OLD.user_id')),
+        'wallet_feed_update': (
+            'AFTER UPDATE ON wallet',
+            f"IF NOT (OLD.karma <=> NEW.karma) THEN {bump('NEW.user_id')} END IF;",
+        ),
+        'user_ig_link_feed_insert': ('AFTER INSERT ON user_ig_link', bump('NEW.user_id')),
+        'user_ig_link_feed_delete': ('AFTER DELETE ON user_ig_link', bump('OLD.user_id')),
+        'integration_authorization_feed_insert': ('AFTER INSERT ON integration_authorization', bump('NEW.user_id')),
+        'integration_authorization_feed_update': (
+            'AFTER UPDATE ON integration_authorization',
+            f"""
+            IF NOT (OLD.verified <=> NEW.verified) OR NOT (OLD.integration_value <=> NEW.integration_value) THEN
+                {bump('NEW.user_id')}
+            END IF;
+            """,
+        ),
+        'user_feed_update': (
+            'AFTER UPDATE ON user',
+            f"IF NOT (OLD.email <=> NEW.email) OR NOT (OLD.muid <=> NEW.muid) THEN {bump('NEW.id')} END IF;",
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def backfill_karma_change_feed():
+    execute("""
+        INSERT IGNORE INTO karma_change_feed (user_id, updated_at)
+        SELECT id, UTC_TIMESTAMP() FROM user ORDER BY created_at
+    """)
+
+
+if __name__ == '__main__':
+    create_karma_change_feed()
+    create_triggers()
+    backfill_karma_change_feed()
+    execute("UPDATE system_setting SET value = '1.55', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,146 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def event_totals(user_filter):
+    # approved karma and latest approved log of users on the tasks of every event
+    return f"""
+        SELECT t.event, kal.user_id, SUM(kal.karma), MAX(kal.created_at), UTC_TIMESTAMP()
+        FROM karma_activity_log kal
+        JOIN task_list t ON t.id = kal.task_id
+        WHERE {user_filter} AND kal.appraiser_approved = 1 AND t.event IS NOT NULL AND t.event <> ''
+        GROUP BY t.event, kal.user_id
+    """
+
+
+def create_event_leaderboard():
+    execute("""
+        CREATE TABLE IF NOT EXISTS event_leaderboard (
+            id            BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            event         VARCHAR(50) NOT NULL,
+            user_id       VARCHAR(36) NOT NULL,
+            karma         INT         NOT NULL DEFAULT 0,
+            last_karma_at DATETIME    NULL,
+            qualified     BOOLEAN     NOT NULL DEFAULT FALSE,
+            event_rank    INT         NULL,
+            updated_at    DATETIME    NOT NULL,
+            CONSTRAINT event_leaderboard_event_user UNIQUE (event, user_id),
+            INDEX event_leaderboard_event_rank_idx (event, event_rank),
+            INDEX event_leaderboard_event_updated_at_idx (event, updated_at),
+            CONSTRAINT fk_event_leaderboard_user
+                FOREIGN KEY (user_id) REFERENCES user (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def create_refresh_procedures():
+    execute("DROP PROCEDURE IF EXISTS refresh_event_leaderboard")
+    execute(f"""
+        CREATE PROCEDURE refresh_event_leaderboard(IN refresh_user_id VARCHAR(36))
+        BEGIN
+            INSERT INTO event_leaderboard (event, user_id, karma, last_karma_at, updated_at)
+            {event_totals('kal.user_id = refresh_user_id')}
+            ON DUPLICATE KEY UPDATE
+                karma = VALUES(karma), last_karma_at = VALUES(last_karma_at), updated_at = VALUES(updated_at);
+
+            DELETE el FROM event_leaderboard el
+            WHERE el.user_id = refresh_user_id AND NOT EXISTS (
+                SELECT 1 FROM karma_activity_log kal
+                JOIN task_list t ON t.id = kal.task_id
+                WHERE kal.user_id = refresh_user_id AND kal.appraiser_approved = 1 AND t.event = el.event
+            );
+        END
+    """)
+
+    execute("DROP PROCEDURE IF EXISTS refresh_event_leaderboard_task")
+    execute("""
+        CREATE PROCEDURE refresh_event_leaderboard_task(IN refresh_task_id VARCHAR(36))
+        BEGIN
+            DECLARE done INT DEFAULT 0;
+            DECLARE task_user_id VARCHAR(36);
+            DECLARE task_users CURSOR FOR
+                SELECT DISTINCT user_id FROM karma_activity_log
+                WHERE task_id = refresh_task_id AND appraiser_approved = 1 AND user_id IS NOT NULL;
+            DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+            OPEN task_users;
+            task_users_loop: LOOP
+                FETCH task_users INTO task_user_id;
+                IF done THEN
+                    LEAVE task_users_loop;
+                END IF;
+                CALL refresh_event_leaderboard(task_user_id);
+            END LOOP;
+            CLOSE task_users;
+        END
+    """)
+
+
+def create_triggers():
+    triggers = {
+        'karma_activity_log_event_leaderboard_insert': (
+            'AFTER INSERT ON karma_activity_log',
+            "IF NEW.appraiser_approved = 1 AND NEW.user_id IS NOT NULL THEN "
+            "CALL refresh_event_leaderboard(NEW.user_id); END IF;",
+        ),
+        'karma_activity_log_event_leaderboard_update': (
+            'AFTER UPDATE ON karma_activity_log',
+            """
+            IF (OLD.appraiser_approved = 1 OR NEW.appraiser_approved = 1) AND (
+                NOT (OLD.appraiser_approved <=> NEW.appraiser_approved) OR NOT (OLD.karma <=> NEW.karma)
+                OR NOT (OLD.task_id <=> NEW.task_id) OR NOT (OLD.user_id <=> NEW.user_id)
+                OR NOT (OLD.created_at <=> NEW.created_at)
+            ) THEN
+                IF NEW.user_id IS NOT NULL THEN
+                    CALL refresh_event_leaderboard(NEW.user_id);
+                END IF;
+                IF OLD.user_id IS NOT NULL AND NOT (OLD.user_id <=> NEW.user_id) THEN
+                    CALL refresh_event_leaderboard(OLD.user_id);
+                END IF;
+            END IF;
+            """,
+        ),
+        'karma_activity_log_event_leaderboard_delete': (
+            'AFTER DELETE ON karma_activity_log',
+            "IF OLD.appraiser_approved = 1 AND OLD.user_id IS NOT NULL THEN "
+            "CALL refresh_event_leaderboard(OLD.user_id); END IF;",
+        ),
+        'task_list_event_leaderboard_update': (
+            'AFTER UPDATE ON task_list',
+            "IF NOT (OLD.event <=> NEW.event) THEN CALL refresh_event_leaderboard_task(NEW.id); END IF;",
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def backfill_event_leaderboard():
+    execute("DELETE FROM event_leaderboard")
+    execute(f"""
+        INSERT INTO event_leaderboard (event, user_id, karma, last_karma_at, updated_at)
+        {event_totals('kal.user_id IS NOT NULL')}
+    """)
+
+
+if __name__ == '__main__':
+    create_event_leaderboard()
+    create_refresh_procedures()
+    create_triggers()
+    backfill_event_leaderboard()
+    execute("UPDATE system_setting SET value = '1.56', updated_at = now() WHERE `key` = 'db.version';")
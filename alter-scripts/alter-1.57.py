@@ -0,0 +1,40 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def create_triggers():
+    # karma written outside Django (the Discord bot) moves the wallet watermark
+    # the karma rank index and the org karma rollup refresh from
+    triggers = {
+        'wallet_touch_updated_at': (
+            'BEFORE UPDATE ON wallet',
+            """
+            IF NOT (OLD.karma <=> NEW.karma) AND OLD.updated_at <=> NEW.updated_at THEN
+                SET NEW.updated_at = UTC_TIMESTAMP();
+            END IF;
+            """,
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+if __name__ == '__main__':
+    create_triggers()
+    execute("UPDATE system_setting SET value = '1.57', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def add_outbox_sequence():
+    # webhook events are delivered in insertion order, which the uuid primary key does not keep
+    if not execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'discord_webhook_outbox' AND column_name = 'seq'
+    """):
+        execute("""
+            ALTER TABLE discord_webhook_outbox
+                ADD COLUMN seq BIGINT NOT NULL AUTO_INCREMENT UNIQUE AFTER id,
+                ADD INDEX discord_webhook_outbox_status_seq_idx (status, seq)
+        """)
+
+
+if __name__ == '__main__':
+    add_outbox_sequence()
+    execute("UPDATE system_setting SET value = '1.58', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,170 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+from django.core.management import call_command
+
+
+def mark(entity, entity_id):
+    return f"INSERT IGNORE INTO search_document_stale (entity, entity_id) VALUES ('{entity}', {entity_id});"
+
+
+def mark_rows(entity, entity_id, source):
+    return f"INSERT IGNORE INTO search_document_stale (entity, entity_id) SELECT '{entity}', {entity_id} {source};"
+
+
+def when_changed(columns, *statements):
+    changed = " OR ".join(f"NOT (OLD.{column} <=> NEW.{column})" for column in columns)
+    return f"IF {changed} THEN {' '.join(statements)} END IF;"
+
+
+def create_search_document_stale():
+    execute("""
+        CREATE TABLE IF NOT EXISTS search_document_stale (
+            id        BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            entity    VARCHAR(50) NOT NULL,
+            entity_id VARCHAR(36) NOT NULL,
+            CONSTRAINT search_document_stale_entity_entity_id UNIQUE (entity, entity_id)
+        )
+    """)
+
+
+def create_triggers():
+    # documents only need the values a row has now, a value left over from an old version
+    # only makes the row a candidate that the icontains filter drops, so deletes are not tracked
+    organizations = "FROM organization o JOIN district d ON d.id = o.district_id"
+    triggers = {
+        'search_user_insert': ('AFTER INSERT ON user', mark('user', 'NEW.id')),
+        'search_user_update': (
+            'AFTER UPDATE ON user',
+            when_changed(
+                ('muid', 'full_name', 'email', 'mobile'),
+                mark('user', 'NEW.id'),
+                mark_rows('user_role_link', 'id', "FROM user_role_link WHERE user_id = NEW.id"),
+            ) + when_changed(
+                ('full_name',),
+                mark_rows('role', 'id', "FROM role WHERE updated_by = NEW.id OR created_by = NEW.id"),
+                mark_rows('task', 'id', "FROM task_list WHERE updated_by = NEW.id OR created_by = NEW.id"),
+            ),
+        ),
+        'search_user_lvl_link_insert': ('AFTER INSERT ON user_lvl_link', mark('user', 'NEW.user_id')),
+        'search_user_lvl_link_update': (
+            'AFTER UPDATE ON user_lvl_link',
+            when_changed(('user_id', 'level_id'), mark('user', 'NEW.user_id')),
+        ),
+        'search_level_update': (
+            'AFTER UPDATE ON level',
+            when_changed(
+                ('name',),
+                mark_rows('user', 'user_id', "FROM user_lvl_link WHERE level_id = NEW.id"),
+                mark_rows('task', 'id', "FROM task_list WHERE level_id = NEW.id"),
+            ),
+        ),
+        'search_user_role_link_insert': ('AFTER INSERT ON user_role_link', mark('user_role_link', 'NEW.id')),
+        'search_user_role_link_update': (
+            'AFTER UPDATE ON user_role_link',
+            when_changed(('user_id', 'role_id'), mark('user_role_link', 'NEW.id')),
+        ),
+        'search_role_insert': ('AFTER INSERT ON role', mark('role', 'NEW.id')),
+        'search_role_update': (
+            'AFTER UPDATE ON role',
+            when_changed(('title', 'description', 'updated_by', 'created_by'), mark('role', 'NEW.id'))
+            + when_changed(
+                ('title',),
+                mark_rows('user_role_link', 'id', "FROM user_role_link WHERE role_id = NEW.id"),
+            ),
+        ),
+        'search_organization_insert': ('AFTER INSERT ON organization', mark('organization', 'NEW.id')),
+        'search_organization_update': (
+            'AFTER UPDATE ON organization',
+            when_changed(('title', 'code', 'affiliation_id', 'district_id'), mark('organization', 'NEW.id'))
+            + when_changed(
+                ('title',),
+                mark_rows('task', 'id', "FROM task_list WHERE org_id = NEW.id"),
+            ),
+        ),
+        'search_org_affiliation_update': (
+            'AFTER UPDATE ON org_affiliation',
+            when_changed(
+                ('title',),
+                mark_rows('organization', 'id', "FROM organization WHERE affiliation_id = NEW.id"),
+            ),
+        ),
+        'search_district_update': (
+            'AFTER UPDATE ON district',
+            when_changed(
+                ('name', 'zone_id'),
+                mark_rows('organization', 'id', "FROM organization WHERE district_id = NEW.id"),
+            ),
+        ),
+        'search_zone_update': (
+            'AFTER UPDATE ON zone',
+            when_changed(
+                ('name', 'state_id'),
+                mark_rows('organization', 'o.id', f"{organizations} WHERE d.zone_id = NEW.id"),
+            ),
+        ),
+        'search_state_update': (
+            'AFTER UPDATE ON state',
+            when_changed(
+                ('name', 'country_id'),
+                mark_rows(
+                    'organization',
+                    'o.id',
+                    f"{organizations} JOIN zone z ON z.id = d.zone_id WHERE z.state_id = NEW.id",
+                ),
+            ),
+        ),
+        'search_country_update': (
+            'AFTER UPDATE ON country',
+            when_changed(
+                ('name',),
+                mark_rows(
+                    'organization',
+                    'o.id',
+                    f"{organizations} JOIN zone z ON z.id = d.zone_id JOIN state s ON s.id = z.state_id "
+                    f"WHERE s.country_id = NEW.id",
+                ),
+            ),
+        ),
+        'search_task_list_insert': ('AFTER INSERT ON task_list', mark('task', 'NEW.id')),
+        # the document holds updated_at, so every update changes it
+        'search_task_list_update': ('AFTER UPDATE ON task_list', mark('task', 'NEW.id')),
+        'search_channel_update': (
+            'AFTER UPDATE ON channel',
+            when_changed(('name',), mark_rows('task', 'id', "FROM task_list WHERE channel_id = NEW.id")),
+        ),
+        'search_task_type_update': (
+            'AFTER UPDATE ON task_type',
+            when_changed(('title',), mark_rows('task', 'id', "FROM task_list WHERE type_id = NEW.id")),
+        ),
+        'search_interest_group_update': (
+            'AFTER UPDATE ON interest_group',
+            when_changed(('name',), mark_rows('task', 'id', "FROM task_list WHERE ig_id = NEW.id")),
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+if __name__ == '__main__':
+    create_search_document_stale()
+    create_triggers()
+    # documents written before the triggers may already be stale
+    call_command('rebuild_search_index')
+    execute("UPDATE system_setting SET value = '1.59', updated_at = now() WHERE `key` = 'db.version';")
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import django
+
+from connection import execute
+
+os.chdir('..')
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mulearnbackend.settings')
+django.setup()
+
+
+def bump(event):
+    return (
+        "INSERT INTO event_leaderboard_version (event, version) "
+        f"VALUES ({event}, 1) ON DUPLICATE KEY UPDATE version = version + 1;"
+    )
+
+
+def create_event_leaderboard_version():
+    execute("""
+        CREATE TABLE IF NOT EXISTS event_leaderboard_version (
+            event   VARCHAR(50) NOT NULL PRIMARY KEY,
+            version BIGINT      NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def create_triggers():
+    # the engine's own rank updates only touch qualified and event_rank, they do not count
+    triggers = {
+        'event_leaderboard_version_insert': ('AFTER INSERT ON event_leaderboard', bump('NEW.event')),
+        'event_leaderboard_version_update': (
+            'AFTER UPDATE ON event_leaderboard',
+            f"""
+            IF NOT (OLD.karma <=> NEW.karma) OR NOT (OLD.last_karma_at <=> NEW.last_karma_at)
+                OR NOT (OLD.user_id <=> NEW.user_id) THEN
+                {bump('NEW.event')}
+            END IF;
+            IF NOT (OLD.event <=> NEW.event) THEN
+                {bump('OLD.event')}
+                {bump('NEW.event')}
+            END IF;
+            """,
+        ),
+        'event_leaderboard_version_delete': ('AFTER DELETE ON event_leaderboard', bump('OLD.event')),
+    }
+    for name, (event, body) in triggers.items():
+        execute(f"DROP TRIGGER IF EXISTS {name}")
+        execute(f"""
+            CREATE TRIGGER {name} {event}
+            FOR EACH ROW
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def backfill_event_leaderboard_version():
+    execute("""
+        INSERT IGNORE INTO event_leaderboard_version (event, version)
+        SELECT DISTINCT event, 1 FROM event_leaderboard
+    """)
+
+
+if __name__ == '__main__':
+    create_event_leaderboard_version()
+    create_triggers()
+    backfill_event_leaderboard_version()
+    execute("UPDATE system_setting SET value = '1.60', updated_at = now() WHERE `key` = 'db.version';")
@@ -1,5 +1,10 @@
 import json
+import logging
+import threading
+import time
 
+import redis
+from django.db import close_old_connections
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db.models import Count
@@ -15,10 +20,42 @@ from db.organization import Organization
 from db.task import InterestGroup
 from db.user import User, UserRoleLink
 
-from utils.types import IntegrationType, OrganizationType
+from utils.types import OrganizationType, RoleType
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
 
 class LandingStats:
-    data = {}
+    """
+    Landing page counters kept as a Redis hash shared by every process.
+
+    Model signals apply +1/-1 deltas to the counters instead of re-running the
+    count queries, and only mark the snapshot dirty. A ticker thread broadcasts
+    the snapshot to the `landing_stats` group at most once per `TICK` seconds,
+    so a bulk import results in one broadcast per tick rather than one per row.
+    The counters are recomputed from the database every `RECONCILE_INTERVAL`
+    seconds to correct drift from writes that bypass the signals.
+    """
+
+    KEY = "landing_stats"
+    DIRTY_KEY = "landing_stats:dirty"
+    FRESH_KEY = "landing_stats:fresh"
+    TICK = 2
+    RECONCILE_INTERVAL = 600
+    ORG_TYPES = [
+        OrganizationType.COLLEGE.value,
+        OrganizationType.COMPANY.value,
+        OrganizationType.COMMUNITY.value,
+    ]
+    ROLES = [RoleType.MENTOR.value, RoleType.ENABLER.value]
+
+    def __init__(self):
+        self._ticker = None
+        self._ticker_lock = threading.Lock()
+
+    @property
+    def client(self):
+        return RedisUtils.get_client()
 
     def members_count(self):
         members_count = User.objects.all().count()
@@ -26,8 +63,7 @@ class LandingStats:
 
     def org_type_counts(self):
         org_type_counts = Organization.objects.filter(
-                org_type__in=[OrganizationType.COLLEGE.value, OrganizationType.COMPANY.value,
-                                OrganizationType.COMMUNITY.value]
+                org_type__in=self.ORG_TYPES
             ).values('org_type').annotate(org_count=Coalesce(Count('org_type'), 0))
         org_type_counts = list(org_type_counts)
 
@@ -35,7 +71,7 @@ class LandingStats:
 
     def enablers_mentors_count(self):
         enablers_mentors_count = UserRoleLink.objects.filter(
-            role__title__in=["Mentor", "Enabler"]).values(
+            role__title__in=self.ROLES).values(
             'role__title').annotate(role_count=Coalesce(Count('role__title'), 0))
         enablers_mentors_count = list(enablers_mentors_count)
 
@@ -49,35 +85,109 @@ class LandingStats:
         learning_circles_count = LearningCircle.objects.all().count()
         return learning_circles_count
 
-    def get_data(self, sender):
-        if sender == None:
-            self.data = {
-                'members': self.members_count(),
-                'org_type_counts': self.org_type_counts(),
-                'enablers_mentors_count': self.enablers_mentors_count(),
-                'ig_count': self.interest_groups_count(),
-                'learning_circle_count': self.learning_circles_count()
-            }
-        elif sender == User:
-            self.data['members'] = self.members_count()
-
-        elif sender == Organization:
-            self.data['org_type_counts'] = self.org_type_counts()
-
-        elif sender == UserRoleLink:
-            self.data['enablers_mentors_count'] = self.enablers_mentors_count()
-
+    def count_all(self):
+        counters = {
+            'members': self.members_count(),
+            'ig_count': self.interest_groups_count(),
+            'learning_circle_count': self.learning_circles_count(),
+            **{f'org:{org_type}': 0 for org_type in self.ORG_TYPES},
+            **{f'role:{role}': 0 for role in self.ROLES},
+        }
+        for org in self.org_type_counts():
+            counters[f"org:{org['org_type']}"] = org['org_count']
+        for role in self.enablers_mentors_count():
+            counters[f"role:{role['role__title']}"] = role['role_count']
+        return counters
+
+    def reconcile(self):
+        counters = self.count_all()
+        with self.client.pipeline() as pipe:
+            pipe.delete(self.KEY)
+            pipe.hset(self.KEY, mapping=counters)
+            pipe.set(self.DIRTY_KEY, 1)
+            pipe.execute()
+        return counters
+
+    def get_data(self):
+        """
+        Returns the landing stats from the Redis snapshot, or counted from
+        the database when Redis is unavailable.
+        """
+        counters = None
+        try:
+            if self.client.set(self.FRESH_KEY, 1, nx=True, ex=self.RECONCILE_INTERVAL):
+                counters = self.reconcile()
+            elif not (counters := self.client.hgetall(self.KEY)):
+                counters = self.reconcile()
+        except redis.RedisError as e:
+            logger.warning(f"Landing stats read failed, counting from the database: {e}")
+            counters = counters or self.count_all()
+
+        return {
+            'members': int(counters['members']),
+            'org_type_counts': [
+                {'org_type': org_type, 'org_count': count}
+                for org_type in self.ORG_TYPES
+                if (count := int(counters.get(f'org:{org_type}', 0)))
+            ],
+            'enablers_mentors_count': [
+                {'role__title': role, 'role_count': count}
+                for role in self.ROLES
+                if (count := int(counters.get(f'role:{role}', 0)))
+            ],
+            'ig_count': int(counters['ig_count']),
+            'learning_circle_count': int(counters['learning_circle_count']),
+        }
+
+    def counter_for(self, sender, instance):
+        if sender == User:
+            return 'members'
         elif sender == InterestGroup:
-            self.data['ig_count'] = self.interest_groups_count()
-
+            return 'ig_count'
         elif sender == LearningCircle:
-            self.data['learning_circle_count'] = self.learning_circles_count()
+            return 'learning_circle_count'
+        elif sender == Organization and instance.org_type in self.ORG_TYPES:
+            return f'org:{instance.org_type}'
+        elif sender == UserRoleLink and instance.role.title in self.ROLES:
+            return f'role:{instance.role.title}'
+
+    def apply_delta(self, sender, instance, delta):
+        if not (counter := self.counter_for(sender, instance)):
+            return
+        # a missing snapshot is rebuilt from the database on the next read
+        if self.client.exists(self.KEY):
+            with self.client.pipeline() as pipe:
+                pipe.hincrby(self.KEY, counter, delta)
+                pipe.set(self.DIRTY_KEY, 1)
+                pipe.execute()
+        self.start_ticker()
+
+    def start_ticker(self):
+        with self._ticker_lock:
+            if self._ticker is None or not self._ticker.is_alive():
+                self._ticker = threading.Thread(
+                    target=self.tick_forever, name="landing-stats-ticker", daemon=True
+                )
+                self._ticker.start()
+
+    def tick_forever(self):
+        while True:
+            time.sleep(self.TICK)
+            try:
+                # only the process that clears the flag broadcasts this tick
+                if self.client.delete(self.DIRTY_KEY):
+                    close_old_connections()
+                    async_to_sync(channel_layer.group_send)(
+                        GlobalCount.group_name,
+                        {"type": "send_data", "data": self.get_data()}
+                    )
+            except Exception as e:
+                logger.error(f"Landing stats broadcast failed: {e}")
 
 
 landing_stats = LandingStats()
 
 class GlobalCount(WebsocketConsumer):
-    data = {}
     group_name = "landing_stats"
 
     def connect(self):
@@ -87,10 +197,7 @@ class GlobalCount(WebsocketConsumer):
             )
         self.accept()
 
-        landing_stats.get_data(None)
-        self.data = landing_stats.data
-
-        self.send(text_data=json.dumps(self.data))
+        self.send(text_data=json.dumps(landing_stats.get_data()))
     
     def disconnect(self, code):
         self.channel_layer.group_discard(self.group_name, self.channel_name)
@@ -112,9 +219,7 @@ channel_layer = get_channel_layer()
 @receiver(post_delete, sender=Organization)
 def db_signals(sender, instance, created=None, *args, **kwargs):
     if created or created == None:
-        landing_stats.get_data(sender)
-        data = landing_stats.data
-        async_to_sync(channel_layer.group_send)(
-            "landing_stats",
-            {"type": "send_data", "data": data}
-        )
+        try:
+            landing_stats.apply_delta(sender, instance, 1 if created else -1)
+        except redis.RedisError as e:
+            logger.warning(f"Landing stats update failed: {e}")
@@ -4,17 +4,19 @@ import requests
 from django.db import models
 from django.db.models import Case, When, Value, CharField, Count, Q, F, Sum
 from django.db.models import Subquery, OuterRef
-from django.db.models.functions import Coalesce
 from rest_framework.views import APIView
 
 from db.learning_circle import LearningCircle
 from db.learning_circle import UserCircleLink
 from db.organization import Organization,Department,District,State,Country
-from db.task import InterestGroup, KarmaActivityLog, UserIgLink
-from db.user import User, UserRoleLink
+from db.task import InterestGroup, UserIgKarma, UserIgLink
+from db.user import User
+from utils.http_client import devfolio_client
+from utils.reference_data import reference_data
 from utils.response import CustomResponse
 from utils.types import IntegrationType, OrganizationType, RoleType
 from utils.utils import CommonUtils
+from .common_consumer import landing_stats
 from .serializer import StudentInfoSerializer, CollegeInfoSerializer, LearningCircleEnrollmentSerializer, \
     UserLeaderboardSerializer,OrgSerializer,DistrictSerializer,StateSerializer,CountrySerializer, LcDetailsSerializer, \
     LcListSerializer
@@ -314,7 +316,7 @@ class LcReportDownloadAPI(APIView):
             )
         )
 
-        student_info_data = StudentInfoSerializer(student_info, many=True).data
+        student_info_data = CommonUtils.serialize_in_chunks(StudentInfoSerializer, student_info)
 
         return CommonUtils.generate_csv(student_info_data, "Learning Circle Report")
 
@@ -399,7 +401,7 @@ class CollegeWiseLcReportCSV(APIView):
             is_pagination=False
         )
 
-        lc_report = CollegeInfoSerializer(paginated_queryset, many=True).data
+        lc_report = CommonUtils.serialize_in_chunks(CollegeInfoSerializer, paginated_queryset)
 
         return CommonUtils.generate_csv(lc_report, "Learning Circle Report")
 
@@ -494,57 +496,28 @@ class LearningCircleEnrollmentCSV(APIView):
                          "organisation": "organisation", "dwms_id": "dwms_id", "karma_earned": "karma_earned"},
             is_pagination=False)
 
-        lc_enrollment = LearningCircleEnrollmentSerializer(paginated_queryset, many=True).data
+        lc_enrollment = CommonUtils.serialize_in_chunks(LearningCircleEnrollmentSerializer, paginated_queryset)
 
         return CommonUtils.generate_csv(lc_enrollment, "Learning Enrollment Report")
 
 
 class GlobalCountAPI(APIView):
     def get(self, request):
-        members_count = User.objects.all().count()
-        org_type_counts = (
-            Organization.objects.filter(
-                org_type__in=[
-                    OrganizationType.COLLEGE.value,
-                    OrganizationType.COMPANY.value,
-                    OrganizationType.COMMUNITY.value,
-                ]
-            )
-            .values("org_type")
-            .annotate(org_count=Coalesce(Count("org_type"), 0))
-        )
-
-        enablers_mentors_count = (
-            UserRoleLink.objects.filter(
-                role__title__in=[RoleType.MENTOR.value, RoleType.ENABLER.value]
-            )
-            .values("role__title")
-            .annotate(role_count=Coalesce(Count("role__title"), 0))
-        )
-
-        interest_groups_count = InterestGroup.objects.all().count()
-        learning_circles_count = LearningCircle.objects.all().count()
-
-        data = {
-            "members": members_count,
-            "org_type_counts": org_type_counts,
-            "enablers_mentors_count": enablers_mentors_count,
-            "ig_count": interest_groups_count,
-            "learning_circle_count": learning_circles_count,
-        }
-        return CustomResponse(response=data).get_success_response()
+        return CustomResponse(response=landing_stats.get_data()).get_success_response()
 
 
 class GTASANDSHOREAPI(APIView):
     def get(self, request):
-        response = requests.get('https://devfolio.vez.social/rank')
-        if response.status_code == 200:
+        try:
+            response = devfolio_client.get('https://devfolio.vez.social/rank')
+            data = response.json() if response.status_code == 200 else None
+        except (requests.RequestException, ValueError):
+            data = None
+
+        if data is not None:
             # Save JSON response to a local file
             with open('response.json', 'w') as json_file:
-                json.dump(response.json(), json_file)
-
-            with open('response.json', 'r') as file:
-                data = json.load(file)
+                json.dump(data, json_file)
         else:
             with open('response.json', 'r') as file:
                 data = json.load(file)
@@ -574,7 +547,9 @@ class UserProfilePicAPI(APIView):
 class ListIGAPI(APIView):
 
     def get(self, request):
-        return CustomResponse(response=InterestGroup.objects.all().values("name")).get_success_response()
+        return reference_data.response(
+            request, ("ig_names",), lambda: list(InterestGroup.objects.all().values("name"))
+        )
 
 
 class ListTopIgUsersAPI(APIView):
@@ -582,8 +557,8 @@ class ListTopIgUsersAPI(APIView):
     def get(self, request):
         ig_name = request.query_params.getlist("ig_name", [])
 
-        user_karma_by_ig = KarmaActivityLog.objects.filter(
-            task__ig__name__in=ig_name, appraiser_approved=True
+        user_karma_by_ig = UserIgKarma.objects.filter(
+            ig__name__in=ig_name
         ).values(
             userid=F('user__id'),
             muid=F('user__muid'),
@@ -632,65 +607,68 @@ class BekenAPI(APIView):
 
 class LcCollegeAPI(APIView):
     def get(self, request):
-        org_queryset = Organization.objects.filter(
-            Q(org_type=OrganizationType.COLLEGE.value),
-            Q(district_id=request.query_params.get("district_id")),
-        )
-        department_queryset = Department.objects.all()
+        district = request.query_params.get("district_id")
 
-        college_serializer_data = OrgSerializer(
-            org_queryset, many=True
-        ).data
+        def build():
+            org_queryset = Organization.objects.filter(
+                Q(org_type=OrganizationType.COLLEGE.value),
+                Q(district_id=district),
+            )
+            department_queryset = Department.objects.all()
 
-        department_serializer_data = OrgSerializer(
-            department_queryset, many=True
-        ).data
+            college_serializer_data = OrgSerializer(
+                org_queryset, many=True
+            ).data
 
-        return CustomResponse(
-            response={
+            department_serializer_data = OrgSerializer(
+                department_queryset, many=True
+            ).data
+
+            return {
                 "colleges": college_serializer_data,
                 "departments": department_serializer_data,
             }
-        ).get_success_response()
+
+        return reference_data.response(request, ("district_colleges", str(district)), build)
 
 
 
 class LcDistrictAPI(APIView):
     def get(self, request):
-        district = District.objects.filter(zone__state_id=request.query_params.get("state_id"))
-        
-        serializer = DistrictSerializer(district, many=True)
+        state = request.query_params.get("state_id")
 
-        return CustomResponse(
-            response={
-                "districts": serializer.data,
-            }
-        ).get_success_response()
+        def build():
+            district = District.objects.filter(zone__state_id=state)
+
+            serializer = DistrictSerializer(district, many=True)
+
+            return {"districts": serializer.data}
+
+        return reference_data.response(request, ("districts", str(state)), build)
 
 class LcStateAPI(APIView):
     def get(self, request):
-        
-        state = State.objects.filter(country_id=request.query_params.get("country_id"))
-        serializer = StateSerializer(state, many=True)
-        
-        return CustomResponse(
-            response={
-                "states": serializer.data,
-            }
-        ).get_success_response()
+        country = request.query_params.get("country_id")
+
+        def build():
+            state = State.objects.filter(country_id=country)
+            serializer = StateSerializer(state, many=True)
+
+            return {"states": serializer.data}
+
+        return reference_data.response(request, ("states", str(country)), build)
 
 
 class LcCountryAPI(APIView):
     def get(self, request):
-        countries = Country.objects.all()
+        def build():
+            countries = Country.objects.all()
 
-        serializer = CountrySerializer(countries, many=True)
+            serializer = CountrySerializer(countries, many=True)
 
-        return CustomResponse(
-            response={
-                "countries": serializer.data,
-            }
-        ).get_success_response()
+            return {"countries": serializer.data}
+
+        return reference_data.response(request, ("countries",), build)
 
 
 
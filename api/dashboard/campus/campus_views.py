@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from db.organization import UserOrganizationLink
 from db.task import Level, Wallet, InterestGroup
 from db.user import User, Role, UserRoleLink
+from utils.level_progress import level_progress
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import OrganizationType, RoleType
@@ -83,6 +84,51 @@ class CampusStudentInEachLevelAPI(APIView):
         return CustomResponse(response=level_with_student_count).get_success_response()
 
 
+class CampusStudentLevelProgressAPI(APIView):
+    """
+    Completed and total tasks of every level for a page of the campus students,
+    answered for the whole page at once.
+    """
+    authentication_classes = [CustomizePermission]
+
+    @role_required([RoleType.CAMPUS_LEAD.value, RoleType.LEAD_ENABLER.value])
+    def get(self, request):
+        user_id = JWTUtils.fetch_user_id(request)
+
+        if not (user_org_link := get_user_college_link(user_id)):
+            return CustomResponse(
+                general_message="User have no organization"
+            ).get_failure_response()
+
+        if user_org_link.org is None:
+            return CustomResponse(
+                general_message="Campus lead has no college"
+            ).get_failure_response()
+
+        students = User.objects.filter(
+            user_organization_link_user__org=user_org_link.org
+        ).distinct().values("id", "full_name", "muid")
+
+        paginated_queryset = CommonUtils.get_paginated_queryset(
+            students,
+            request,
+            ["full_name", "muid"],
+            {"full_name": "full_name", "muid": "muid"},
+        )
+        students = list(paginated_queryset.get("queryset"))
+        progress = level_progress.summaries(student["id"] for student in students)
+
+        return CustomResponse(
+            response={
+                "data": [
+                    {**student, "levels": progress[student["id"]]}
+                    for student in students
+                ],
+                "pagination": paginated_queryset.get("pagination"),
+            }
+        ).get_success_response()
+
+
 class CampusStudentDetailsAPI(APIView):
     authentication_classes = [CustomizePermission]
 
@@ -302,10 +348,10 @@ class CampusStudentDetailsCSVAPI(APIView):
             },
         )
 
-        serializer = serializers.CampusStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        serializer_data = CommonUtils.serialize_in_chunks(
+            serializers.CampusStudentDetailsSerializer, user_org_links, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "Campus Student Details")
+        return CommonUtils.generate_csv(serializer_data, "Campus Student Details")
 
 
 class WeeklyKarmaAPI(APIView):
@@ -537,4 +583,4 @@ class TransferIGRoleAPI(APIView):
             serializer.save()
             return CustomResponse(general_message='Assigned new Ig lead successfully').get_success_response()
         return CustomResponse(message=serializer.errors).get_failure_response()
-        
\ No newline at end of file
+        
\ No newline at end of file
@@ -9,6 +9,7 @@ from db.task import KarmaActivityLog
 from db.user import User, UserRoleLink
 from utils.types import OrganizationType
 from utils.types import RoleType
+from utils.org_karma_rank import OrgKarmaRollup, org_karma_rollup
 from utils.utils import DateTimeUtils
 
 
@@ -88,26 +89,7 @@ class CampusDetailsSerializer(serializers.ModelSerializer):
         )
 
     def get_rank(self, obj):
-        org_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__org_type=OrganizationType.COLLEGE.value)
-            .values("org")
-            .annotate(total_karma=Sum("user__wallet_user__karma"))
-        ).order_by("-total_karma", "org__created_at")
-
-        rank_dict = {
-            data["org"]: data["total_karma"] if data["total_karma"] is not None else 0
-            for data in org_karma_dict
-        }
-
-        sorted_rank_dict = dict(
-            sorted(rank_dict.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        if obj.org.id in sorted_rank_dict:
-            keys_list = list(sorted_rank_dict.keys())
-            position = keys_list.index(obj.org.id)
-            return position + 1
+        return org_karma_rollup.rank(OrgKarmaRollup.COLLEGE, obj.org.id)
 
 
 class CampusStudentDetailsSerializer(serializers.Serializer):
@@ -6,6 +6,7 @@ urlpatterns = [
     path("campus-details/", campus_views.CampusDetailsAPI.as_view(), name='campus-details'),
     path("student-level/", campus_views.CampusStudentInEachLevelAPI.as_view(), name='student-in-each-level'),
     path("student-details/", campus_views.CampusStudentDetailsAPI.as_view(), name='student-details'),
+    path("student-level-progress/", campus_views.CampusStudentLevelProgressAPI.as_view(), name='student-level-progress'),
     path("student-details/csv/", campus_views.CampusStudentDetailsCSVAPI.as_view(), name='student-details-csv'),
     path("weekly-karma/", campus_views.WeeklyKarmaAPI.as_view(), name='weekly-karma-insights'),
 
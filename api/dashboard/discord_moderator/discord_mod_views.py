@@ -4,6 +4,7 @@ from django.db.models import Q
 from rest_framework.views import APIView
 
 from db.task import KarmaActivityLog
+from utils.types import CountMode
 from utils.utils import CommonUtils
 from utils.permission import CustomizePermission
 from utils.response import CustomResponse
@@ -18,7 +19,9 @@ class TaskList(APIView):
         paginated_queryset = CommonUtils.get_paginated_queryset(
             tasks,
             request,
-            ['id', 'full_name', 'task_name', 'status', 'discordlink']
+            ['id', 'full_name', 'task_name', 'status', 'discordlink'],
+            keyset=True,
+            count=CountMode.ESTIMATED,
         )
 
         serializer = KarmaActivityLogSerializer(
@@ -1,11 +1,11 @@
 from datetime import timedelta
 
-from django.db.models import Sum
 from rest_framework import serializers
 
 from db.organization import UserOrganizationLink, Organization
 from db.task import KarmaActivityLog, Level
 from db.user import User
+from utils.org_karma_rank import OrgKarmaRollup, org_karma_rollup
 from utils.types import OrganizationType, RoleType
 from utils.utils import DateTimeUtils
 
@@ -32,28 +32,7 @@ class DistrictDetailsSerializer(serializers.ModelSerializer):
         )
 
     def get_rank(self, obj):
-        org_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__org_type=OrganizationType.COLLEGE.value)
-            .values("org__district")
-            .annotate(total_karma=Sum("user__wallet_user__karma"))
-        ).order_by("-total_karma", "org__created_at")
-
-        rank_dict = {
-            data["org__district"]: data["total_karma"]
-            if data["total_karma"] is not None
-            else 0
-            for data in org_karma_dict
-        }
-
-        sorted_rank_dict = dict(
-            sorted(rank_dict.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        if obj.org.district.id in sorted_rank_dict:
-            keys_list = list(sorted_rank_dict.keys())
-            position = keys_list.index(obj.org.district.id)
-            return position + 1
+        return org_karma_rollup.rank(OrgKarmaRollup.DISTRICT, obj.org.district_id)
 
     def get_district_lead(self, obj):
         user_org_link = UserOrganizationLink.objects.filter(
@@ -64,10 +43,7 @@ class DistrictDetailsSerializer(serializers.ModelSerializer):
         return user_org_link.user.full_name if user_org_link else None
 
     def get_karma(self, obj):
-        return UserOrganizationLink.objects.filter(
-            org__org_type=OrganizationType.COLLEGE.value,
-            org__district=obj.org.district
-        ).aggregate(total_karma=Sum("user__wallet_user__karma"))["total_karma"]
+        return org_karma_rollup.karma(OrgKarmaRollup.DISTRICT, obj.org.district_id)
 
     def get_total_members(self, obj):
         return UserOrganizationLink.objects.filter(
@@ -1,11 +1,10 @@
-from itertools import islice
-
-from django.db.models import Sum, F, Case, CharField, When
+from django.db.models import F, Case, CharField, When
 from rest_framework.views import APIView
 
-from db.organization import UserOrganizationLink, Organization
+from db.organization import Organization
 from db.task import Level, Wallet
 from db.user import User
+from utils.org_karma_rank import org_karma_rollup
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
 from utils.types import RoleType, OrganizationType
@@ -39,31 +38,12 @@ class DistrictTopThreeCampusAPI(APIView):
 
         user_org_link = get_user_college_link(user_id)
 
-        org_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__org_type=OrganizationType.COLLEGE.value,
-                org__district=user_org_link.org.district,
-                verified=True,
-            )
-            .values("org")
-            .annotate(total_karma=Sum("user__wallet_user__karma")).order_by('-total_karma', 'org__created_at')
-        )
-
-        org_ranks = {
-            data["org"]: data["total_karma"] if data["total_karma"] is not None else 0
-            for data in org_karma_dict
-        }
-
-        sorted_org_ranks = dict(
-            sorted(org_ranks.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        top_three_orgs = dict(islice(sorted_org_ranks.items(), 3))
+        top_three_orgs = org_karma_rollup.top_colleges(user_org_link.org.district_id, 3)
 
         user_org = Organization.objects.filter(id__in=top_three_orgs).distinct()
 
         serializer = dash_district_serializer.DistrictTopThreeCampusSerializer(
-            user_org, many=True, context={"ranks": org_ranks}
+            user_org, many=True, context={"ranks": top_three_orgs}
         )
 
         return CustomResponse(response=serializer.data).get_success_response()
@@ -186,10 +166,10 @@ class DistrictStudentDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_district_serializer.DistrictStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_district_serializer.DistrictStudentDetailsSerializer, user_org_links, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "District Student Details")
+        return CommonUtils.generate_csv(serializer_data, "District Student Details")
 
 
 class DistrictsCollageDetailsAPI(APIView):
@@ -295,7 +275,7 @@ class DistrictsCollageDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_district_serializer.DistrictCollegeDetailsSerializer(
-            organizations, many=True, context={"leads": leads}
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_district_serializer.DistrictCollegeDetailsSerializer, organizations, context={"leads": leads}
         )
-        return CommonUtils.generate_csv(serializer.data, "District College Details")
+        return CommonUtils.generate_csv(serializer_data, "District College Details")
@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 
@@ -5,11 +6,15 @@ from django.conf import settings
 from django.http import FileResponse
 from rest_framework.views import APIView
 
+from utils.http_client import upstream_stats
 from utils.permission import CustomizePermission, role_required
+from utils.query_stats import query_stats
 from utils.response import CustomResponse
 from utils.types import RoleType
 
-from .log_helper import ManageURLPatterns, logHandler
+from utils.utils import DateTimeUtils
+
+from .log_helper import ERROR_STORE_FILE, error_log_store
 
 
 class DownloadErrorLogAPI(APIView):
@@ -66,6 +71,9 @@ class ClearErrorLogAPI(APIView):
             try:
                 with open(error_log, "w") as log_file:
                     log_file.truncate(0)
+                if log_name == "error":
+                    with open(f"{settings.LOG_PATH}/{ERROR_STORE_FILE}", "w") as store_file:
+                        store_file.truncate(0)
                 return CustomResponse(
                     general_message=f"{log_name} log cleared successfully"
                 ).get_success_response()
@@ -120,15 +128,11 @@ class LoggerAPI(APIView):
             >>> logger_api = LoggerAPI()
             >>> response = logger_api.get(request)
         """
-        error_log = f"{settings.LOG_PATH}/error.log"
         try:
-            with open(error_log, "r") as file:
-                log_data = file.read()
+            formatted_errors = error_log_store.get_errors()
         except IOError as e:
             return CustomResponse(response=str(e)).get_failure_response()
 
-        log_handler = logHandler(log_data)
-        formatted_errors = log_handler.parse_logs()
         return CustomResponse(response=formatted_errors).get_success_response()
 
     @role_required(
@@ -151,6 +155,15 @@ class LoggerAPI(APIView):
         """
         logger = logging.getLogger("django")
         logger.error(f"PATCHED : {error_id}")
+        logging.getLogger("error_store").error(
+            json.dumps(
+                {
+                    "id": error_id,
+                    "timestamp": DateTimeUtils.get_current_utc_time().isoformat(),
+                    "patched": True,
+                }
+            )
+        )
         return CustomResponse(response="Updated patch list").get_success_response()
 
 
@@ -182,17 +195,12 @@ class ErrorGraphAPI(APIView):
 
         """
         try:
-            error_log = f"{settings.LOG_PATH}/error.log"
-
-            with open(error_log, "r") as file:
-                log_data = file.read()
-
-            log_handler = logHandler(log_data)
-
             formatted_errors = {
-                "heatmap": log_handler.get_urls_heatmap(),
-                "incident_info": log_handler.get_incident_info(),
-                "affected_users": log_handler.get_affected_users(),
+                "heatmap": error_log_store.get_urls_heatmap(),
+                "incident_info": error_log_store.get_incident_info(),
+                "affected_users": error_log_store.get_affected_users(),
+                "type_counts": error_log_store.get_type_counts(),
+                "day_counts": error_log_store.get_day_counts(),
             }
 
             return CustomResponse(response=formatted_errors).get_success_response()
@@ -229,18 +237,48 @@ class ErrorTabAPI(APIView):
 
         """
         try:
-            error_log = f"{settings.LOG_PATH}/error.log"
-
-            with open(error_log, "r") as file:
-                log_data = file.read()
-
-            log_handler = logHandler(log_data)
-            parsed_errors = log_handler.parse_logs()
-        
-            urlpatterns = ManageURLPatterns().urlpatterns
-            grouped_patterns = ManageURLPatterns.group_patterns(urlpatterns)
+            parsed_errors = error_log_store.get_errors()
 
             return CustomResponse(response=parsed_errors).get_success_response()
 
         except IOError as e:
             return CustomResponse(response=str(e)).get_failure_response()
+
+
+class QueryStatsAPI(APIView):
+    """
+    Query statistics recorded by `QueryBudgetMiddleware` per URL name, the
+    routes with the most queries per request first.
+    """
+
+    authentication_classes = [CustomizePermission]
+
+    @role_required(
+        [RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.TECH_TEAM.value]
+    )
+    def get(self, request):
+        return CustomResponse(response=query_stats.get_stats()).get_success_response()
+
+    @role_required(
+        [RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.TECH_TEAM.value]
+    )
+    def delete(self, request):
+        query_stats.clear()
+        return CustomResponse(
+            general_message="Query stats cleared successfully"
+        ).get_success_response()
+
+
+class UpstreamStatsAPI(APIView):
+    """
+    Request count, failures, latency and the circuit state in the serving
+    process of every external service called through `utils.http_client`.
+    """
+
+    authentication_classes = [CustomizePermission]
+
+    @role_required(
+        [RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.TECH_TEAM.value]
+    )
+    def get(self, request):
+        return CustomResponse(response=upstream_stats()).get_success_response()
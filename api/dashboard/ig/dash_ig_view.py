@@ -205,7 +205,7 @@ class InterestGroupCSV(APIView):
             .all()
         )
 
-        ig_serializer_data = InterestGroupSerializer(ig_serializer, many=True).data
+        ig_serializer_data = CommonUtils.serialize_in_chunks(InterestGroupSerializer, ig_serializer)
 
         return CommonUtils.generate_csv(ig_serializer_data, "Interest Group")
 
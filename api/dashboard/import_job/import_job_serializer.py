@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from db.import_job import ImportJob
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "success_count",
+            "failed_count",
+            "progress",
+            "error",
+            "started_at",
+            "finished_at",
+            "created_at",
+        ]
+
+    def get_progress(self, obj):
+        if not obj.total_rows:
+            return 0
+        return round(obj.processed_rows * 100 / obj.total_rows, 2)
@@ -0,0 +1,52 @@
+from rest_framework.views import APIView
+
+from db.import_job import ImportJob, ImportJobError
+from utils.permission import CustomizePermission, JWTUtils, role_required
+from utils.response import CustomResponse
+from utils.types import RoleType
+from utils.utils import CommonUtils
+from .import_job_serializer import ImportJobSerializer
+
+
+def get_import_job(request, job_id):
+    """
+    Returns the job if it was started by the requesting user, admins can see every job.
+    """
+    jobs = ImportJob.objects.filter(id=job_id)
+    if RoleType.ADMIN.value not in JWTUtils.fetch_role(request):
+        jobs = jobs.filter(created_by_id=JWTUtils.fetch_user_id(request))
+    return jobs.first()
+
+
+class ImportJobAPI(APIView):
+    authentication_classes = [CustomizePermission]
+
+    @role_required([RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.ASSOCIATE.value])
+    def get(self, request, job_id):
+        if not (job := get_import_job(request, job_id)):
+            return CustomResponse(
+                general_message="Import job not found"
+            ).get_failure_response()
+
+        return CustomResponse(
+            response=ImportJobSerializer(job).data
+        ).get_success_response()
+
+
+class ImportJobErrorReportAPI(APIView):
+    authentication_classes = [CustomizePermission]
+
+    @role_required([RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.ASSOCIATE.value])
+    def get(self, request, job_id):
+        if not (job := get_import_job(request, job_id)):
+            return CustomResponse(
+                general_message="Import job not found"
+            ).get_failure_response()
+
+        errors = ImportJobError.objects.filter(job=job)
+        rows = (
+            {"row_number": error.row_number, **error.row, "error": error.error}
+            for chunk in CommonUtils.iterate_in_chunks(errors)
+            for error in chunk
+        )
+        return CommonUtils.generate_csv(rows, f"Import Errors {job.id}")
@@ -0,0 +1,87 @@
+import uuid
+
+from django.db import transaction
+
+from db.task import TaskList, VoucherLog
+from db.user import User
+from utils.import_jobs import Importer
+from utils.karma_voucher import generate_ordered_id
+from utils.utils import DateTimeUtils
+from utils.voucher_delivery import voucher_delivery
+from .karma_voucher_serializer import VoucherLogCSVSerializer
+
+
+class KarmaVoucherImporter(Importer):
+    headers = ['muid', 'karma', 'hashtag',
+               'month', 'week', 'description', 'event']
+
+    def __init__(self, job):
+        super().__init__(job)
+        self.existing_codes = set(VoucherLog.objects.values_list('code', flat=True))
+        self.count = 1
+
+    def next_code(self):
+        while generate_ordered_id(self.count) in self.existing_codes:
+            self.count += 1
+        code = generate_ordered_id(self.count)
+        self.existing_codes.add(code)
+        self.count += 1
+        return code
+
+    def import_chunk(self, rows):
+        users = User.objects.filter(
+            muid__in={row.get('muid') for row in rows}
+        ).values('id', 'email', 'full_name', 'muid')
+        user_dict = {
+            user['muid']: (
+                user['id'], user['email'],
+                user['full_name']
+            ) for user in users
+        }
+        task_dict = dict(
+            TaskList.objects.filter(
+                hashtag__in={row.get('hashtag') for row in rows}
+            ).values_list('hashtag', 'id')
+        )
+
+        failed = []
+        entries = []
+        for row in rows:
+            task_hashtag = row.get('hashtag')
+            karma = row.get('karma')
+            month = row.get('month')
+            muid = row.get('muid')
+            user_info = user_dict.get(muid)
+            task_id = task_dict.get(task_hashtag)
+
+            if user_info is None:
+                failed.append((row, f"Invalid muid: {muid}"))
+            elif task_id is None:
+                failed.append((row, f"Invalid task hashtag: {task_hashtag}"))
+            elif karma == 0:
+                failed.append((row, "Karma cannot be 0"))
+            elif month is None:
+                failed.append((row, "Month cannot be empty"))
+            else:
+                entries.append((row, {
+                    'id': str(uuid.uuid4()),
+                    'code': self.next_code(),
+                    'user_id': user_info[0],
+                    'task_id': task_id,
+                    'karma': karma,
+                    'month': month,
+                    'week': row.get('week'),
+                    'description': row.get('description'),
+                    'event': row.get('event'),
+                    'claimed': False,
+                    'created_by_id': self.user_id,
+                    'updated_by_id': self.user_id,
+                    'created_at': DateTimeUtils.get_current_utc_time(),
+                    'updated_at': DateTimeUtils.get_current_utc_time(),
+                }))
+
+        vouchers, serializer_failed = self.save_valid(VoucherLogCSVSerializer, entries)
+        voucher_ids = [voucher.id for voucher in vouchers]
+        transaction.on_commit(lambda: voucher_delivery.deliver(voucher_ids))
+
+        return failed + serializer_failed
@@ -84,7 +84,8 @@ class VoucherLogSerializer(serializers.ModelSerializer):
             "updated_by",
             "created_at",
             "updated_at",
-            "muid"
+            "muid",
+            "mail_status"
         ]
 
 
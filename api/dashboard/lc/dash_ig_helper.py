@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
-from db.learning_circle import UserCircleLink, LearningCircle
+from db.learning_circle import UserCircleLink, LearningCircle, LearningCircleKarma
+from db.task import UserIgKarma
 
 
 def get_today_start_end(date_time):
@@ -56,6 +57,40 @@ def is_learning_circle_member(user_id, circle_id):
     return False
 
 
+def get_circle_karma(circle):
+    try:
+        return circle.learning_circle_karma_circle.karma
+    except LearningCircleKarma.DoesNotExist:
+        return 0
+
+
+def get_circle_rank(circle):
+    """
+    Returns the rank of the circle among the circles of its interest group,
+    circles with the same karma share a rank.
+    """
+    return LearningCircleKarma.objects.filter(
+        ig_id=circle.ig_id,
+        karma__gt=get_circle_karma(circle)
+    ).count() + 1
+
+
+def get_members_ig_karma(ig_id, user_ids):
+    """
+    Returns the approved karma of each user on the tasks of the interest group
+    as a {user_id: karma} dict.
+    """
+    return dict(
+        UserIgKarma.objects.filter(
+            user_id__in=user_ids,
+            ig_id=ig_id
+        ).values_list(
+            'user_id',
+            'karma'
+        )
+    )
+
+
 def is_valid_learning_circle(circle_id):
     learning_circle = LearningCircle.objects.filter(
         id=circle_id
@@ -2,7 +2,6 @@ import uuid
 from datetime import datetime
 from django.conf import settings
 from decouple import config
-from django.db.models import Sum
 from rest_framework import serializers
 
 from db.learning_circle import LearningCircle, UserCircleLink, InterestGroup, CircleMeetingLog
@@ -13,7 +12,13 @@ from db.user import User
 from utils.types import Lc
 from utils.types import OrganizationType
 from utils.utils import DateTimeUtils
-from .dash_ig_helper import get_today_start_end, get_week_start_end
+from .dash_ig_helper import (
+    get_circle_karma,
+    get_circle_rank,
+    get_members_ig_karma,
+    get_today_start_end,
+    get_week_start_end,
+)
 
 
 class LearningCircleSerializer(serializers.ModelSerializer):
@@ -107,16 +112,7 @@ class LearningCircleMainSerializer(serializers.ModelSerializer):
             for member in user_circle_link
         ]
     def get_karma(self, obj):
-        
-        karma_activity_log = KarmaActivityLog.objects.filter(
-            user__user_circle_link_user__circle=obj,
-        ).aggregate(
-            karma=Sum(
-                'karma'
-            )
-        )['karma']
-
-        return karma_activity_log if karma_activity_log else 0
+        return get_circle_karma(obj)
 
 
 class LearningCircleCreateSerializer(serializers.ModelSerializer):
@@ -274,17 +270,11 @@ class LearningCircleMemberListSerializer(serializers.ModelSerializer):
         ]
 
     def get_lc_karma(self, obj):
-        circle_id = self.context.get('circle_id')
-        karma_activity_log = KarmaActivityLog.objects.filter(
-            user=obj.user,
-            task__ig__learning_circle_ig__id=circle_id
-        ).aggregate(
-            karma=Sum(
-                'karma'
-            )
-        )['karma']
+        members_karma = self.context.get('members_karma')
+        if members_karma is None:
+            members_karma = get_members_ig_karma(obj.circle.ig_id, [obj.user_id])
 
-        return karma_activity_log if karma_activity_log else 0
+        return members_karma.get(obj.user_id, 0)
 
 
 class LearningCircleJoinSerializer(serializers.ModelSerializer):
@@ -386,17 +376,7 @@ class LearningCircleDetailsSerializer(serializers.ModelSerializer):
         ).exists()
 
     def get_total_karma(self, obj):
-        return (
-            KarmaActivityLog.objects.filter(
-                user__user_circle_link_user__circle=obj,
-                user__user_circle_link_user__accepted=True,
-                task__ig=obj.ig,
-                appraiser_approved=True,
-            ).aggregate(
-                total_karma=Sum(
-                    'karma'
-                ))['total_karma'] or 0
-        )
+        return get_circle_karma(obj)
 
     def get_members(self, obj):
         return self._get_member_info(obj, accepted=1)
@@ -409,25 +389,22 @@ class LearningCircleDetailsSerializer(serializers.ModelSerializer):
         members = obj.user_circle_link_circle.filter(
             circle=obj,
             accepted=accepted
+        ).select_related(
+            'user'
+        )
+        members_karma = get_members_ig_karma(
+            obj.ig_id,
+            [member.user_id for member in members]
         )
 
         member_info = []
 
         for member in members:
-            total_ig_karma = KarmaActivityLog.objects.filter(
-                task__ig=member.circle.ig,
-                user=member.user,
-                appraiser_approved=True
-            ).aggregate(
-                total_karma=Sum(
-                    'karma'
-                ))['total_karma'] or 0
-
             member_info.append({
                 'id': member.user.id,
                 'username': f'{member.user.full_name}',
                 'profile_pic': f'{member.user.profile_pic}' or None,
-                'karma': total_ig_karma,
+                'karma': members_karma.get(member.user_id, 0),
                 'is_lead': member.lead,
                 'level': member.user.user_lvl_link_user.level.level_order
             })
@@ -435,53 +412,7 @@ class LearningCircleDetailsSerializer(serializers.ModelSerializer):
         return member_info
 
     def get_rank(self, obj):
-        total_karma = KarmaActivityLog.objects.filter(
-            user__user_circle_link_user__circle=obj,
-            user__user_circle_link_user__accepted=True,
-            task__ig=obj.ig,
-            appraiser_approved=True
-        ).aggregate(
-            total_karma=Sum(
-                'karma'
-            )
-        )['total_karma'] or 0
-
-        circle_ranks = {obj.name: {'total_karma': total_karma}}
-
-        all_learning_circles = LearningCircle.objects.filter(
-            ig=obj.ig
-        ).exclude(
-            id=obj.id
-        )
-
-        for lc in all_learning_circles:
-            total_karma_lc = KarmaActivityLog.objects.filter(
-                user__user_circle_link_user__circle=lc,
-                user__user_circle_link_user__accepted=True,
-                task__ig=lc.ig,
-                appraiser_approved=True
-            ).aggregate(
-                total_karma=Sum(
-                    'karma'
-                )
-            )['total_karma'] or 0
-
-            circle_ranks[lc.name] = {'total_karma': total_karma_lc}
-
-        sorted_ranks = sorted(
-            circle_ranks.items(),
-            key=lambda x: x[1]['total_karma'],
-            reverse=True
-        )
-
-        return next(
-            (
-                i + 1
-                for i, (circle_name, data) in enumerate(sorted_ranks)
-                if circle_name == obj.name
-            ),
-            None,
-        )
+        return get_circle_rank(obj)
 
     def get_previous_meetings(self, obj):
         return obj.circle_meeting_log_learning_circle.all().values(
@@ -16,6 +16,7 @@ from utils.response import CustomResponse
 from utils.utils import DateTimeUtils, send_template_mail
 
 from .dash_ig_helper import (
+    get_members_ig_karma,
     get_today_start_end,
     get_week_start_end,
     is_learning_circle_member,
@@ -64,7 +65,7 @@ class UserLearningCircleListApi(APIView):
 
 class LearningCircleMainApi(APIView):
     def post(self, request):
-        all_circles = LearningCircle.objects.all()
+        all_circles = LearningCircle.objects.select_related("learning_circle_karma_circle")
         if JWTUtils.is_logged_in(request):
             ig_id = request.data.get("ig_id")
             org_id = request.data.get("org_id")
@@ -158,8 +159,18 @@ class LearningCircleListMembersApi(APIView):
                 general_message="Learning Circle Not Exists"
             ).get_failure_response()
 
+        ig_id = (
+            LearningCircle.objects.filter(id=circle_id)
+            .values_list("ig_id", flat=True)
+            .first()
+        )
+        members_karma = get_members_ig_karma(
+            ig_id, user_learning_circle.values("user_id")
+        )
         serializer = LearningCircleMemberListSerializer(
-            user_learning_circle, many=True, context={"circle_id": circle_id}
+            user_learning_circle,
+            many=True,
+            context={"circle_id": circle_id, "members_karma": members_karma},
         )
 
         return CustomResponse(response=serializer.data).get_success_response()
@@ -0,0 +1,100 @@
+import uuid
+
+from db.organization import District, OrgAffiliation, Organization
+from utils.import_jobs import Importer
+from utils.types import OrganizationType
+from .serializers import OrganizationImportSerializer
+
+
+class OrganisationImporter(Importer):
+    headers = [
+        "title",
+        "code",
+        "org_type",
+        "affiliation",
+        "district"
+    ]
+
+    def __init__(self, job):
+        super().__init__(job)
+        self.title_excel = set()
+        self.code_excel = set()
+        self.org_types = OrganizationType.get_all_values()
+
+    def import_chunk(self, rows):
+        failed = []
+        pending = []
+        title_db = set(
+            Organization.objects.filter(
+                title__in={row.get("title") for row in rows}
+            ).values_list("title", flat=True)
+        )
+        code_db = set(
+            Organization.objects.filter(
+                code__in={row.get("code") for row in rows}
+            ).values_list("code", flat=True)
+        )
+
+        for row in rows:
+            title = row.get("title")
+            code = row.get("code")
+            if not title:
+                failed.append((row, "Missing title."))
+            elif title in self.title_excel:
+                failed.append((row, f"Duplicate title in excel: {title}"))
+            elif title in title_db:
+                failed.append((row, f"Duplicate title in database: {title}"))
+            elif not code:
+                self.title_excel.add(title)
+                failed.append((row, "Missing code."))
+            elif code in self.code_excel:
+                self.title_excel.add(title)
+                failed.append((row, f"Duplicate code in excel: {code}"))
+            elif code in code_db:
+                self.title_excel.add(title)
+                failed.append((row, f"Duplicate code in database: {code}"))
+            else:
+                self.title_excel.add(title)
+                self.code_excel.add(code)
+                pending.append(row)
+
+        affiliations_dict = dict(
+            OrgAffiliation.objects.filter(
+                title__in={row.get("affiliation") for row in pending}
+            ).values_list("title", "id")
+        )
+        districts_dict = dict(
+            District.objects.filter(
+                name__in={row.get("district") for row in pending}
+            ).values_list("name", "id")
+        )
+
+        entries = []
+        for row in pending:
+            affiliation = row.get("affiliation")
+            district = row.get("district")
+            org_type = row.get("org_type")
+
+            affiliation_id = affiliations_dict.get(affiliation) if affiliation is not None else None
+            district_id = districts_dict.get(district)
+
+            if affiliation and not affiliation_id:
+                failed.append((row, f"Invalid affiliation: {affiliation}"))
+            elif not district_id:
+                failed.append((row, f"Invalid district: {district}"))
+            elif org_type not in self.org_types:
+                failed.append((row, f"Invalid org_type: {org_type}"))
+            else:
+                entries.append((row, {
+                    "id": str(uuid.uuid4()),
+                    "title": row.get("title"),
+                    "code": row.get("code"),
+                    "org_type": org_type,
+                    "updated_by_id": self.user_id,
+                    "created_by_id": self.user_id,
+                    "affiliation_id": affiliation_id,
+                    "district_id": district_id,
+                }))
+
+        _, serializer_failed = self.save_valid(OrganizationImportSerializer, entries)
+        return failed + serializer_failed
@@ -2,16 +2,17 @@ import uuid
 
 from decouple import config as decouple_config
 from django.db import transaction
-from django.db.models import F, Sum, Q
+from django.db.models import F, Sum
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
 from db.organization import UserOrganizationLink, District
-from db.task import InterestGroup, KarmaActivityLog, Level, TaskList, Wallet, UserIgLink, UserLvlLink
+from db.task import InterestGroup, KarmaActivityLog, TaskList, Wallet, UserIgKarma, UserIgLink, UserLvlLink
 from db.user import User, UserSettings, Socials
 from utils.exception import CustomException
+from utils.karma_rank import karma_rank_index
 from utils.permission import JWTUtils
-from utils.types import OrganizationType, RoleType, MainRoles, WebHookActions, WebHookCategory
+from utils.types import OrganizationType, MainRoles, WebHookActions, WebHookCategory
 from utils.utils import DateTimeUtils, DiscordWebhooks
 
 BE_DOMAIN_NAME = decouple_config('BE_DOMAIN_NAME')
@@ -71,11 +72,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_percentile(self, obj):
-        users_count_lt_user_karma = Wallet.objects.filter(
-            karma__lt=obj.wallet_user.karma
-        ).count()
-        user_count = User.objects.all().count()
-        return 0 if user_count == 0 else 100 - ((users_count_lt_user_karma * 100) / user_count)
+        return karma_rank_index.percentile(
+            obj.id, obj.wallet_user.karma, self.get_roles(obj)
+        )
 
     def get_roles(self, obj):
         return list({link.role.title for link in obj.user_role_link_user.filter(verified=True)})
@@ -106,33 +105,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return None
 
     def get_rank(self, obj):
-
-        roles = self.get_roles(obj)
-        user_karma = obj.wallet_user.karma
-        if RoleType.MENTOR.value in roles:
-            ranks = Wallet.objects.filter(
-                user__user_role_link_user__verified=True,
-                user__user_role_link_user__role__title=RoleType.MENTOR.value,
-                karma__gte=user_karma,
-            ).order_by('-karma', '-updated_at', 'created_at')
-        elif RoleType.ENABLER.value in roles:
-            ranks = Wallet.objects.filter(
-                user__user_role_link_user__verified=True,
-                user__user_role_link_user__role__title=RoleType.ENABLER.value,
-                karma__gte=user_karma,
-            ).order_by('-karma', '-updated_at', 'created_at')
-        else:
-            ranks = (
-                Wallet.objects.filter(karma__gte=user_karma)
-                .exclude(
-                    Q(user__user_role_link_user__role__title__in=[
-                        RoleType.ENABLER.value, RoleType.MENTOR.value])
-                ).order_by('-karma')
-            )
-
-        for count, _rank in enumerate(ranks, start=1):
-            if obj == _rank.user:
-                return count
+        return karma_rank_index.rank(
+            obj.id, obj.wallet_user.karma, self.get_roles(obj)
+        )
 
     def get_karma_distribution(self, obj):
         return (
@@ -143,59 +118,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_interest_groups(self, obj):
-        interest_groups = []
-        for ig_link in UserIgLink.objects.filter(user=obj):
-            total_ig_karma = (
-                0
-                if KarmaActivityLog.objects.filter(
-                    task__ig=ig_link.ig, user=obj, appraiser_approved=True
-                )
-                   .aggregate(Sum("karma"))
-                   .get("karma__sum")
-                   is None
-                else KarmaActivityLog.objects.filter(
-                    task__ig=ig_link.ig, user=obj, appraiser_approved=True
-                )
-                   .aggregate(Sum("karma"))
-                   .get("karma__sum")
-            )
-            interest_groups.append(
-                {"id": ig_link.ig.id, "name": ig_link.ig.name, "karma": total_ig_karma}
-            )
-        return interest_groups
-
-
-class UserLevelSerializer(serializers.ModelSerializer):
-    tasks = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Level
-        fields = ("name", "tasks", "karma")
-
-    def get_tasks(self, obj):
-        user_id = self.context.get("user_id")
-        user_igs = UserIgLink.objects.filter(
-            user__id=user_id).values_list("ig__name", flat=True)
-        tasks = TaskList.objects.filter(level=obj)
-        
-        if obj.level_order > 4:
-            tasks = tasks.filter(ig__name__in=user_igs)
-
-        data = []
-        for task in tasks:
-            completed = KarmaActivityLog.objects.filter(
-                user=user_id, task=task, appraiser_approved=True).exists()
-            if task.active or completed:
-                data.append(
-                    {
-                        "task_name": task.title,
-                        "discord_link": task.discord_link,
-                        "hashtag": task.hashtag,
-                        "completed": completed,
-                        "karma": task.karma,
-                    }
-                )
-        return data
+        ig_karma = dict(
+            UserIgKarma.objects.filter(user=obj).values_list("ig_id", "karma")
+        )
+        return [
+            {"id": ig_link.ig.id, "name": ig_link.ig.name, "karma": ig_karma.get(ig_link.ig_id, 0)}
+            for ig_link in UserIgLink.objects.filter(user=obj).select_related("ig")
+        ]
 
 
 class UserRankSerializer(ModelSerializer):
@@ -215,32 +144,9 @@ class UserRankSerializer(ModelSerializer):
         return ["Learner"] if len(roles) == 0 else roles
 
     def get_rank(self, obj):
-        roles = self.get_roles(obj)
-        user_karma = obj.wallet_user.karma
-        if RoleType.MENTOR.value in roles:
-            ranks = Wallet.objects.filter(
-                user__user_role_link_user__verified=True,
-                user__user_role_link_user__role__title=RoleType.MENTOR.value,
-                karma__gte=user_karma,
-            ).order_by('-karma', '-updated_at', 'created_at')
-        elif RoleType.ENABLER.value in roles:
-            ranks = Wallet.objects.filter(
-                user__user_role_link_user__verified=True,
-                user__user_role_link_user__role__title=RoleType.ENABLER.value,
-                karma__gte=user_karma,
-            ).order_by('-karma', '-updated_at', 'created_at')
-        else:
-            ranks = (
-                Wallet.objects.filter(karma__gte=user_karma)
-                .exclude(
-                    Q(user__user_role_link_user__role__title__in=[
-                        RoleType.ENABLER.value, RoleType.MENTOR.value])
-                ).order_by('-karma')
-            )
-
-        for count, _rank in enumerate(ranks, start=1):
-            if obj == _rank.user:
-                return count
+        return karma_rank_index.rank(
+            obj.id, obj.wallet_user.karma, self.context.get("roles")
+        )
 
     def get_karma(self, obj):
         return total_karma.karma if (total_karma := obj.wallet_user) else None
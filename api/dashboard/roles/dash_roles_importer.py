@@ -0,0 +1,73 @@
+import uuid
+
+from db.user import Role, User, UserRoleLink
+from utils.import_jobs import Importer
+from utils.types import WebHookActions, WebHookCategory
+from utils.utils import DiscordWebhooks
+from .dash_roles_serializer import UserRoleBulkAssignSerializer
+
+
+class UserRoleBulkAssignImporter(Importer):
+    headers = ["muid", "role"]
+
+    def __init__(self, job):
+        super().__init__(job)
+        self.user_role_link_to_check = set()
+
+    def import_chunk(self, rows):
+        failed = []
+        pending = []
+        for row in rows:
+            user_role = (row.get("muid"), row.get("role"))
+            if user_role in self.user_role_link_to_check:
+                failed.append((row, "Duplicate entry"))
+            else:
+                self.user_role_link_to_check.add(user_role)
+                pending.append(row)
+
+        users_to_fetch = {row.get("muid") for row in pending}
+        roles_to_fetch = {row.get("role") for row in pending}
+        users_dict = dict(User.objects.filter(muid__in=users_to_fetch).values_list("muid", "id"))
+        roles_dict = dict(Role.objects.filter(title__in=roles_to_fetch).values_list("title", "id"))
+        existing_user_role_links = set(
+            UserRoleLink.objects.filter(
+                user__muid__in=users_to_fetch, role__title__in=roles_to_fetch
+            ).values_list("user__muid", "role__title")
+        )
+
+        entries = []
+        for row in pending:
+            user = row.get("muid")
+            role = row.get("role")
+            user_id = users_dict.get(user)
+            role_id = roles_dict.get(role)
+
+            if not user_id:
+                failed.append((row, f"Invalid user muid: {user}"))
+            elif not role_id:
+                failed.append((row, f"Invalid role: {role}"))
+            elif (user, role) in existing_user_role_links:
+                failed.append((row, f"User {user} already has role {role}"))
+            else:
+                entries.append((row, {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "role_id": role_id,
+                    "verified": True,
+                    "created_by_id": self.user_id,
+                }))
+
+        user_role_links, serializer_failed = self.save_valid(UserRoleBulkAssignSerializer, entries)
+        role_titles = {role_id: title for title, role_id in roles_dict.items()}
+        users_by_role = {}
+        for user_role_link in user_role_links:
+            users_by_role.setdefault(role_titles[user_role_link.role_id], []).append(user_role_link.user_id)
+
+        for role, user_set in users_by_role.items():
+            DiscordWebhooks.general_updates(
+                WebHookCategory.BULK_ROLE.value,
+                WebHookActions.UPDATE.value,
+                role,
+                ",".join(user_set),
+            )
+        return failed + serializer_failed
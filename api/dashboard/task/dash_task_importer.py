@@ -0,0 +1,127 @@
+import uuid
+
+from db.organization import Organization
+from db.task import Channel, InterestGroup, Level, TaskList, TaskType
+from utils.import_jobs import Importer
+from utils.types import Events
+from utils.utils import DateTimeUtils
+from .dash_task_serializer import TaskImportSerializer
+
+
+class TaskListImporter(Importer):
+    headers = [
+        "hashtag",
+        "title",
+        "description",
+        "karma",
+        "usage_count",
+        "variable_karma",
+        "level",
+        "channel",
+        "type",
+        "ig",
+        "org",
+        "event",
+    ]
+
+    lookup_columns = {"level", "channel", "type", "ig", "org", "row_number"}
+
+    def __init__(self, job):
+        super().__init__(job)
+        self.hashtags_excel = set()
+        self.events = Events.get_all_values()
+
+    def import_chunk(self, rows):
+        failed = []
+        pending = []
+        hashtags = {row.get("hashtag") for row in rows}
+        hashtags_db = set(
+            TaskList.objects.filter(hashtag__in=hashtags).values_list("hashtag", flat=True)
+        )
+
+        for row in rows:
+            hashtag = row.get("hashtag")
+            if not hashtag:
+                failed.append((row, "Missing hashtag."))
+            elif hashtag in self.hashtags_excel:
+                failed.append((row, f"Duplicate hashtag in excel: {hashtag}"))
+            elif hashtag in hashtags_db:
+                failed.append((row, f"Duplicate hashtag in database: {hashtag}"))
+            elif not row.get("title"):
+                self.hashtags_excel.add(hashtag)
+                failed.append((row, "Missing title."))
+            else:
+                self.hashtags_excel.add(hashtag)
+                pending.append(row)
+
+        channels_dict = dict(
+            Channel.objects.filter(
+                name__in={row.get("channel") for row in pending}
+            ).values_list("name", "id")
+        )
+        task_types_dict = dict(
+            TaskType.objects.filter(
+                title__in={row.get("type") for row in pending}
+            ).values_list("title", "id")
+        )
+        levels_dict = dict(
+            Level.objects.filter(
+                name__in={row.get("level") for row in pending}
+            ).values_list("name", "id")
+        )
+        igs_dict = dict(
+            InterestGroup.objects.filter(
+                name__in={row.get("ig") for row in pending}
+            ).values_list("name", "id")
+        )
+        orgs_dict = dict(
+            Organization.objects.filter(
+                code__in={row.get("org") for row in pending}
+            ).values_list("code", "id")
+        )
+
+        entries = []
+        for row in pending:
+            level = row.get("level")
+            channel = row.get("channel")
+            task_type = row.get("type")
+            ig = row.get("ig")
+            org = row.get("org")
+            event = row.get("event")
+
+            task_type_id = task_types_dict.get(task_type)
+            channel_id = channels_dict.get(channel) if channel is not None else None
+            level_id = levels_dict.get(level) if level is not None else None
+            ig_id = igs_dict.get(ig) if ig is not None else None
+            org_id = orgs_dict.get(org) if org is not None else None
+
+            if channel and not channel_id:
+                failed.append((row, f"Invalid channel: {channel}"))
+            elif not task_type_id:
+                failed.append((row, f"Invalid task type: {task_type}"))
+            elif level and not level_id:
+                failed.append((row, f"Invalid level: {level}"))
+            elif ig and not ig_id:
+                failed.append((row, f"Invalid interest group: {ig}"))
+            elif org and not org_id:
+                failed.append((row, f"Invalid organization: {org}"))
+            elif event is not None and event not in self.events:
+                failed.append((row, f"Invalid event: {event}"))
+            else:
+                entries.append((row, {
+                    **{key: value for key, value in row.items() if key not in self.lookup_columns},
+                    "id": str(uuid.uuid4()),
+                    "updated_by_id": self.user_id,
+                    "updated_at": DateTimeUtils.get_current_utc_time(),
+                    "created_by_id": self.user_id,
+                    "created_at": DateTimeUtils.get_current_utc_time(),
+                    "active": True,
+                    "channel_id": channel_id or None,
+                    "type_id": task_type_id,
+                    "level_id": level_id or None,
+                    "ig_id": ig_id or None,
+                    "org_id": org_id or None,
+                }))
+
+        _, serializer_failed = self.save_valid(TaskImportSerializer, entries)
+        return failed + serializer_failed
@@ -10,7 +10,7 @@ from rest_framework.views import APIView
 from db.user import ForgotPassword, User, UserRoleLink
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
-from utils.types import RoleType, WebHookActions, WebHookCategory
+from utils.types import CountMode, RoleType, WebHookActions, WebHookCategory
 from utils.utils import CommonUtils, DateTimeUtils, DiscordWebhooks, send_template_mail
 from . import dash_user_serializer
 
@@ -106,6 +106,9 @@ class UserAPI(APIView):
                 "karma": "wallet_user__karma",
                 "created_at": "created_at",
             },
+            keyset=True,
+            count=CountMode.ESTIMATED,
+            search_entity="user",
         )
         serializer = dash_user_serializer.UserDashboardSerializer(
             queryset.get("queryset"), many=True
@@ -125,11 +128,11 @@ class UserManagementCSV(APIView):
             "wallet_user", "user_lvl_link_user", "user_lvl_link_user__level"
         ).all()
 
-        serializer = dash_user_serializer.UserDashboardSerializer(
-            user_queryset, many=True
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_user_serializer.UserDashboardSerializer, user_queryset
         )
 
-        return CommonUtils.generate_csv(serializer.data, "User")
+        return CommonUtils.generate_csv(serializer_data, "User")
 
 
 class UserVerificationAPI(APIView):
@@ -158,6 +161,9 @@ class UserVerificationAPI(APIView):
                 "email": "user__email",
                 "mobile": "user__mobile",
             },
+            keyset=True,
+            count=CountMode.CACHED,
+            search_entity="user_role_link",
         )
         serializer = dash_user_serializer.UserVerificationSerializer(
             queryset.get("queryset"), many=True
@@ -218,10 +224,10 @@ class UserVerificationCSV(APIView):
             verified=False
         )
 
-        serializer = dash_user_serializer.UserVerificationSerializer(
-            user_queryset, many=True
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_user_serializer.UserVerificationSerializer, user_queryset
         )
-        return CommonUtils.generate_csv(serializer.data, "User")
+        return CommonUtils.generate_csv(serializer_data, "User")
 
 
 class ForgotPasswordAPI(APIView):
@@ -1,13 +1,12 @@
-from itertools import islice
-
-from django.db.models import Case, CharField, F, Sum, When
+from django.db.models import Case, CharField, F, When
 from rest_framework.views import APIView
 
-from db.organization import District, Organization, UserOrganizationLink
+from db.organization import District, Organization
 from db.task import Level, Wallet
 from db.user import User
 from utils.permission import CustomizePermission, JWTUtils, role_required
 from utils.response import CustomResponse
+from utils.org_karma_rank import org_karma_rollup
 from utils.types import OrganizationType, RoleType
 from utils.utils import CommonUtils
 from . import dash_zonal_helper, dash_zonal_serializer
@@ -37,33 +36,12 @@ class ZonalTopThreeDistrictAPI(APIView):
 
         user_org_link = dash_zonal_helper.get_user_college_link(user_id)
 
-        district_karma_dict = (
-            UserOrganizationLink.objects.filter(
-                org__org_type=OrganizationType.COLLEGE.value,
-                org__district__zone=user_org_link.org.district.zone,
-                verified=True,
-            )
-            .values("org__district")
-            .annotate(total_karma=Sum("user__wallet_user__karma"))
-        )
-
-        district_ranks = {
-            data["org__district"]: data["total_karma"]
-            if data["total_karma"] is not None
-            else 0
-            for data in district_karma_dict
-        }
-
-        district_ranks = dict(
-            sorted(district_ranks.items(), key=lambda x: x[1], reverse=True)
-        )
-
-        top_districts = dict(islice(district_ranks.items(), 3))
+        top_districts = org_karma_rollup.top_districts(user_org_link.org.district.zone_id, 3)
 
         org_user_district = District.objects.filter(id__in=top_districts).distinct()
 
         serializer = dash_zonal_serializer.ZonalTopThreeDistrictSerializer(
-            org_user_district, many=True, context={"ranks": district_ranks}
+            org_user_district, many=True, context={"ranks": top_districts}
         )
 
         return CustomResponse(response=serializer.data).get_success_response()
@@ -185,10 +163,10 @@ class ZonalStudentDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_zonal_serializer.ZonalStudentDetailsSerializer(
-            user_org_links, many=True, context={"ranks": ranks}
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_zonal_serializer.ZonalStudentDetailsSerializer, user_org_links, context={"ranks": ranks}
         )
-        return CommonUtils.generate_csv(serializer.data, "Zonal Student Details")
+        return CommonUtils.generate_csv(serializer_data, "Zonal Student Details")
 
 
 class ZonalCollegeDetailsAPI(APIView):
@@ -294,7 +272,7 @@ class ZonalCollegeDetailsCSVAPI(APIView):
             )
         )
 
-        serializer = dash_zonal_serializer.ZonalCollegeDetailsSerializer(
-            organizations, many=True, context={"leads": leads}
+        serializer_data = CommonUtils.serialize_in_chunks(
+            dash_zonal_serializer.ZonalCollegeDetailsSerializer, organizations, context={"leads": leads}
         )
-        return CommonUtils.generate_csv(serializer.data, "Zonal College Details")
+        return CommonUtils.generate_csv(serializer_data, "Zonal College Details")
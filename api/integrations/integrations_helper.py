@@ -3,11 +3,11 @@ from datetime import datetime, timedelta
 import decouple
 import jwt
 import pytz
-import requests
 
 from db.integrations import Integration
 from mulearnbackend.settings import SECRET_KEY
 from utils.exception import CustomException
+from utils.http_client import auth_client
 from utils.response import CustomResponse
 
 
@@ -106,7 +106,7 @@ def get_access_token(
     AUTH_DOMAIN = f"{decouple.config('AUTH_DOMAIN')}/api/v1/auth/"
 
     if password or email_or_muid:
-        response = requests.post(
+        response = auth_client.post(
             f"{AUTH_DOMAIN}user-authentication/",
             data={"emailOrMuid": email_or_muid, "password": password},
         ).json()
@@ -116,7 +116,7 @@ def get_access_token(
                 "Oops! The username or password didn't match our records. Please double-check and try again."
             )
     else:
-        response = requests.post(
+        response = auth_client.post(
             f"{AUTH_DOMAIN}token-verification/{token}/",
         ).json()
 
@@ -1,5 +1,6 @@
 import json
 from base64 import urlsafe_b64decode
+from collections import defaultdict
 from urllib.parse import parse_qs
 
 import requests
@@ -9,7 +10,9 @@ from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Util.Padding import unpad
 
 from db.integrations import Integration
+from db.task import UserIgKarma
 from utils.exception import CustomException
+from utils.http_client import kkem_client
 from utils.types import IntegrationType
 from utils.utils import send_template_mail
 
@@ -17,19 +20,20 @@ from utils.utils import send_template_mail
 def send_data_to_kkem(kkem_link):
     BASE_URL = kkem_link.integration.base_url
 
-    response = requests.post(
-        url=f"{BASE_URL}/MuLearn/api/update/muLearnId",
-        data=json.dumps(
-            {
-                "mu_id": kkem_link.user.muid,
-                "jsid": int(kkem_link.integration_value),
-                "email_id": kkem_link.user.email,
-            }
-        ),
-        headers={"Authorization": f"Bearer {kkem_link.integration.token}"},
-    )
-
-    response_data = response.json()
+    try:
+        response_data = kkem_client.post(
+            f"{BASE_URL}/MuLearn/api/update/muLearnId",
+            data=json.dumps(
+                {
+                    "mu_id": kkem_link.user.muid,
+                    "jsid": int(kkem_link.integration_value),
+                    "email_id": kkem_link.user.email,
+                }
+            ),
+            headers={"Authorization": f"Bearer {kkem_link.integration.token}"},
+        ).json()
+    except (requests.RequestException, ValueError) as e:
+        raise CustomException("KKEM is unavailable at the moment, please try again later") from e
 
     if not response_data["request_status"]:
         raise CustomException("Invalid jsid")
@@ -38,6 +42,19 @@ def send_data_to_kkem(kkem_link):
     return response_data
 
 
+def get_users_ig_karma(user_ids) -> dict:
+    """
+    Returns the interest group karma of the users as {user_id: {ig_id: karma}},
+    read from the user_ig_karma rollup.
+    """
+    ig_karma = defaultdict(dict)
+    for user_id, ig_id, karma in UserIgKarma.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "ig_id", "karma"
+    ):
+        ig_karma[user_id][ig_id] = karma
+    return ig_karma
+
+
 def decrypt_kkem_data(ciphertext):
     try:
         secret_key = Integration.objects.get(name=IntegrationType.KKEM.value).auth_token
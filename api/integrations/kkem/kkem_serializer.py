@@ -35,31 +35,15 @@ class KKEMUserSerializer(serializers.ModelSerializer):
         return karma
 
     def get_interest_groups(self, obj):
-        user_ig_links = obj.user_ig_link_user.all()
-
-        # Extract ig_ids for filtering KarmaActivityLog in one go
-        interest_groups = [ig_link.ig for ig_link in user_ig_links]
-
-        # Aggregate karma for each interest group in one query
-        aggregated_karma = obj.karma_activity_log_user.all()
-
-        aggregated_karma = [
-            {
-                "task__ig__id": karma.task.ig.id,
-                "task__ig__name": karma.task.ig.name,
-                "karma": karma.karma,
-            }
-            for karma in aggregated_karma
-            if hasattr(karma.task, "ig") and karma.task.ig
-        ]
-
-        ig_details = {ig.name: 0 for ig in interest_groups}
-
-        for karma in aggregated_karma:
-            ig_name = karma["task__ig__name"]
-            if ig_name in ig_details:
-                ig_details[ig_name] += karma["karma"]
-
+        # the bulk feed passes the karma of the whole page in the context
+        if (ig_karma := self.context.get("ig_karma")) is None:
+            ig_karma = kkem_helper.get_users_ig_karma([obj.id])
+        user_ig_karma = ig_karma.get(obj.id, {})
+
+        ig_details = {
+            ig_link.ig.name: user_ig_karma.get(ig_link.ig_id, 0)
+            for ig_link in obj.user_ig_link_user.all()
+        }
         return [{"name": key, "karma": value} for key, value in ig_details.items()]
 
     def get_jsid(self, obj):
@@ -1,5 +1,5 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 import requests
 from django.db.models import F, Prefetch
@@ -7,9 +7,10 @@ from rest_framework.views import APIView
 from db.hackathon import Hackathon
 
 from db.integrations import Integration, IntegrationAuthorization
-from db.task import InterestGroup, KarmaActivityLog, TaskList, UserIgLink
+from db.task import KarmaChangeFeed, UserIgLink
 from db.user import User
 from utils.exception import CustomException
+from utils.http_client import kkem_client
 from utils.response import CustomResponse
 from utils.types import IntegrationType
 from utils.utils import DateTimeUtils, send_template_mail
@@ -20,54 +21,103 @@ from .kkem_serializer import KKEMAuthorization, KKEMUserSerializer
 
 
 class KKEMBulkKarmaAPI(APIView):
+    """
+    Karma of the verified KKEM users, as a change feed.
+
+    Returns the users whose karma, interest groups or shared details changed
+    after `cursor` (or since `from_datetime`), oldest change first and at
+    most `limit` of them. `pagination.nextCursor` is the cursor of the next
+    call, so a sync only reads what changed since the previous one. Changes
+    younger than `FEED_LAG` are left for the next call.
+
+    A change gets its sequence number when it is written, not when its
+    transaction commits, so a long transaction can commit a change behind a
+    cursor that was already handed out. Every call with a cursor therefore
+    also returns the users changed behind it in the last `REREAD_WINDOW`;
+    callers upsert by jsid, so a user sent twice is harmless.
+
+    Without `limit` a call returns at most `DEFAULT_LIMIT` (500) users, so
+    callers that used to get every user in one response have to follow
+    `nextCursor` while `isNext` is true.
+    """
+
+    FEED_LAG = timedelta(seconds=5)
+    REREAD_WINDOW = timedelta(minutes=15)
+    DEFAULT_LIMIT = 500
+    MAX_LIMIT = 2000
+
     @integrations_helper.token_required(IntegrationType.KKEM.value)
     def get(self, request):
-        base_queryset = (
-            User.objects.filter(
-                integration_authorization_user__integration__name=IntegrationType.KKEM.value,
-                integration_authorization_user__verified=True,
-            )
-            .distinct()
-            .annotate(jsid=F("integration_authorization_user__integration_value"))
-            .select_related("wallet_user")
-            .prefetch_related(
-                Prefetch(
-                    "user_ig_link_user",
-                    queryset=UserIgLink.objects.select_related("ig"),
-                ),
-                Prefetch(
-                    "karma_activity_log_user",
-                    queryset=KarmaActivityLog.objects.filter(
-                        appraiser_approved=True
-                    ).prefetch_related(
-                        Prefetch(
-                            "task",
-                            queryset=TaskList.objects.all().prefetch_related(
-                                Prefetch("ig", queryset=InterestGroup.objects.all())
-                            ),
-                        )
-                    ),
-                ),
-            )
-            .distinct()
-        )
+        kkem_filter = {
+            "user__integration_authorization_user__integration__name": IntegrationType.KKEM.value,
+            "user__integration_authorization_user__verified": True,
+        }
+        now = DateTimeUtils.get_current_utc_time()
+        changes = KarmaChangeFeed.objects.filter(updated_at__lte=now - self.FEED_LAG, **kkem_filter)
+        late_changes = []
+
+        try:
+            cursor = int(request.GET.get("cursor") or 0)
+            limit = min(int(request.GET.get("limit") or self.DEFAULT_LIMIT), self.MAX_LIMIT)
+        except ValueError:
+            return CustomResponse(
+                general_message="Invalid cursor or limit",
+            ).get_failure_response()
 
-        if from_datetime_str := request.GET.get("from_datetime"):
+        if cursor:
+            late_changes = list(
+                changes.filter(seq__lte=cursor, updated_at__gte=now - self.REREAD_WINDOW)
+                .order_by("seq")
+                .values_list("user_id", flat=True)
+                .distinct()[:limit]
+            )
+            changes = changes.filter(seq__gt=cursor)
+        elif from_datetime_str := request.GET.get("from_datetime"):
             try:
                 from_datetime = datetime.strptime(
                     from_datetime_str, "%Y-%m-%dT%H:%M:%S"
-                )
-                base_queryset = base_queryset.filter(
-                    karma_activity_log_user__updated_at__gte=from_datetime
-                )
-            except CustomException:
+                ).replace(tzinfo=timezone.utc)
+            except ValueError:
                 return CustomResponse(
                     general_message="Invalid datetime format",
                 ).get_failure_response()
+            changes = changes.filter(updated_at__gte=from_datetime)
 
-        serialized_users = KKEMUserSerializer(base_queryset, many=True)
+        changes = list(
+            changes.order_by("seq").values_list("seq", "user_id").distinct()[: limit + 1]
+        )
+        is_next = len(changes) > limit
+        changes = changes[:limit]
+        user_ids = list(dict.fromkeys([*late_changes, *(user_id for _, user_id in changes)]))
+
+        users = {
+            user.id: user
+            for user in User.objects.filter(
+                id__in=user_ids,
+                integration_authorization_user__integration__name=IntegrationType.KKEM.value,
+                integration_authorization_user__verified=True,
+            )
+            .annotate(jsid=F("integration_authorization_user__integration_value"))
+            .select_related("wallet_user")
+            .prefetch_related(
+                Prefetch("user_ig_link_user", queryset=UserIgLink.objects.select_related("ig"))
+            )
+        }
+        serialized_users = KKEMUserSerializer(
+            [users[user_id] for user_id in user_ids if user_id in users],
+            many=True,
+            context={"ig_karma": kkem_helper.get_users_ig_karma(user_ids)},
+        )
 
-        return CustomResponse(response=serialized_users.data).get_success_response()
+        return CustomResponse(
+            response={
+                "data": serialized_users.data,
+                "pagination": {
+                    "nextCursor": str(changes[-1][0]) if changes else (str(cursor) if cursor else None),
+                    "isNext": is_next,
+                },
+            }
+        ).get_success_response()
 
 
 class KKEMIndividualKarmaAPI(APIView):
@@ -80,6 +130,9 @@ class KKEMIndividualKarmaAPI(APIView):
                 muid=muid,
             )
             .annotate(jsid=F("integration_authorization_user__integration_value"))
+            .prefetch_related(
+                Prefetch("user_ig_link_user", queryset=UserIgLink.objects.select_related("ig"))
+            )
             .first()
         )
 
@@ -197,12 +250,11 @@ class KKEMdetailsFetchAPI(APIView):
             integration = Integration.objects.get(name=IntegrationType.KKEM.value)
             token, BASE_URL = integration.token, integration.base_url
 
-            response = requests.post(
-                url=f"{BASE_URL}/MuLearn/api/jobseeker-details",
+            response_data = kkem_client.post(
+                f"{BASE_URL}/MuLearn/api/jobseeker-details",
                 data=f'{{"job_seeker_id": {jsid}}}',
                 headers={"Authorization": f"Bearer {token}"},
-            )
-            response_data = response.json()
+            ).json()
 
             if "response" in response_data:
                 response_data = response_data["response"]
@@ -218,6 +270,11 @@ class KKEMdetailsFetchAPI(APIView):
 
             return CustomResponse(response=result_data).get_success_response()
 
+        except (requests.RequestException, ValueError):
+            return CustomResponse(
+                general_message="KKEM is unavailable at the moment, please try again later"
+            ).get_failure_response()
+
         except CustomException as e:
             return CustomResponse(general_message=str(e)).get_failure_response()
 
@@ -1,6 +1,8 @@
 import json
+import redis
 import requests
 
+from utils.http_client import TokenCache, wadhwani_client
 from utils.response import CustomResponse
 from utils.permission import JWTUtils
 from db.user import User
@@ -9,131 +11,153 @@ from rest_framework.views import APIView
 from django.conf import settings
 
 
-class WadhwaniAuthToken(APIView):
-    def post(self, request):
-        url = settings.WADHWANI_CLIENT_AUTH_URL
-
-        data = {
+def fetch_client_token():
+    response = wadhwani_client.post(
+        settings.WADHWANI_CLIENT_AUTH_URL,
+        data={
             "grant_type": "client_credentials",
             "client_id": "mulearn",
             "client_secret": settings.WADHWANI_CLIENT_SECRET,
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        response = requests.post(url, data=data, headers=headers)
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    return response.json()
+
+
+client_token = TokenCache("wadhwani", fetch_client_token)
+
+
+def wadhwani_request(method, path, **kwargs):
+    """
+    Calls Wadhwani with the cached client token, minting a new token once if
+    the cached one was rejected.
+    """
+    url = settings.WADHWANI_BASE_URL + path
+    headers = kwargs.pop("headers", {})
+    response = wadhwani_client.request(
+        method, url, headers={**headers, "Authorization": client_token.get()}, **kwargs
+    )
+    if response.status_code == 401:
+        client_token.invalidate()
+        response = wadhwani_client.request(
+            method, url, headers={**headers, "Authorization": client_token.get()}, **kwargs
+        )
+    return response.json()
+
+
+def upstream_failure():
+    return CustomResponse(
+        general_message="Wadhwani is unavailable at the moment, please try again later"
+    ).get_failure_response()
+
 
-        if response.json().get("error", None):
+class WadhwaniAuthToken(APIView):
+    def post(self, request):
+        # the client token stays on the server, this only checks that it can be minted
+        try:
+            client_token.get()
+        except (requests.RequestException, redis.RedisError, ValueError):
             return CustomResponse(
-                general_message="Invalid credentials", response=response.json()
+                general_message="Invalid credentials"
             ).get_failure_response()
-        return CustomResponse(response=response.json()).get_success_response()
+        return CustomResponse(general_message="Token is ready").get_success_response()
 
 
 class WadhwaniUserLogin(APIView):
     def post(self, request):
-        url = settings.WADHWANI_BASE_URL + "/api/v1/iamservice/oauth/login"
         user_id = JWTUtils.fetch_user_id(request)
         user = User.objects.get(id=user_id)
-        if not (token := request.data.get("Client-Auth-Token", None)):
-            return CustomResponse(
-                general_message="Token is required"
-            ).get_failure_response()
 
         if not (course_root_id := request.data.get("course_root_id", None)):
             return CustomResponse(
                 general_message="Course Root ID is required"
             ).get_failure_response()
 
-        headers = {"Content-Type": "application/json"}
-        data = json.dumps(
-            {
-                "name": user.full_name,
-                "candidateId": user.id,
-                "userName": user.email,
-                "email": user.email,
-                "mobile": f"+91-{user.mobile}",
-                "countryCode": "IN",
-                "userLanguageCode": "en",
-                "token": token,
-                "courseRootId": course_root_id,
-            }
-        )
-        response = requests.post(url, headers=headers, data=data)
-
-        if response.json().get("status", None) == "ERROR":
+        try:
+            response = wadhwani_client.post(
+                settings.WADHWANI_BASE_URL + "/api/v1/iamservice/oauth/login",
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(
+                    {
+                        "name": user.full_name,
+                        "candidateId": user.id,
+                        "userName": user.email,
+                        "email": user.email,
+                        "mobile": f"+91-{user.mobile}",
+                        "countryCode": "IN",
+                        "userLanguageCode": "en",
+                        "token": client_token.get(),
+                        "courseRootId": course_root_id,
+                    }
+                ),
+            ).json()
+        except (requests.RequestException, redis.RedisError, ValueError):
+            return upstream_failure()
+
+        if response.get("status", None) == "ERROR":
             return CustomResponse(
-                general_message="Something went wrong", response=response.json()
+                general_message="Something went wrong", response=response
             ).get_failure_response()
-        if response.json().get("status", None) == "FAILURE":
+        if response.get("status", None) == "FAILURE":
             return CustomResponse(
-                general_message="Invalid Input", response=response.json()
+                general_message="Invalid Input", response=response
             ).get_failure_response()
-        return CustomResponse(response=response.json()).get_success_response()
+        return CustomResponse(response=response).get_success_response()
 
 
 class WadhwaniCourseDetails(APIView):
     def post(self, request):
-        url = settings.WADHWANI_BASE_URL + "/api/v1/courseservice/oauth/client/courses"
+        try:
+            response = wadhwani_request("GET", "/api/v1/courseservice/oauth/client/courses")
+        except (requests.RequestException, redis.RedisError, ValueError):
+            return upstream_failure()
 
-        if not (token := request.data.get("Client-Auth-Token", None)):
+        if response.get("status", None) == "ERROR":
             return CustomResponse(
-                general_message="Token is required"
+                general_message="No courses available", response=response
             ).get_failure_response()
-
-        headers = {"Authorization": token}
-        response = requests.get(url, headers=headers)
-
-        if response.json().get("status", None) == "ERROR":
-            return CustomResponse(
-                general_message="No courses available", response=response.json()
-            ).get_failure_response()
-        return CustomResponse(response=response.json()).get_success_response()
+        return CustomResponse(response=response).get_success_response()
 
 
 class WadhwaniCourseEnrollStatus(APIView):
     def post(self, request):
-        url = settings.WADHWANI_BASE_URL + "/api/v1/courseservice/oauth/client/courses"
         user_id = JWTUtils.fetch_user_id(request)
         user = User.objects.get(id=user_id)
 
-        if not (token := request.data.get("Client-Auth-Token", None)):
-            return CustomResponse(
-                general_message="Token is required"
-            ).get_failure_response()
-
-        headers = {"Authorization": token}
-        response = requests.get(url, params={"username": user.email}, headers=headers)
+        try:
+            response = wadhwani_request(
+                "GET", "/api/v1/courseservice/oauth/client/courses", params={"username": user.email}
+            )
+        except (requests.RequestException, redis.RedisError, ValueError):
+            return upstream_failure()
 
-        if response.json().get("status", None) == "ERROR":
+        if response.get("status", None) == "ERROR":
             return CustomResponse(
                 general_message="User doesn't have any enrolled courses",
-                response=response.json(),
+                response=response,
             ).get_failure_response()
-        return CustomResponse(response=response.json()).get_success_response()
+        return CustomResponse(response=response).get_success_response()
 
 
 class WadhwaniCourseQuizData(APIView):
     def post(self, request):
-        if not (token := request.data.get("Client-Auth-Token", None)):
-            return CustomResponse(
-                general_message="Token is required"
-            ).get_failure_response()
-
         if not (course_id := request.data.get("course_id", None)):
             return CustomResponse(
                 general_message="Course ID is required"
             ).get_failure_response()
 
-        headers = {"Authorization": token}
         user_id = JWTUtils.fetch_user_id(request)
         user = User.objects.get(id=user_id)
-        url = (
-            settings.WADHWANI_BASE_URL
-            + f"/api/v1/courseservice/oauth/course/{course_id}/reports/quiz/student/{user.email}"
-        )
-        response = requests.get(url, headers=headers)
 
-        if response.json().get("status", None) == "ERROR":
+        try:
+            response = wadhwani_request(
+                "GET", f"/api/v1/courseservice/oauth/course/{course_id}/reports/quiz/student/{user.email}"
+            )
+        except (requests.RequestException, redis.RedisError, ValueError):
+            return upstream_failure()
+
+        if response.get("status", None) == "ERROR":
             return CustomResponse(
-                general_message="No quiz data available", response=response.json()
+                general_message="No quiz data available", response=response
             ).get_failure_response()
-        return CustomResponse(response=response.json()).get_success_response()
+        return CustomResponse(response=response).get_success_response()
@@ -1,7 +1,8 @@
-from django.db.models import Sum, Max, Prefetch, F, OuterRef, Subquery, IntegerField, Count, Q
+from django.db.models import Prefetch, F, Count, Q
 
 from rest_framework.views import APIView
 
+from api.leaderboard.event_leaderboard import event_leaderboards
 from utils.permission import JWTUtils, role_required
 from utils.types import RoleType
 from .serializers import LaunchpadLeaderBoardSerializer, LaunchpadParticipantsSerializer, CollegeDataSerializer, \
@@ -10,52 +11,60 @@ from utils.response import CustomResponse
 from utils.utils import CommonUtils
 from db.user import User, UserRoleLink
 from db.organization import UserOrganizationLink, Organization
-from db.task import KarmaActivityLog
 
+LAUNCHPAD_EVENT = "launchpad"
+allowed_org_types = ["College", "School", "Company"]
+allowed_levels = [
+    "IEEE Launchpad Level 1",
+    "IEEE Launchpad Level 2",
+    "IEEE Launchpad Level 3",
+    "IEEE Launchpad Level 4"
+]
+
+
+def get_participants():
+    """
+    Qualified launchpad users holding a launchpad level role, annotated with
+    their organisation and level.
+    """
+    return User.objects.filter(
+        id__in=event_leaderboards.qualified_user_ids(LAUNCHPAD_EVENT),
+        user_organization_link_user__org__org_type__in=allowed_org_types,
+        user_role_link_user__verified=True,
+        user_role_link_user__role__title__in=allowed_levels,
+    ).annotate(
+        org=F("user_organization_link_user__org__title"),
+        district_name=F("user_organization_link_user__org__district__name"),
+        state=F("user_organization_link_user__org__district__zone__state__name"),
+        level=F("user_role_link_user__role__title"),
+    ).distinct()
 
 
 class Leaderboard(APIView):
     def get(self, request):
-        total_karma_subquery = KarmaActivityLog.objects.filter(
-            user=OuterRef('id'),
-            task__event='launchpad',
-            appraiser_approved=True,
-        ).values('user').annotate(
-            total_karma=Sum('karma')
-        ).values('total_karma')
-        allowed_org_types = ["College", "School", "Company"]
-
-        intro_task_completed_users = KarmaActivityLog.objects.filter(
-            task__event='launchpad',
-            appraiser_approved=True,
-            task__hashtag='#lp24-introduction',
-        ).values('user')
-        
-        users = User.objects.filter(
-            karma_activity_log_user__task__event="launchpad",
-            karma_activity_log_user__appraiser_approved=True,
-            id__in=intro_task_completed_users
-        ).prefetch_related(
+        # searching the organisation fields joins every org link of the user
+        rows = event_leaderboards.rows(LAUNCHPAD_EVENT).select_related(
+            "user__wallet_user"
+        ).distinct().prefetch_related(
             Prefetch(
-                "user_organization_link_user",
-                queryset=UserOrganizationLink.objects.filter(org__org_type__in=allowed_org_types),
+                "user__user_organization_link_user",
+                queryset=UserOrganizationLink.objects.filter(
+                    org__org_type__in=allowed_org_types
+                ).select_related("org__district__zone__state"),
+                to_attr="orgs",
             )
-        ).filter(
-            user_organization_link_user__id__in=UserOrganizationLink.objects.filter(
-                org__org_type__in=allowed_org_types
-            ).values("id")
-        ).annotate(
-            karma=Subquery(total_karma_subquery, output_field=IntegerField()),
-            org=F("user_organization_link_user__org__title"),
-            district_name=F("user_organization_link_user__org__district__name"),
-            state=F("user_organization_link_user__org__district__zone__state__name"),
-            time_=Max("karma_activity_log_user__created_at"),
-        ).order_by("-karma", "time_")
+        )
 
         paginated_queryset = CommonUtils.get_paginated_queryset(
-            users,
+            rows,
             request,
-            ["full_name", "karma", "org", "district_name", "state"]
+            [
+                "user__full_name",
+                "karma",
+                "user__user_organization_link_user__org__title",
+                "user__user_organization_link_user__org__district__name",
+                "user__user_organization_link_user__org__district__zone__state__name",
+            ]
         )
 
         serializer = LaunchpadLeaderBoardSerializer(
@@ -68,49 +77,8 @@ class Leaderboard(APIView):
 
 class ListParticipantsAPI(APIView):
     def get(self, request):
-        allowed_org_types = ["College", "School", "Company"]
-        allowed_levels = [
-            "IEEE Launchpad Level 1",
-            "IEEE Launchpad Level 2",
-            "IEEE Launchpad Level 3",
-            "IEEE Launchpad Level 4"
-        ]
-
-        intro_task_completed_users = KarmaActivityLog.objects.filter(
-            task__event='launchpad',
-            appraiser_approved=True,
-            task__hashtag='#lp24-introduction',
-        ).values('user')
-
-        users = User.objects.filter(
-            karma_activity_log_user__task__event="launchpad",
-            karma_activity_log_user__appraiser_approved=True,
-            id__in=intro_task_completed_users
-        ).prefetch_related(
-            Prefetch(
-                "user_organization_link_user",
-                queryset=UserOrganizationLink.objects.filter(org__org_type__in=allowed_org_types),
-            ),
-            Prefetch(
-                "user_role_link_user",
-                queryset=UserRoleLink.objects.filter(verified=True, role__title__in=allowed_levels).select_related('role')
-            )
-        ).filter(
-            user_organization_link_user__id__in=UserOrganizationLink.objects.filter(
-                org__org_type__in=allowed_org_types
-            ).values("id")
-        ).annotate(
-            org=F("user_organization_link_user__org__title"),
-            district_name=F("user_organization_link_user__org__district__name"),
-            state=F("user_organization_link_user__org__district__zone__state__name"),
-            level=F("user_role_link_user__role__title"),
-            time_=Max("karma_activity_log_user__created_at"),
-        ).filter(
-            level__in=allowed_levels
-        ).distinct()
-
         paginated_queryset = CommonUtils.get_paginated_queryset(
-            users,
+            get_participants(),
             request,
             ["full_name", "level", "org", "district_name", "state"]
         )
@@ -125,69 +93,24 @@ class ListParticipantsAPI(APIView):
 
 class LaunchpadDetailsCount(APIView):
     def get(self, request):
-        allowed_org_types = ["College", "School", "Company"]
-        allowed_levels = [
-            "IEEE Launchpad Level 1",
-            "IEEE Launchpad Level 2",
-            "IEEE Launchpad Level 3",
-            "IEEE Launchpad Level 4"
-        ]
-
-        intro_task_completed_users = KarmaActivityLog.objects.filter(
-            task__event='launchpad',
-            appraiser_approved=True,
-            task__hashtag='#lp24-introduction',
-        ).values('user')
-
-        users = User.objects.filter(
-            karma_activity_log_user__task__event="launchpad",
-            karma_activity_log_user__appraiser_approved=True,
-            id__in=intro_task_completed_users
-        ).prefetch_related(
-            Prefetch(
-                "user_organization_link_user",
-                queryset=UserOrganizationLink.objects.filter(org__org_type__in=allowed_org_types),
-            ),
-            Prefetch(
-                "user_role_link_user",
-                queryset=UserRoleLink.objects.filter(verified=True,
-                                                     role__title__in=allowed_levels).select_related('role')
-            )
-        ).filter(
-            user_organization_link_user__id__in=UserOrganizationLink.objects.filter(
-                org__org_type__in=allowed_org_types
-            ).values("id")
-        ).annotate(
-            org=F("user_organization_link_user__org__title"),
-            district_name=F("user_organization_link_user__org__district__name"),
-            state=F("user_organization_link_user__org__district__zone__state__name"),
-            level=F("user_role_link_user__role__title"),
-            time_=Max("karma_activity_log_user__created_at"),
-        ).filter(
-            level__in=allowed_levels
-        ).distinct()
-
         # Count participants at each level
-        level_counts = {
-            "total_participants": users.count(),
-            "Level_1": users.filter(level="IEEE Launchpad Level 1").count(),
-            "Level_2": users.filter(level="IEEE Launchpad Level 2").count(),
-            "Level_3": users.filter(level="IEEE Launchpad Level 3").count(),
-            "Level_4": users.filter(level="IEEE Launchpad Level 4").count(),
-        }
+        level_counts = UserRoleLink.objects.filter(
+            user__in=get_participants().values("id"),
+            verified=True,
+            role__title__in=allowed_levels,
+        ).aggregate(
+            total_participants=Count("user", distinct=True),
+            **{
+                f"Level_{number}": Count("user", distinct=True, filter=Q(role__title=level))
+                for number, level in enumerate(allowed_levels, start=1)
+            },
+        )
 
         return CustomResponse(response=level_counts).get_success_response()
 
 
 class CollegeData(APIView):
     def get(self, request):
-        allowed_levels = [
-            "IEEE Launchpad Level 1",
-            "IEEE Launchpad Level 2",
-            "IEEE Launchpad Level 3",
-            "IEEE Launchpad Level 4"
-        ]
-        
         org = Organization.objects.filter(
             org_type="College",
         ).prefetch_related(
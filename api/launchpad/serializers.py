@@ -1,68 +1,40 @@
 import uuid
 
-from django.db.models import Sum, Max, Prefetch, F, OuterRef, Subquery, IntegerField
-
 from rest_framework import serializers
 
+from db.leaderboard import EventLeaderboard
 from db.user import User
-from db.organization import UserOrganizationLink, Organization, LaunchpadClgUserLink, College
-from db.task import KarmaActivityLog
+from db.organization import Organization, LaunchpadClgUserLink
 
 
 class LaunchpadLeaderBoardSerializer(serializers.ModelSerializer):
-    rank = serializers.SerializerMethodField()
-    karma = serializers.IntegerField()
-    actual_karma = serializers.IntegerField(source="wallet_user.karma", default=None)
-    org = serializers.CharField()
-    district_name = serializers.CharField()
-    state = serializers.CharField()
+    full_name = serializers.CharField(source="user.full_name")
+    actual_karma = serializers.IntegerField(source="user.wallet_user.karma", default=None)
+    org = serializers.SerializerMethodField()
+    district_name = serializers.SerializerMethodField()
+    state = serializers.SerializerMethodField()
 
     class Meta:
-        model = User
+        model = EventLeaderboard
         fields = ("rank", "full_name", "actual_karma", "karma", "org", "district_name", "state")
 
-    def get_rank(self, obj):
-        total_karma_subquery = KarmaActivityLog.objects.filter(
-            user=OuterRef('id'),
-            task__event='launchpad',
-            appraiser_approved=True,
-        ).values('user').annotate(
-            total_karma=Sum('karma')
-        ).values('total_karma')
-        allowed_org_types = ["College", "School", "Company"]
-
-        intro_task_completed_users = KarmaActivityLog.objects.filter(
-            task__event='launchpad',
-            appraiser_approved=True,
-            task__hashtag='#lp24-introduction',
-        ).values('user')
-        
-        users = User.objects.filter(
-            karma_activity_log_user__task__event="launchpad",
-            karma_activity_log_user__appraiser_approved=True,
-            id__in=intro_task_completed_users
-        ).prefetch_related(
-            Prefetch(
-                "user_organization_link_user",
-                queryset=UserOrganizationLink.objects.filter(org__org_type__in=allowed_org_types),
-            )
-        ).filter(
-            user_organization_link_user__id__in=UserOrganizationLink.objects.filter(
-                org__org_type__in=allowed_org_types
-            ).values("id")
-        ).annotate(
-            karma=Subquery(total_karma_subquery, output_field=IntegerField()),
-            time_=Max("karma_activity_log_user__created_at"),
-        ).order_by("-karma", "time_")
-        
-        # high complexity
-        rank = 0
-        for data in users:
-            rank += 1
-            if data.id == obj.id:
-                break    
-        
-        return rank
+    @staticmethod
+    def get_org_link(obj):
+        # the College/School/Company link prefetched by the view
+        return next(iter(obj.user.orgs), None)
+
+    def get_org(self, obj):
+        link = self.get_org_link(obj)
+        return link.org.title if link else None
+
+    def get_district_name(self, obj):
+        link = self.get_org_link(obj)
+        return link.org.district.name if link and link.org.district else None
+
+    def get_state(self, obj):
+        link = self.get_org_link(obj)
+        district = link.org.district if link else None
+        return district.zone.state.name if district else None
 
 
 class LaunchpadParticipantsSerializer(serializers.ModelSerializer):
@@ -0,0 +1,179 @@
+import logging
+import time
+
+import redis
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from db.leaderboard import EventLeaderboard
+from utils.types import OrganizationType
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class EventBoard:
+    """
+    Leaderboard of one `TaskList.event`.
+
+    Attributes:
+        event (str): The `TaskList.event` whose approved karma is ranked.
+        qualifying_hashtags (tuple): A user is only ranked once a task with one of
+            these hashtags was approved for them; empty ranks every user.
+        org_types (tuple): A user is only ranked when linked to an organisation of
+            one of these types; empty ranks every user.
+    """
+
+    def __init__(self, event: str, qualifying_hashtags=(), org_types=()):
+        self.event = event
+        self.qualifying_hashtags = tuple(qualifying_hashtags)
+        self.org_types = tuple(org_types)
+
+
+class EventLeaderboardEngine:
+    """
+    Serves event leaderboards from the `event_leaderboard` table.
+
+    Totals and the tie break time (latest approved log) are kept per event and
+    user by the alter-1.56 triggers when karma is approved. The engine stores
+    whether each row qualifies for its board and its dense rank, ordered by
+    karma and then by who got there first.
+
+    Ranks are recomputed when the version of the event, bumped by the
+    alter-1.60 triggers on every change to its totals, moved, checked at most
+    every `CHECK_INTERVAL` seconds per process, and at least every
+    `RERANK_INTERVAL` seconds to pick up organisation links and suspensions,
+    which leave no trace in the table.
+    """
+
+    KEY_PREFIX = "event_leaderboard"
+    CHECK_INTERVAL = 10
+    RERANK_INTERVAL = 3600
+
+    boards = {
+        board.event: board
+        for board in (
+            EventBoard(
+                "launchpad",
+                qualifying_hashtags=["#lp24-introduction"],
+                org_types=[
+                    OrganizationType.COLLEGE.value,
+                    OrganizationType.SCHOOL.value,
+                    OrganizationType.COMPANY.value,
+                ],
+            ),
+            EventBoard("TOP100", qualifying_hashtags=["#thc-realworld-problem-proposal"]),
+        )
+    }
+
+    def __init__(self):
+        self._checked_at = {}
+
+    def key(self, *parts) -> str:
+        return ":".join((self.KEY_PREFIX, *parts))
+
+    def rows(self, event: str) -> QuerySet:
+        """
+        Returns the ranked rows of the event, best first.
+        """
+        self.ensure_ranked(event)
+        return (
+            EventLeaderboard.objects.filter(event=event, qualified=True)
+            .select_related("user")
+            .order_by("rank", "user_id")
+        )
+
+    def qualified_user_ids(self, event: str) -> QuerySet:
+        self.ensure_ranked(event)
+        return EventLeaderboard.objects.filter(event=event, qualified=True).values("user_id")
+
+    @staticmethod
+    def signature(event: str) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT version FROM event_leaderboard_version WHERE event = %s", [event])
+            row = cursor.fetchone()
+        return str(row[0] if row else 0)
+
+    def ensure_ranked(self, event: str):
+        now = time.monotonic()
+        if now - self._checked_at.get(event, 0) < self.CHECK_INTERVAL:
+            return
+        self._checked_at[event] = now
+
+        try:
+            client = RedisUtils.get_client()
+            ranked = client.hgetall(self.key(event))
+            signature = self.signature(event)
+            if ranked.get("signature") == signature and time.time() - float(
+                ranked.get("ranked_at", 0)
+            ) < self.RERANK_INTERVAL:
+                return
+
+            lock = client.lock(self.key(event, "lock"), timeout=120, blocking_timeout=0)
+            if not lock.acquire():
+                # another process is ranking, the current ranks are served meanwhile
+                return
+            try:
+                self.rank(event)
+                client.hset(
+                    self.key(event), mapping={"signature": signature, "ranked_at": time.time()}
+                )
+            finally:
+                lock.release()
+        except redis.RedisError as e:
+            logger.warning(f"Event leaderboard rank check failed: {e}")
+
+    def rank(self, event: str):
+        """
+        Recomputes which rows of the event qualify and their dense rank.
+        """
+        board = self.boards.get(event, EventBoard(event))
+        conditions = ["u.suspended_at IS NULL", "u.suspended_by IS NULL"]
+        params = []
+        if board.qualifying_hashtags:
+            conditions.append(f"""
+                EXISTS (
+                    SELECT 1 FROM karma_activity_log kal
+                    JOIN task_list t ON t.id = kal.task_id
+                    WHERE kal.user_id = el.user_id AND kal.appraiser_approved = 1
+                      AND t.hashtag IN ({', '.join(['%s'] * len(board.qualifying_hashtags))})
+                )
+            """)
+            params.extend(board.qualifying_hashtags)
+        if board.org_types:
+            conditions.append(f"""
+                EXISTS (
+                    SELECT 1 FROM user_organization_link uol
+                    JOIN organization o ON o.id = uol.org_id
+                    WHERE uol.user_id = el.user_id
+                      AND o.org_type IN ({', '.join(['%s'] * len(board.org_types))})
+                )
+            """)
+            params.extend(board.org_types)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE event_leaderboard el
+                JOIN user u ON u.id = el.user_id
+                SET el.qualified = ({' AND '.join(conditions)})
+                WHERE el.event = %s
+                """,
+                [*params, event],
+            )
+            cursor.execute(
+                """
+                UPDATE event_leaderboard el
+                LEFT JOIN (
+                    SELECT id, DENSE_RANK() OVER (ORDER BY karma DESC, last_karma_at) AS event_rank
+                    FROM event_leaderboard
+                    WHERE event = %s AND qualified = 1
+                ) ranked ON ranked.id = el.id
+                SET el.event_rank = ranked.event_rank
+                WHERE el.event = %s
+                """,
+                [event, event],
+            )
+
+
+event_leaderboards = EventLeaderboardEngine()
@@ -0,0 +1,389 @@
+import datetime
+import logging
+from datetime import timedelta
+
+import pytz
+import redis
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Prefetch, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from db.leaderboard import LeaderboardSnapshot
+from db.organization import Organization, UserOrganizationLink
+from db.task import KarmaActivityLog, Wallet
+from db.user import User
+from utils.types import OrganizationType, RoleType
+from utils.utils import DateTimeUtils, RedisUtils
+
+from . import serializers
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME = "all"
+
+
+def month_period(date_time: datetime.datetime) -> str:
+    return date_time.strftime("%Y-%m")
+
+
+def period_range(period: str):
+    """
+    Returns the [start, end) datetime range covered by a 'YYYY-MM' period.
+    """
+    start = datetime.datetime.strptime(period, "%Y-%m").replace(tzinfo=pytz.UTC)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+class Board:
+    """
+    A leaderboard whose ranked rows are stored in a snapshot.
+
+    Every row carries a ``key`` identifying the user or organisation it was
+    computed for, so that a refresh only has to recompute the rows of keys
+    touched since the last snapshot.
+
+    Attributes:
+        name (str): Snapshot board name.
+        monthly (bool): Whether the board is computed per calendar month.
+        keep (int): Number of ranked rows kept in the snapshot, None keeps all.
+        size (int): Number of ranked rows served, None serves all.
+        source: Model whose ``updated_at`` drives incremental refreshes.
+    """
+
+    name = None
+    monthly = False
+    keep = None
+    size = None
+    source = KarmaActivityLog
+
+    def rows(self, period: str, keys=None) -> list:
+        raise NotImplementedError
+
+    def touched_user_ids(self, period: str, since):
+        changed = self.source.objects.filter(updated_at__gte=since)
+        if self.monthly:
+            changed = changed.filter(created_at__range=period_range(period))
+        return set(changed.values_list("user_id", flat=True))
+
+    def touched(self, period: str, since) -> set:
+        return self.touched_user_ids(period, since)
+
+    def watermark(self):
+        return self.source.objects.aggregate(watermark=Max("updated_at"))["watermark"]
+
+    def college_ids(self, user_ids) -> set:
+        return set(
+            UserOrganizationLink.objects.filter(
+                user_id__in=user_ids, org__org_type=OrganizationType.COLLEGE.value
+            ).values_list("org_id", flat=True)
+        )
+
+    def render(self, rows: list) -> list:
+        rows = rows if self.size is None else rows[: self.size]
+        return [{k: v for k, v in row.items() if k != "key"} for row in rows]
+
+
+class StudentsBoard(Board):
+    name = "students"
+    keep = 100
+    size = 20
+    source = Wallet
+
+    def rows(self, period, keys=None):
+        students = (
+            User.objects.filter(
+                user_organization_link_user__org__org_type=OrganizationType.COLLEGE.value,
+                user_role_link_user__role__title=RoleType.STUDENT.value,
+                exist_in_guild=True,
+            )
+            .distinct()
+            .select_related("wallet_user")
+            .prefetch_related(
+                Prefetch(
+                    "user_organization_link_user",
+                    queryset=UserOrganizationLink.objects.filter(
+                        org__org_type=OrganizationType.COLLEGE.value
+                    ).select_related("org"),
+                    to_attr="colleges",
+                )
+            )
+            .order_by("-wallet_user__karma")
+        )
+        if keys is not None:
+            students = students.filter(id__in=keys)
+        elif self.keep is not None:
+            students = students[: self.keep]
+
+        return [
+            {"key": student.id, **serializers.StudentLeaderboardSerializer(student).data}
+            for student in students
+        ]
+
+
+class StudentsMonthlyBoard(Board):
+    name = "students-monthly"
+    monthly = True
+
+    def rows(self, period, keys=None):
+        start_date, end_date = period_range(period)
+        students = User.objects.filter(
+            user_role_link_user__role__title=RoleType.STUDENT.value,
+            user_organization_link_user__org__org_type=OrganizationType.COLLEGE.value,
+            exist_in_guild=True,
+        )
+        if keys is not None:
+            students = students.filter(id__in=keys)
+
+        return list(
+            students.annotate(
+                key=F("id"),
+                institution=F("user_organization_link_user__org__title"),
+                total_karma=Coalesce(
+                    Sum(
+                        "karma_activity_log_user__karma",
+                        filter=Q(
+                            karma_activity_log_user__created_at__gte=start_date,
+                            karma_activity_log_user__created_at__lt=end_date,
+                        ),
+                    ),
+                    Value(0),
+                ),
+            )
+            .values("key", "full_name", "total_karma", "institution")
+            .order_by("-total_karma")
+        )
+
+
+class CollegeBoard(Board):
+    name = "college"
+    size = 20
+    source = Wallet
+
+    def touched(self, period, since):
+        return self.college_ids(self.touched_user_ids(period, since))
+
+    def rows(self, period, keys=None):
+        colleges = Organization.objects.filter(
+            org_type=OrganizationType.COLLEGE.value,
+            user_organization_link_org__user__user_role_link_user__role__title=RoleType.STUDENT.value,
+            user_organization_link_org__user__exist_in_guild=True,
+        )
+        if keys is not None:
+            colleges = colleges.filter(id__in=keys)
+
+        return list(
+            colleges.distinct()
+            .annotate(
+                key=F("id"),
+                total_students=Count("user_organization_link_org__user"),
+                total_karma=Sum("user_organization_link_org__user__wallet_user__karma"),
+            )
+            .values("key", "code", "title", "total_students", "total_karma")
+            .order_by("-total_karma")
+        )
+
+
+class CollegeMonthlyBoard(Board):
+    name = "college-monthly"
+    monthly = True
+    size = 20
+
+    def touched(self, period, since):
+        return self.college_ids(self.touched_user_ids(period, since))
+
+    def rows(self, period, keys=None):
+        start_date, end_date = period_range(period)
+        colleges = Organization.objects.filter(
+            org_type=OrganizationType.COLLEGE.value,
+            user_organization_link_org__user__karma_activity_log_user__created_at__gte=start_date,
+            user_organization_link_org__user__karma_activity_log_user__created_at__lt=end_date,
+            user_organization_link_org__user__karma_activity_log_user__appraiser_approved=True,
+        )
+        if keys is not None:
+            colleges = colleges.filter(id__in=keys)
+
+        return list(
+            colleges.annotate(
+                key=F("id"),
+                total_karma=Coalesce(
+                    Sum(
+                        "user_organization_link_org__user__karma_activity_log_user__karma",
+                        filter=Q(
+                            user_organization_link_org__user__karma_activity_log_user__created_at__gte=start_date,
+                            user_organization_link_org__user__karma_activity_log_user__created_at__lt=end_date,
+                        ),
+                    ),
+                    Value(0),
+                ),
+                students=Count("user_organization_link_org__user", distinct=True),
+            )
+            .values("key", "code", "total_karma", "students")
+            .order_by("-total_karma")
+        )
+
+
+class LeaderboardSnapshotEngine:
+    """
+    Serves leaderboards from stored snapshots.
+
+    - Snapshots of closed months are frozen and never recomputed.
+    - Open snapshots are refreshed at most every ``REFRESH_INTERVAL``: only the
+      rows of users/colleges whose karma changed since the snapshot watermark
+      are recomputed and merged into the stored ranking.
+    - Open snapshots are fully rebuilt every ``REBUILD_INTERVAL`` to pick up
+      deletions and membership changes that leave no karma trail.
+
+    Rebuilds and refreshes run on the request thread, one at a time per
+    snapshot behind a Redis lock. While another request holds it the stored
+    snapshot is served as is; only the first build of a snapshot is waited
+    for, at most ``LOCK_WAIT`` seconds.
+
+    Monthly boards only exist from the month of the first karma log up to
+    the current month, see ``is_valid_period``.
+    """
+
+    REFRESH_INTERVAL = timedelta(minutes=1)
+    REBUILD_INTERVAL = timedelta(hours=1)
+    LOCK_TIMEOUT = 300
+    LOCK_WAIT = 10
+
+    boards = {
+        board.name: board
+        for board in (StudentsBoard(), StudentsMonthlyBoard(), CollegeBoard(), CollegeMonthlyBoard())
+    }
+
+    def __init__(self):
+        self._first_period = None
+
+    def get(self, board_name: str, period: str = None) -> list:
+        board = self.boards[board_name]
+        now = DateTimeUtils.get_current_utc_time()
+        if not board.monthly:
+            period = ALL_TIME
+        elif period is None:
+            period = month_period(now)
+
+        snapshot = LeaderboardSnapshot.objects.filter(board=board.name, period=period).first()
+        if snapshot is None or self.needs_update(board, snapshot, period, now):
+            snapshot = self.locked_update(board, period, snapshot, now)
+
+        return snapshot.response
+
+    def first_period(self) -> str:
+        if self._first_period is None:
+            first = KarmaActivityLog.objects.aggregate(first=Min("created_at"))["first"]
+            if first is None:
+                return None
+            self._first_period = month_period(first)
+        return self._first_period
+
+    def is_valid_period(self, period: str) -> bool:
+        """
+        Whether a 'YYYY-MM' period has a monthly board, from the month of the
+        first karma log up to the current month.
+        """
+        current = month_period(DateTimeUtils.get_current_utc_time())
+        first = self.first_period() or current
+        return first <= period <= current
+
+    def needs_update(self, board, snapshot, period, now) -> bool:
+        return self.needs_rebuild(board, snapshot, period, now) or (
+            not snapshot.frozen and now - snapshot.refreshed_at >= self.REFRESH_INTERVAL
+        )
+
+    def locked_update(self, board, period, snapshot, now):
+        try:
+            lock = RedisUtils.get_client().lock(
+                f"leaderboard_snapshot:{board.name}:{period}:lock",
+                timeout=self.LOCK_TIMEOUT,
+                blocking_timeout=0 if snapshot is not None else self.LOCK_WAIT,
+            )
+            acquired = lock.acquire()
+        except redis.RedisError as e:
+            logger.warning(f"Leaderboard snapshot lock failed: {e}")
+            return self.update(board, period, now)
+
+        if not acquired:
+            # another request is updating it
+            if snapshot is not None:
+                return snapshot
+            return (
+                LeaderboardSnapshot.objects.filter(board=board.name, period=period).first()
+                or self.update(board, period, now)
+            )
+        try:
+            return self.update(board, period, now)
+        finally:
+            try:
+                lock.release()
+            except redis.RedisError as e:
+                logger.warning(f"Leaderboard snapshot lock release failed: {e}")
+
+    def update(self, board, period, now):
+        # read again, another request may have updated the snapshot while this one waited
+        snapshot = LeaderboardSnapshot.objects.filter(board=board.name, period=period).first()
+        if snapshot is None or self.needs_rebuild(board, snapshot, period, now):
+            return self.rebuild(board, period, snapshot, now)
+        if self.needs_update(board, snapshot, period, now):
+            return self.refresh(board, period, snapshot, now)
+        return snapshot
+
+    def needs_rebuild(self, board, snapshot, period, now) -> bool:
+        if snapshot.frozen:
+            return False
+        return now - snapshot.rebuilt_at >= self.REBUILD_INTERVAL or self.is_closed(board, period, now)
+
+    def is_closed(self, board, period, now) -> bool:
+        return board.monthly and period_range(period)[1] <= now
+
+    def rebuild(self, board, period, snapshot, now):
+        watermark = board.watermark()
+        rows = board.rows(period)
+        if board.keep is not None:
+            rows = rows[: board.keep]
+
+        fields = {
+            "rows": rows,
+            "response": board.render(rows),
+            "frozen": self.is_closed(board, period, now),
+            "watermark": watermark,
+            "rebuilt_at": now,
+            "refreshed_at": now,
+        }
+        if snapshot is None:
+            try:
+                with transaction.atomic():
+                    return LeaderboardSnapshot.objects.create(board=board.name, period=period, **fields)
+            except IntegrityError:
+                # built concurrently without the lock, keep the stored one
+                return LeaderboardSnapshot.objects.get(board=board.name, period=period)
+
+        for field, value in fields.items():
+            setattr(snapshot, field, value)
+        snapshot.save()
+        return snapshot
+
+    def refresh(self, board, period, snapshot, now):
+        watermark = board.watermark()
+        if snapshot.watermark is None or watermark is None or watermark <= snapshot.watermark:
+            snapshot.refreshed_at = now
+            snapshot.save(update_fields=["refreshed_at"])
+            return snapshot
+
+        if keys := board.touched(period, snapshot.watermark):
+            rows = [row for row in snapshot.rows if row["key"] not in keys]
+            rows.extend(board.rows(period, keys))
+            rows.sort(key=lambda row: row["total_karma"] or 0, reverse=True)
+            if board.keep is not None:
+                rows = rows[: board.keep]
+            snapshot.rows = rows
+            snapshot.response = board.render(rows)
+
+        snapshot.watermark = watermark
+        snapshot.refreshed_at = now
+        snapshot.save()
+        return snapshot
+
+
+leaderboard_snapshots = LeaderboardSnapshotEngine()
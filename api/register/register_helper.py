@@ -1,8 +1,8 @@
 import decouple
-import requests
 from db.user import User
 
 from utils.exception import CustomException
+from utils.http_client import auth_client
 from utils.response import CustomResponse
 
 
@@ -22,7 +22,7 @@ def generate_muid(full_name):
 
 def get_auth_token(muid, password):
     AUTH_DOMAIN = decouple.config("AUTH_DOMAIN")
-    response = requests.post(
+    response = auth_client.post(
         f"{AUTH_DOMAIN}/api/v1/auth/user-authentication/",
         data={"emailOrMuid": muid, "password": password},
     )
@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from db.organization import Country, Department, District, Organization, State, Zone
 from db.task import InterestGroup
 from db.user import Role, User
+from utils.reference_data import reference_data
 from utils.response import CustomResponse
 from utils.types import OrganizationType
 from utils.utils import send_template_mail
@@ -25,45 +26,52 @@ class UserRegisterValidateAPI(APIView):
 
 class RoleAPI(APIView):
     def get(self, request):
-        roles = Role.objects.all().values("id", "title")
-        return CustomResponse(response={"roles": roles}).get_success_response()
+        return reference_data.response(
+            request,
+            ("roles",),
+            lambda: {"roles": list(Role.objects.all().values("id", "title"))},
+        )
 
 
 class CollegesAPI(APIView):
     def get(self, request):
-        colleges = Organization.objects.filter(
-            org_type=OrganizationType.COLLEGE.value
-        ).values("id", "title")
+        def build():
+            colleges = Organization.objects.filter(
+                org_type=OrganizationType.COLLEGE.value
+            ).values("id", "title")
+            return {"colleges": list(colleges)}
 
-        return CustomResponse(response={"colleges": colleges}).get_success_response()
+        return reference_data.response(request, ("colleges",), build)
 
 
 class DepartmentAPI(APIView):
     def get(self, request):
-        department_serializer = Department.objects.all().values("id", "title")
+        def build():
+            department_serializer = Department.objects.all().values("id", "title")
 
-        department_serializer_data = serializers.BaseSerializer(
-            department_serializer, many=True
-        ).data
+            department_serializer_data = serializers.BaseSerializer(
+                department_serializer, many=True
+            ).data
 
-        return CustomResponse(
-            response={"departments": department_serializer_data}
-        ).get_success_response()
+            return {"departments": department_serializer_data}
+
+        return reference_data.response(request, ("departments",), build)
 
 
 class CompanyAPI(APIView):
     def get(self, request):
-        company_queryset = Organization.objects.filter(
-            org_type=OrganizationType.COMPANY.value
-        ).values("id", "title")
+        def build():
+            company_queryset = Organization.objects.filter(
+                org_type=OrganizationType.COMPANY.value
+            ).values("id", "title")
 
-        company_serializer_data = serializers.BaseSerializer(
-            company_queryset, many=True
-        ).data
+            company_serializer_data = serializers.BaseSerializer(
+                company_queryset, many=True
+            ).data
 
-        return CustomResponse(
-            response={"companies": company_serializer_data}
-        ).get_success_response()
+            return {"companies": company_serializer_data}
+
+        return reference_data.response(request, ("companies",), build)
 
 
 class LearningCircleUserViewAPI(APIView):
@@ -124,110 +132,117 @@ class RegisterDataAPI(APIView):
 
 class CountryAPI(APIView):
     def get(self, request):
-        countries = Country.objects.all()
+        def build():
+            countries = Country.objects.all()
 
-        serializer = serializers.CountrySerializer(countries, many=True)
+            serializer = serializers.CountrySerializer(countries, many=True)
 
-        return CustomResponse(
-            response={
-                "countries": serializer.data,
-            }
-        ).get_success_response()
+            return {"countries": serializer.data}
+
+        return reference_data.response(request, ("countries",), build)
 
 
 class StateAPI(APIView):
     def post(self, request):
-        state = State.objects.filter(country_id=request.data.get("country"))
-        serializer = serializers.StateSerializer(state, many=True)
+        country = request.data.get("country")
 
-        return CustomResponse(
-            response={
-                "states": serializer.data,
-            }
-        ).get_success_response()
+        def build():
+            state = State.objects.filter(country_id=country)
+            serializer = serializers.StateSerializer(state, many=True)
+
+            return {"states": serializer.data}
+
+        return reference_data.response(request, ("states", str(country)), build)
 
 
 class DistrictAPI(APIView):
     def post(self, request):
-        district = District.objects.filter(zone__state_id=request.data.get("state"))
+        state = request.data.get("state")
 
-        serializer = serializers.DistrictSerializer(district, many=True)
+        def build():
+            district = District.objects.filter(zone__state_id=state)
 
-        return CustomResponse(
-            response={
-                "districts": serializer.data,
-            }
-        ).get_success_response()
+            serializer = serializers.DistrictSerializer(district, many=True)
+
+            return {"districts": serializer.data}
+
+        return reference_data.response(request, ("districts", str(state)), build)
 
 
 class CollegeAPI(APIView):
     def post(self, request):
-        org_queryset = Organization.objects.filter(
-            Q(org_type=OrganizationType.COLLEGE.value),
-            Q(district_id=request.data.get("district")),
-        )
-        department_queryset = Department.objects.all()
+        district = request.data.get("district")
 
-        college_serializer_data = serializers.OrgSerializer(
-            org_queryset, many=True
-        ).data
+        def build():
+            org_queryset = Organization.objects.filter(
+                Q(org_type=OrganizationType.COLLEGE.value),
+                Q(district_id=district),
+            )
+            department_queryset = Department.objects.all()
 
-        department_serializer_data = serializers.OrgSerializer(
-            department_queryset, many=True
-        ).data
+            college_serializer_data = serializers.OrgSerializer(
+                org_queryset, many=True
+            ).data
 
-        return CustomResponse(
-            response={
+            department_serializer_data = serializers.OrgSerializer(
+                department_queryset, many=True
+            ).data
+
+            return {
                 "colleges": college_serializer_data,
                 "departments": department_serializer_data,
             }
-        ).get_success_response()
+
+        return reference_data.response(request, ("district_colleges", str(district)), build)
 
 
 class SchoolAPI(APIView):
     def post(self, request):
-        org_queryset = Organization.objects.filter(
-            Q(org_type=OrganizationType.SCHOOL.value),
-            Q(district_id=request.data.get("district")),
-        )
+        district = request.data.get("district")
 
-        college_serializer_data = serializers.OrgSerializer(
-            org_queryset, many=True
-        ).data
+        def build():
+            org_queryset = Organization.objects.filter(
+                Q(org_type=OrganizationType.SCHOOL.value),
+                Q(district_id=district),
+            )
 
-        return CustomResponse(
-            response={
-                "schools": college_serializer_data,
-            }
-        ).get_success_response()
+            college_serializer_data = serializers.OrgSerializer(
+                org_queryset, many=True
+            ).data
+
+            return {"schools": college_serializer_data}
+
+        return reference_data.response(request, ("district_schools", str(district)), build)
 
 
 class CommunityAPI(APIView):
     def get(self, request):
-        community_queryset = Organization.objects.filter(
-            org_type=OrganizationType.COMMUNITY.value
-        )
+        def build():
+            community_queryset = Organization.objects.filter(
+                org_type=OrganizationType.COMMUNITY.value
+            )
 
-        community_serializer_data = serializers.OrgSerializer(
-            community_queryset, many=True
-        ).data
+            community_serializer_data = serializers.OrgSerializer(
+                community_queryset, many=True
+            ).data
 
-        return CustomResponse(
-            response={"communities": community_serializer_data}
-        ).get_success_response()
+            return {"communities": community_serializer_data}
+
+        return reference_data.response(request, ("communities",), build)
 
 
 class AreaOfInterestAPI(APIView):
     def get(self, request):
-        aoi_queryset = InterestGroup.objects.all()
+        def build():
+            aoi_queryset = InterestGroup.objects.all()
 
-        aoi_serializer_data = serializers.AreaOfInterestAPISerializer(
-            aoi_queryset, many=True
-        ).data
+            aoi_serializer_data = serializers.AreaOfInterestAPISerializer(
+                aoi_queryset, many=True
+            ).data
 
-        return CustomResponse(
-            response={"aois": aoi_serializer_data}
-        ).get_success_response()
+            return {"aois": aoi_serializer_data}
+
+        return reference_data.response(request, ("aois",), build)
 
 
 class UserEmailVerificationAPI(APIView):
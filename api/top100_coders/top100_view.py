@@ -1,61 +1,46 @@
-from django.db import connection
 from rest_framework.views import APIView
 
+from api.leaderboard.event_leaderboard import event_leaderboards
+from db.organization import UserOrganizationLink
 from utils.response import CustomResponse
 
 
+def get_user_orgs(user_ids, org_types) -> dict:
+    # one organisation of the given types per user, as {user_id: link}
+    orgs = {}
+    for link in UserOrganizationLink.objects.filter(
+        user_id__in=user_ids, org__org_type__in=org_types
+    ).select_related("org__district__zone__state"):
+        orgs.setdefault(link.user_id, link)
+    return orgs
+
+
 class Leaderboard(APIView):
     def get(self, request):
-        query = """
-        SELECT 
-        u.id,
-        u.full_name, 
-        u.profile_pic,
-        SUM(kal.karma) AS total_karma,
-        COALESCE(org.title, comm.title) AS org,
-        COALESCE(org.dis, d.name) AS dis,
-        COALESCE(org.state, s.name) AS state,
-        MAX(kal.created_at) AS time_
-        FROM karma_activity_log AS kal
-        INNER JOIN user AS u ON kal.user_id = u.id
-        INNER JOIN task_list AS tl ON tl.id = kal.task_id
-        LEFT JOIN (
-            SELECT 
-                uol.user_id, 
-                org.id, 
-                org.title AS title, 
-                d.name dis, 
-                s.name state
-            FROM user_organization_link AS uol
-            INNER JOIN organization AS org ON org.id = uol.org_id AND org.org_type IN ('College', 'School', 'Company')
-            LEFT JOIN district AS d ON d.id = org.district_id
-            LEFT JOIN zone AS z ON z.id = d.zone_id
-            LEFT JOIN state AS s ON s.id = z.state_id
-            GROUP BY uol.user_id 
-            ) AS org ON org.user_id = u.id
-            LEFT JOIN (SELECT 
-                uol.user_id, 
-                org.id, 
-                org.title AS title
-            FROM user_organization_link AS uol
-            INNER JOIN organization AS org ON org.id = uol.org_id AND org.org_type IN ('Community')
-            GROUP BY uol.user_id) AS comm ON comm.user_id = u.id
-            LEFT JOIN district AS d ON d.id = u.district_id
-            LEFT JOIN zone AS z ON d.zone_id = z.id
-            LEFT JOIN state AS s ON z.state_id = s.id
-            WHERE 
-                tl.event = 'TOP100' AND
-                kal.appraiser_approved = TRUE 
-                AND u.id IN (select user_id from karma_activity_log as kal
-            INNER JOIN task_list AS tl ON tl.id = kal.task_id
-            WHERE tl.hashtag = '#thc-realworld-problem-proposal' AND kal.appraiser_approved = TRUE)
-            GROUP BY u.id
-            ORDER BY total_karma DESC, time_;
-            """
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            results = cursor.fetchall()
-            column_names = [desc[0] for desc in cursor.description]
+        rows = list(
+            event_leaderboards.rows("TOP100").select_related("user__district__zone__state")
+        )
+        user_ids = [row.user_id for row in rows]
+        orgs = get_user_orgs(user_ids, ["College", "School", "Company"])
+        communities = get_user_orgs(user_ids, ["Community"])
 
-            list_of_dicts = [dict(zip(column_names, row)) for row in results]
-            return CustomResponse(response=list_of_dicts).get_success_response()
+        list_of_dicts = []
+        for row in rows:
+            user = row.user
+            org = orgs.get(user.id)
+            community = communities.get(user.id)
+            district = (org.org.district if org else None) or user.district
+            list_of_dicts.append(
+                {
+                    "id": user.id,
+                    "rank": row.rank,
+                    "full_name": user.full_name,
+                    "profile_pic": user.profile_pic,
+                    "total_karma": row.karma,
+                    "org": org.org.title if org else community.org.title if community else None,
+                    "dis": district.name if district else None,
+                    "state": district.zone.state.name if district else None,
+                    "time_": row.last_karma_at,
+                }
+            )
+        return CustomResponse(response=list_of_dicts).get_success_response()
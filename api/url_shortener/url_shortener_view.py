@@ -1,16 +1,32 @@
+from django.db.models import Min, Sum
+from django.db.models.functions import Trunc
 from rest_framework.views import APIView
 
 from api.url_shortener.serializers import (
     ShowShortenUrlsSerializer,
     ShortenUrlsCreateUpdateSerializer
 )
-from db.url_shortener import UrlShortener, UrlShortenerTracker
+from db.url_shortener import UrlShortener, UrlShortenerClickRollup
 from utils.permission import CustomizePermission
 from utils.permission import role_required
-from utils.types import RoleType
+from utils.types import CountMode, RoleType
 from utils.response import CustomResponse
 from utils.utils import CommonUtils
 
+CLICKS_DIMENSION = "clicks"
+
+# rollup dimension -> analytics response key
+ANALYTICS_DIMENSIONS = {
+    "browser": "browsers",
+    "platform": "platforms",
+    "device": "devices",
+    "source": "sources",
+    "ip_address": "ip_address",
+    "city": "city",
+    "region": "region",
+    "country": "countries",
+}
+
 
 class UrlShortenerAPI(APIView):
     authentication_classes = [CustomizePermission]
@@ -56,9 +72,11 @@ class UrlShortenerAPI(APIView):
                 "title": "title",
                 "created_at": "created_at"
             },
+            keyset=True,
+            count=CountMode.ESTIMATED,
         )
 
-        if len(url_shortener_objects) == 0:
+        if not paginated_queryset.get("queryset") and not url_shortener_objects.exists():
             return CustomResponse(
                 general_message="No URL related data available"
             ).get_failure_response()
@@ -132,62 +150,61 @@ class UrlAnalyticsAPI(APIView):
         [RoleType.ADMIN.value, RoleType.FELLOW.value, RoleType.ASSOCIATE.value]
     )
     def get(self, request, url_id):
-        queryset = UrlShortenerTracker.objects.filter(url_shortener__id=url_id)
-        # long and short url
         url_shortener = UrlShortener.objects.filter(id=url_id).first()
+        if url_shortener is None:
+            return CustomResponse(
+                general_message="Invalid Url ID"
+            ).get_failure_response()
 
-        if not queryset.exists():
+        interval = request.query_params.get("interval", "hour")
+        if interval not in ("hour", "day"):
+            return CustomResponse(
+                general_message="Invalid interval, expected hour or day"
+            ).get_failure_response()
+
+        rollups = UrlShortenerClickRollup.objects.filter(url_shortener_id=url_id)
+        clicks = rollups.filter(dimension=CLICKS_DIMENSION)
+
+        if not clicks.exists():
             # Return an appropriate response for the case where no records are found
             return CustomResponse(
                 general_message="No records found"
             ).get_failure_response()
 
-        browsers = {}
-        platforms = {}
-        devices = {}
-        sources = {}
-        countries = {}
-        ip_address = {}
-        city = {}
-        region = {}
-        time_based_data = {'all_time': []}
-
-        for query in queryset:
-            # Counting browsers, platforms, devices, sources, countries, and dimensions
-            browsers[query.browser] = browsers.get(query.browser, 0) + 1
-            platforms[query.operating_system] = platforms.get(
-                query.operating_system, 0) + 1
-            devices[query.device_type] = devices.get(
-                query.device_type, 0) + 1
-            sources[query.referrer] = sources.get(query.referrer, 0) + 1
-            countries[query.country] = countries.get(query.country, 0) + 1
-            ip_address[query.ip_address] = ip_address.get(
-                query.ip_address, 0) + 1
-            city[query.city] = city.get(query.city, 0) + 1
-            region[query.region] = region.get(query.region, 0) + 1
-
-            # Create a list of time-based data
-            time_based_data['all_time'].append([
-                query.created_at.strftime(
-                    '%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
-                1  # Assuming each record contributes 1 click
-            ])
+        dimension_counts = {dimension: {} for dimension in ANALYTICS_DIMENSIONS.values()}
+        for rollup in (
+            rollups.exclude(dimension=CLICKS_DIMENSION)
+            .values("dimension", "dimension_value")
+            .annotate(total_clicks=Sum("clicks"))
+        ):
+            if key := ANALYTICS_DIMENSIONS.get(rollup["dimension"]):
+                # NULL tracker values are rolled up as ''
+                dimension_counts[key][rollup["dimension_value"] or None] = rollup["total_clicks"]
+
+        time_series = (
+            clicks.annotate(period=Trunc("bucket", interval))
+            .values("period")
+            .annotate(total_clicks=Sum("clicks"))
+            .order_by("period")
+        )
+        time_based_data = {
+            "all_time": [
+                [
+                    bucket["period"].strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+                    bucket["total_clicks"],
+                ]
+                for bucket in time_series
+            ]
+        }
 
         result = {
-            'total_clicks': queryset.count(),
-            'created_on': queryset.first().created_at.strftime('%Y-%m-%d'),
-            'browsers': browsers,
-            'platforms': platforms,
-            'devices': devices,
-            'sources': sources,
-            'ip_address': ip_address,
-            'city': city,
-            'region': region,
-            'countries': countries,
-            'time_based_data': time_based_data,
-            'long_url': url_shortener.long_url,
-            'short_url': url_shortener.short_url,
-            'title': url_shortener.title
+            "total_clicks": clicks.aggregate(total=Sum("clicks"))["total"],
+            "created_on": clicks.aggregate(first=Min("bucket"))["first"].strftime("%Y-%m-%d"),
+            **dimension_counts,
+            "time_based_data": time_based_data,
+            "long_url": url_shortener.long_url,
+            "short_url": url_shortener.short_url,
+            "title": url_shortener.title,
         }
 
         return CustomResponse(response=result).get_success_response()
@@ -0,0 +1,43 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from db.user import User
+
+# fmt: off
+# noinspection PyPep8
+
+class ImportJob(models.Model):
+    id             = models.CharField(primary_key=True, max_length=36, default=uuid.uuid4)
+    importer       = models.CharField(max_length=200)
+    file           = models.CharField(max_length=200)
+    status         = models.CharField(max_length=20, default="pending")
+    total_rows     = models.IntegerField(default=0)
+    processed_rows = models.IntegerField(default=0)
+    success_count  = models.IntegerField(default=0)
+    failed_count   = models.IntegerField(default=0)
+    error          = models.CharField(max_length=500, blank=True, null=True)
+    locked_at      = models.DateTimeField(blank=True, null=True)
+    started_at     = models.DateTimeField(blank=True, null=True)
+    finished_at    = models.DateTimeField(blank=True, null=True)
+    created_by     = models.ForeignKey(User, on_delete=models.CASCADE, db_column='created_by',
+                                       related_name='import_job_created_by')
+    updated_at     = models.DateTimeField(auto_now=True)
+    created_at     = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        managed = False
+        db_table = "import_job"
+
+
+class ImportJobError(models.Model):
+    id         = models.BigAutoField(primary_key=True)
+    job        = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='import_job_error_job')
+    row_number = models.IntegerField()
+    row        = models.JSONField(encoder=DjangoJSONEncoder)
+    error      = models.CharField(max_length=1000)
+
+    class Meta:
+        managed = False
+        db_table = "import_job_error"
@@ -0,0 +1,47 @@
+import uuid
+
+from django.db import models
+
+from db.user import User
+
+# fmt: off
+# noinspection PyPep8
+
+class LeaderboardSnapshot(models.Model):
+    id           = models.CharField(primary_key=True, max_length=36, default=uuid.uuid4)
+    board        = models.CharField(max_length=50)
+    period       = models.CharField(max_length=7)
+    rows         = models.JSONField(default=list)
+    response     = models.JSONField(default=list)
+    frozen       = models.BooleanField(default=False)
+    watermark    = models.DateTimeField(blank=True, null=True)
+    rebuilt_at   = models.DateTimeField()
+    refreshed_at = models.DateTimeField()
+    created_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        managed = False
+        db_table = "leaderboard_snapshot"
+        constraints = [
+            models.UniqueConstraint(fields=["board", "period"], name="leaderboard_snapshot_board_period")
+        ]
+
+
+class EventLeaderboard(models.Model):
+    """
+    Approved karma of a user on the tasks of one `TaskList.event`, kept by the
+    karma_activity_log / task_list triggers of alter-1.56. `qualified` and
+    `rank` are set by the event leaderboard engine.
+    """
+    id            = models.BigAutoField(primary_key=True)
+    event         = models.CharField(max_length=50)
+    user          = models.ForeignKey(User, on_delete=models.CASCADE, related_name="event_leaderboard_user")
+    karma         = models.IntegerField(default=0)
+    last_karma_at = models.DateTimeField(blank=True, null=True)
+    qualified     = models.BooleanField(default=False)
+    rank          = models.IntegerField(blank=True, null=True, db_column="event_rank")
+    updated_at    = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "event_leaderboard"
@@ -49,6 +49,23 @@ class UserCircleLink(models.Model):
         db_table = "user_circle_link"
 
 
+class LearningCircleKarma(models.Model):
+    """
+    Running total of the appraiser approved karma earned by the accepted members
+    of a circle on tasks of the circle's interest group. Maintained by the
+    triggers in alter-1.51, one row per circle.
+    """
+    circle = models.OneToOneField(LearningCircle, primary_key=True, on_delete=models.CASCADE,
+                                  related_name='learning_circle_karma_circle')
+    ig = models.ForeignKey(InterestGroup, on_delete=models.CASCADE, related_name='learning_circle_karma_ig')
+    karma = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = False
+        db_table = 'learning_circle_karma'
+
+
 class CircleMeetingLog(models.Model):
     id = models.CharField(primary_key=True, max_length=36, default=uuid.uuid4(), unique=True)
     circle = models.ForeignKey(LearningCircle, on_delete=models.CASCADE,
@@ -0,0 +1,48 @@
+from django.db import models
+from django.db.models import Lookup
+
+# fmt: off
+# noinspection PyPep8
+
+
+class FullTextMatch(Lookup):
+    """
+    ``document__match="..."``, a boolean mode ``MATCH ... AGAINST`` on a
+    FULLTEXT indexed column.
+    """
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)", [*lhs_params, *rhs_params]
+
+
+class FullTextField(models.TextField):
+    pass
+
+
+FullTextField.register_lookup(FullTextMatch)
+
+
+class SearchDocument(models.Model):
+    id         = models.BigAutoField(primary_key=True)
+    entity     = models.CharField(max_length=50)
+    entity_id  = models.CharField(max_length=36)
+    document   = FullTextField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "search_document"
+
+
+class SearchDocumentStale(models.Model):
+    id        = models.BigAutoField(primary_key=True)
+    entity    = models.CharField(max_length=50)
+    entity_id = models.CharField(max_length=36)
+
+    class Meta:
+        managed = False
+        db_table = "search_document_stale"
@@ -219,6 +219,38 @@ class UserIgLink(models.Model):
         db_table = "user_ig_link"
 
 
+class UserIgKarma(models.Model):
+    """
+    Appraiser approved karma of a user on the tasks of an interest group, kept
+    by the karma_activity_log / task_list triggers of alter-1.53.
+    """
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_ig_karma_user")
+    ig = models.ForeignKey(InterestGroup, on_delete=models.CASCADE, related_name="user_ig_karma_ig")
+    karma = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = False
+        db_table = "user_ig_karma"
+
+
+class KarmaChangeFeed(models.Model):
+    """
+    Change feed of the karma summaries shared with partners. A user's row is
+    re-inserted with the next `seq` whenever their wallet karma, interest
+    group karma, interest groups, integrations, email or muid change, by the
+    triggers of alter-1.55.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="karma_change_feed_user")
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "karma_change_feed"
+
+
 class VoucherLog(models.Model):
     id = models.CharField(primary_key=True, max_length=36)
     code = models.CharField(unique=True, max_length=255)
@@ -230,6 +262,9 @@ class VoucherLog(models.Model):
     claimed = models.BooleanField()
     event = models.CharField(max_length=50, null=True)
     description = models.CharField(max_length=2000, null=True)
+    mail_status = models.CharField(max_length=10, default="pending")
+    mail_error = models.CharField(max_length=500, null=True)
+    mailed_at = models.DateTimeField(null=True)
     updated_by = models.ForeignKey(User, on_delete=models.SET(settings.SYSTEM_ADMIN_ID), db_column="updated_by",
                                    related_name="voucher_log_updated_by")
     updated_at = models.DateTimeField(auto_now=True)
@@ -45,3 +45,21 @@ class UrlShortenerTracker(models.Model):
     class Meta:
         managed = False
         db_table = 'url_shortener_tracker'
+
+
+class UrlShortenerClickRollup(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    url_shortener = models.ForeignKey(UrlShortener, on_delete=models.CASCADE,
+                                      related_name='url_shortener_click_rollup_url')
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=20)
+    dimension_value = models.CharField(max_length=255)
+    clicks = models.IntegerField(default=0)
+
+    class Meta:
+        managed = False
+        db_table = 'url_shortener_click_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['url_shortener', 'bucket', 'dimension', 'dimension_value'],
+                                    name='url_shortener_click_rollup_bucket')
+        ]
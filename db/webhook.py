@@ -0,0 +1,23 @@
+import uuid
+
+from django.db import models
+
+# fmt: off
+# noinspection PyPep8
+
+class DiscordWebhookOutbox(models.Model):
+    id              = models.CharField(primary_key=True, max_length=36, default=uuid.uuid4)
+    # AUTO_INCREMENT, inserted as NULL so that MySQL assigns it
+    seq             = models.BigIntegerField(unique=True, null=True, editable=False)
+    content         = models.CharField(max_length=2000)
+    status          = models.CharField(max_length=20, default="pending")
+    attempts        = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    locked_at       = models.DateTimeField(blank=True, null=True)
+    last_error      = models.CharField(max_length=500, blank=True, null=True)
+    sent_at         = models.DateTimeField(blank=True, null=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        managed = False
+        db_table = "discord_webhook_outbox"
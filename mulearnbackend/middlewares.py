@@ -1,22 +1,27 @@
-from contextlib import suppress
+from contextlib import ExitStack, suppress
+from datetime import datetime, timezone
 import hashlib
 import hmac
 import json
-import json
 import logging
+import random
 import traceback
 
 import decouple
+import redis
 from django.conf import settings
+from django.db import connections
 from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.renderers import JSONRenderer
 
 from utils.exception import CustomException
+from utils.query_stats import QueryBudgetExceeded, QueryRecorder, query_stats
 from utils.response import CustomResponse
 from utils.utils import _CustomHTTPHandler
 
 logger = logging.getLogger("django")
+error_store_logger = logging.getLogger("error_store")
 
 
 class IpBindingMiddleware(object):
@@ -75,6 +80,97 @@ class ApiSignatureMiddleware(object):
         return self.get_response(request)
 
 
+class QueryBudgetMiddleware:
+    """
+    Records the queries of every request and checks them against the view's
+    query budget.
+
+    The query count, database time and repeated query fingerprints (the usual
+    sign of an N+1 in a serializer) are aggregated per URL name by
+    `utils.query_stats` for a `QUERY_STATS_SAMPLE_RATE` share of requests. A
+    view can declare a `query_budget` attribute to override the `QUERY_BUDGET`
+    setting; a request over budget is logged, or raises `QueryBudgetExceeded`
+    when `QUERY_BUDGET_RAISE` is set. Nothing is recorded unless
+    `QUERY_STATS_ENABLED` is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_STATS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        if (match := request.resolver_match) is None:
+            return response
+
+        if random.random() < settings.QUERY_STATS_SAMPLE_RATE:
+            try:
+                query_stats.record(match.view_name, recorder)
+            except redis.RedisError as e:
+                logger.warning(f"Query stats update failed: {e}")
+
+        self.check_budget(request, match, recorder)
+        return response
+
+    @staticmethod
+    def get_budget(match):
+        view = getattr(match.func, "view_class", match.func)
+        return getattr(view, "query_budget", settings.QUERY_BUDGET)
+
+    def check_budget(self, request, match, recorder):
+        budget = self.get_budget(match)
+        if not budget or recorder.count <= budget:
+            return
+
+        duplicates = recorder.duplicates(query_stats.DUPLICATE_THRESHOLD)
+        message = (
+            f"{request.method} {match.view_name} ran {recorder.count} queries "
+            f"(budget {budget}), repeated: "
+            + (", ".join(f"{recorder.statements[fingerprint][:200]} x{count}"
+                         for fingerprint, count in duplicates.items()) or "none")
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class BodyCapture:
+    """
+    Request body stream that keeps a copy of the first `limit` bytes read
+    through it, for the error log.
+    """
+
+    def __init__(self, stream, limit: int):
+        self.stream = stream
+        self.limit = limit
+        self.buffer = bytearray()
+        self.truncated = False
+
+    def keep(self, data: bytes) -> bytes:
+        room = self.limit - len(self.buffer)
+        if room > 0:
+            self.buffer += data[:room]
+        if len(data) > max(room, 0):
+            self.truncated = True
+        return data
+
+    def read(self, *args, **kwargs) -> bytes:
+        return self.keep(self.stream.read(*args, **kwargs))
+
+    def readline(self, *args, **kwargs) -> bytes:
+        return self.keep(self.stream.readline(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
 class UniversalErrorHandlerMiddleware:
     """
     Middleware for handling exceptions and generating error responses.
@@ -89,14 +185,51 @@ class UniversalErrorHandlerMiddleware:
 
     """
 
+    # bodies are only kept for the error log up to this size
+    BODY_CAPTURE_BYTES = 16 * 1024
+    CAPTURED_CONTENT_TYPES = (
+        "application/json",
+        "application/x-www-form-urlencoded",
+        "application/xml",
+        "text/",
+    )
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Cache the body
-        _ = request.body
+        # the body is copied as the view reads it, uploads and binary payloads are not
+        if self.is_captured(request) and hasattr(request, "_stream"):
+            request._stream = BodyCapture(request._stream, self.BODY_CAPTURE_BYTES)
         return self.get_response(request)
 
+    def is_captured(self, request) -> bool:
+        content_type = request.content_type or ""
+        return not content_type or content_type.endswith("+json") or content_type.startswith(
+            self.CAPTURED_CONTENT_TYPES
+        )
+
+    def get_body(self, request):
+        """
+        Returns the captured body, parsed when it is complete JSON.
+        """
+        capture = getattr(request, "_stream", None)
+        if not isinstance(capture, BodyCapture):
+            return f"{request.content_type} body not captured"
+        if not capture.buffer and not capture.truncated:
+            # the view failed before reading the body
+            with suppress(Exception):
+                capture.read(self.BODY_CAPTURE_BYTES + 1)
+        if not capture.buffer:
+            return "No body"
+
+        body = capture.buffer.decode("utf-8", errors="replace")
+        if capture.truncated:
+            return f"{body}... (truncated)"
+        with suppress(ValueError):
+            return json.loads(body)
+        return body
+
     def log_exception(self, request, exception):
         """
         Log the exception and prints the information in CLI.
@@ -107,17 +240,17 @@ class UniversalErrorHandlerMiddleware:
 
         """
 
-        body = request._body.decode("utf-8") if hasattr(request, "_body") else "No body"
+        body = self.get_body(request)
         auth = request.auth if hasattr(request, "auth") else "No Auth data"
 
-        with suppress(json.JSONDecodeError):
-            body = json.loads(body)
-            body = json.dumps(body, indent=4)
+        exception_id = self.generate_error_id(exception, request)
+        self.store_exception(request, exception, exception_id, auth, body)
 
-        with suppress(json.JSONDecodeError):
-            auth = json.dumps(auth, indent=4)
+        with suppress(TypeError, ValueError):
+            body = json.dumps(body) if not isinstance(body, str) else body
 
-        exception_id = self.generate_error_id(exception, request)
+        with suppress(TypeError, ValueError):
+            auth = json.dumps(auth)
 
         request_info = (
             f"EXCEPTION INFO:\n"
@@ -134,6 +267,25 @@ class UniversalErrorHandlerMiddleware:
 
         print(request_info)
 
+    def store_exception(self, request, exception, exception_id, auth, body):
+        """
+        Write the exception as a structured JSON line to the error store
+        read by the error log dashboards.
+        """
+        record = {
+            "id": exception_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "type": type(exception).__name__,
+            "message": str(exception),
+            "method": request.method,
+            "path": request.path,
+            "route": getattr(request.resolver_match, "route", None),
+            "auth": auth,
+            "body": body,
+            "traceback": traceback.format_exc(),
+        }
+        error_store_logger.error(json.dumps(record, default=str))
+
     def generate_error_id(self, exception, request):
         error_info = f"{type(exception).__name__}: {str(exception)}: {request.method}: {request.path}"
 
@@ -64,8 +64,18 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "mulearnbackend.middlewares.UniversalErrorHandlerMiddleware",
+    "mulearnbackend.middlewares.QueryBudgetMiddleware",
 ]
 
+# per request query instrumentation, see QueryBudgetMiddleware
+QUERY_STATS_ENABLED = decouple_config("QUERY_STATS_ENABLED", default=False, cast=bool)
+# share of instrumented requests whose stats are written to Redis
+QUERY_STATS_SAMPLE_RATE = decouple_config("QUERY_STATS_SAMPLE_RATE", default=1.0, cast=float)
+# default query budget of a view, 0 disables the check
+QUERY_BUDGET = decouple_config("QUERY_BUDGET", default=0, cast=int)
+# fail over budget requests instead of logging them, meant for tests
+QUERY_BUDGET_RAISE = decouple_config("QUERY_BUDGET_RAISE", default=False, cast=bool)
+
 ROOT_URLCONF = "mulearnbackend.urls"
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -94,11 +104,17 @@ ASGI_APPLICATION = "mulearnbackend.asgi.application"
 
 WSGI_APPLICATION = "mulearnbackend.wsgi.application"
 
+REDIS_HOST = decouple_config("REDIS_HOST")
+REDIS_PORT = decouple_config("REDIS_PORT", cast=int)
+# seconds, a stalled Redis fails fast and callers fall back to the database
+REDIS_SOCKET_TIMEOUT = decouple_config("REDIS_SOCKET_TIMEOUT", default=0.5, cast=float)
+REDIS_CONNECT_TIMEOUT = decouple_config("REDIS_CONNECT_TIMEOUT", default=0.5, cast=float)
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [(decouple_config("REDIS_HOST"), decouple_config("REDIS_PORT"))],
+            "hosts": [(REDIS_HOST, REDIS_PORT)],
         },
     },
 }
@@ -136,35 +152,42 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 LOG_PATH = decouple_config("LOGGER_DIR_PATH")
+# "text" or "json", one object per line
+LOG_FORMAT = decouple_config("LOG_FORMAT", default="text")
+LOG_LEVEL = decouple_config("LOG_LEVEL", default="INFO")
+# every log file is rotated at this size and at least this often
+LOG_MAX_BYTES = decouple_config("LOG_MAX_BYTES", default=50 * 1024 * 1024, cast=int)
+LOG_ROTATE_SECONDS = decouple_config("LOG_ROTATE_SECONDS", default=24 * 60 * 60, cast=int)
+LOG_BACKUP_COUNT = decouple_config("LOG_BACKUP_COUNT", default=7, cast=int)
+# share of the queries written to sql.log, see utils.sql_log
+SQL_LOG_SAMPLE_RATE = decouple_config("SQL_LOG_SAMPLE_RATE", default=0.0, cast=float)
+# queries slower than this are always written to sql.log, 0 disables it
+SQL_LOG_SLOW_MS = decouple_config("SQL_LOG_SLOW_MS", default=500, cast=int)
+
+
+def queued_log_file(name, level, formatter=None, rotate=True):
+    """file handler whose records are written by a background thread"""
+    return {
+        "level": level,
+        "class": "utils.log_handlers.QueuedFileHandler",
+        "filename": f"{LOG_PATH}/{name}",
+        "max_bytes": LOG_MAX_BYTES,
+        "interval": LOG_ROTATE_SECONDS if rotate else 0,
+        "backup_count": LOG_BACKUP_COUNT,
+        "formatter": formatter or ("json" if LOG_FORMAT == "json" else "verbose"),
+    }
+
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
-        "request_log": {
-            "level": "INFO",
-            "class": "logging.FileHandler",
-            "filename": f"{LOG_PATH}/request.log",
-            "formatter": "verbose",
-        },
-        "error_log": {
-            "level": "ERROR",
-            "class": "logging.FileHandler",
-            "filename": f"{LOG_PATH}/error.log",
-            "formatter": "verbose",
-        },
-        "sql_log": {
-            "level": "DEBUG",
-            "class": "logging.FileHandler",
-            "filename": f"{LOG_PATH}/sql.log",
-            "formatter": "verbose",
-        },
-        "root_log": {
-            "level": "DEBUG",
-            "class": "logging.FileHandler",
-            "filename": f"{LOG_PATH}/root.log",
-            "formatter": "verbose",
-        },
+        "request_log": queued_log_file("request.log", "INFO"),
+        "error_log": queued_log_file("error.log", "ERROR"),
+        # read back by the error dashboards, only rotated by size
+        "error_store": queued_log_file("error.jsonl", "ERROR", formatter="message", rotate=False),
+        "sql_log": queued_log_file("sql.log", "DEBUG"),
+        "root_log": queued_log_file("root.log", "DEBUG"),
     },
     "loggers": {
         "django.request": {
@@ -177,14 +200,25 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        "error_store": {
+            "handlers": ["error_store"],
+            "level": "ERROR",
+            "propagate": False,
+        },
+        # the per query debug log of DEBUG mode, utils.sql_log samples queries instead
         "django.db.backends": {
             "handlers": ["sql_log"],
-            "level": "DEBUG",
+            "level": "INFO",
             "propagate": True,
         },
+        "sql": {
+            "handlers": ["sql_log"],
+            "level": "DEBUG",
+            "propagate": False,
+        },
         "": {
             "handlers": ["root_log"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": True,
         },
     },
@@ -193,6 +227,13 @@ LOGGING = {
             "format": "{asctime} {levelname} {message}",
             "style": "{",
         },
+        "message": {
+            "format": "{message}",
+            "style": "{",
+        },
+        "json": {
+            "()": "utils.log_handlers.JsonFormatter",
+        },
     },
 }
 
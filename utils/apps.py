@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UtilsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'utils'
+
+    def ready(self):
+        from . import karma_rank  # noqa: F401 registers the rank index signals
+        from . import permission  # noqa: F401 registers the dynamic access signals
+        from . import org_karma_rank  # noqa: F401 registers the org karma rollup signals
+        from . import level_progress  # noqa: F401 registers the level catalogue signals
+        from . import sql_log  # noqa: F401 registers the sampled query log
+        from . import reference_data  # noqa: F401 registers the reference data signals
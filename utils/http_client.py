@@ -0,0 +1,242 @@
+import json
+import logging
+import threading
+import time
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised without calling the upstream while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` consecutive failures.
+
+    The breaker stays open for `reset_timeout` seconds, then lets a single
+    trial request through: a success closes it, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """
+    HTTP client of one external service.
+
+    Every upstream gets its own keep-alive `Session` with a bounded pool and a
+    default timeout. Connection errors are retried with exponential backoff for
+    every method, since the request never reached the upstream, while read
+    errors and 502/503/504 responses are only retried for idempotent methods.
+    Consecutive failures open a `CircuitBreaker`, and the latency and outcome
+    of every call are aggregated in Redis for `upstream_stats`. The breaker
+    state lives in the process, so each worker trips and recovers on its own.
+    """
+
+    STATS_KEY_PREFIX = "http_client"
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 10,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 10,
+        failure_threshold: int = 5,
+        reset_timeout: int = 30,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=self.RETRY_STATUSES,
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable, try again later")
+
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            self.record(time.monotonic() - start, failed=True)
+            raise
+
+        failed = response.status_code >= 500
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.record(time.monotonic() - start, failed=failed)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def record(self, duration: float, failed: bool):
+        key = f"{self.STATS_KEY_PREFIX}:{self.name}"
+        duration_ms = duration * 1000
+        try:
+            with RedisUtils.get_client().pipeline(transaction=False) as pipe:
+                pipe.hincrby(key, "requests", 1)
+                pipe.hincrby(key, "failures", int(failed))
+                pipe.hincrbyfloat(key, "total_ms", duration_ms)
+                pipe.hset(key, "last_ms", round(duration_ms, 2))
+                pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Upstream stats update failed: {e}")
+
+
+class TokenCache:
+    """
+    Access token of a client credentials grant, shared by every process
+    through Redis and refreshed `EXPIRY_MARGIN` seconds before it expires.
+    While Redis is unavailable every call requests a fresh, uncached token.
+    """
+
+    EXPIRY_MARGIN = 60
+    DEFAULT_EXPIRES_IN = 300
+
+    def __init__(self, name: str, fetch):
+        """
+        Args:
+            name: Name of the token, used in the Redis key.
+            fetch: Callable returning the token response, a dict with
+                `access_token` and optionally `expires_in`.
+        """
+        self.key = f"{UpstreamClient.STATS_KEY_PREFIX}:token:{name}"
+        self.fetch = fetch
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        try:
+            client = RedisUtils.get_client()
+            if token := client.get(self.key):
+                return token
+
+            with self._lock, client.lock(f"{self.key}:lock", timeout=30):
+                if token := client.get(self.key):
+                    return token
+
+                token, expires_in = self.request_token()
+                client.set(self.key, token, ex=max(expires_in - self.EXPIRY_MARGIN, 1))
+                return token
+        except redis.RedisError as e:
+            logger.warning(f"Token cache unavailable, requesting an uncached token: {e}")
+
+        with self._lock:
+            return self.request_token()[0]
+
+    def request_token(self) -> tuple:
+        response = self.fetch()
+        if not (token := response.get("access_token")):
+            raise requests.RequestException(
+                f"Token request failed: {json.dumps(response)[:200]}"
+            )
+        return token, int(response.get("expires_in") or self.DEFAULT_EXPIRES_IN)
+
+    def invalidate(self):
+        try:
+            RedisUtils.get_client().delete(self.key)
+        except redis.RedisError as e:
+            logger.warning(f"Token cache invalidation failed: {e}")
+
+
+kkem_client = UpstreamClient("kkem")
+wadhwani_client = UpstreamClient("wadhwani")
+auth_client = UpstreamClient("auth", timeout=5)
+devfolio_client = UpstreamClient("devfolio", timeout=5)
+# the webhook dispatcher keeps a single delivery in flight
+discord_client = UpstreamClient("discord", timeout=5, pool_maxsize=1)
+
+upstream_clients = (kkem_client, wadhwani_client, auth_client, devfolio_client, discord_client)
+
+
+def upstream_stats() -> list:
+    """
+    Returns the request count, failures and latency of every upstream.
+
+    The counters are shared by every process, while `circuit_open_in_process`
+    is the breaker state of the process answering the request only.
+    """
+    client = RedisUtils.get_client()
+    with client.pipeline(transaction=False) as pipe:
+        for upstream in upstream_clients:
+            pipe.hgetall(f"{UpstreamClient.STATS_KEY_PREFIX}:{upstream.name}")
+        results = pipe.execute()
+
+    stats = []
+    for upstream, totals in zip(upstream_clients, results):
+        requests_count = int(totals.get("requests", 0))
+        stats.append({
+            "upstream": upstream.name,
+            "requests": requests_count,
+            "failures": int(totals.get("failures", 0)),
+            "avg_ms": round(float(totals.get("total_ms", 0)) / requests_count, 2) if requests_count else None,
+            "last_ms": float(totals["last_ms"]) if "last_ms" in totals else None,
+            "circuit_open_in_process": upstream.breaker.is_open,
+        })
+    return stats
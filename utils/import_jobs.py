@@ -0,0 +1,343 @@
+import logging
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from db.import_job import ImportJob, ImportJobError
+from utils.types import ImportJobStatus
+from utils.utils import ImportCSV
+
+logger = logging.getLogger(__name__)
+
+
+class ImportRejected(Exception):
+    """
+    Raised by an importer when the whole file is unusable, e.g. a missing column.
+    """
+
+
+class LeaseLost(Exception):
+    """
+    Raised when another worker reclaimed the job, which is then left to it.
+    """
+
+
+class ImportJobLease:
+    """
+    The claim of a worker on a running job.
+
+    `locked_at` doubles as the lease token: every write of the worker to the
+    job row is conditional on the value it last wrote, so once another worker
+    reclaimed the job (and wrote its own `locked_at`) the old worker's chunk
+    transaction rolls back instead of committing twice. While the lease is
+    held a heartbeat thread pushes `locked_at` forward every `interval`
+    seconds, so a chunk slower than `LOCK_TIMEOUT` is not reclaimed.
+    """
+
+    def __init__(self, job: ImportJob, interval: float):
+        self.job_id = job.id
+        self.locked_at = job.locked_at
+        self.interval = interval
+        self.lost = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self.heartbeat, name="import-job-heartbeat", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def heartbeat(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                if not self.update():
+                    logger.warning(f"Import job {self.job_id} was reclaimed by another worker")
+                    return
+        except Exception as e:
+            logger.error(f"Import job {self.job_id} heartbeat failed: {e}")
+        finally:
+            connection.close()
+
+    def update(self, release: bool = False, **fields) -> bool:
+        """
+        Writes the fields to the job row if the lease is still held, and
+        renews it, or gives it up when `release` is set.
+
+        Returns:
+            bool: False if the job was reclaimed by another worker.
+        """
+        with self._lock:
+            if self.lost:
+                return False
+            # whole seconds, so the token survives a DATETIME column unchanged
+            locked_at = None if release else timezone.now().replace(microsecond=0)
+            updated = ImportJob.objects.filter(
+                id=self.job_id,
+                status=ImportJobStatus.PROCESSING.value,
+                locked_at=self.locked_at,
+            ).update(locked_at=locked_at, updated_at=timezone.now(), **fields)
+            if updated:
+                self.locked_at = locked_at
+            else:
+                self.lost = True
+            return bool(updated)
+
+
+class Importer:
+    """
+    Base class of the Excel and CSV imports run by `ImportJobRunner`.
+
+    Subclasses list the columns they need in `headers` and implement
+    `import_chunk`, which receives a chunk of non empty rows inside a
+    transaction and returns the rows that failed as (row, error) tuples.
+    Every row carries its sheet row number under `row_number`.
+
+    One importer instance handles every chunk of a job, so it can keep
+    lookups and duplicate checks across chunks.
+    """
+
+    headers = []
+
+    def __init__(self, job: ImportJob):
+        self.job = job
+        self.user_id = job.created_by_id
+
+    def check_headers(self, header: dict):
+        for key in self.headers:
+            if key not in header:
+                raise ImportRejected(f"{key} does not exist in the file.")
+
+    def import_chunk(self, rows: list) -> list:
+        raise NotImplementedError
+
+    @staticmethod
+    def format_errors(errors) -> str:
+        if isinstance(errors, dict):
+            return "; ".join(
+                f"{field}: {Importer.format_errors(messages)}" for field, messages in errors.items()
+            )
+        if isinstance(errors, list):
+            return " ".join(Importer.format_errors(message) for message in errors)
+        return str(errors)
+
+    def save_valid(self, serializer_class, entries: list):
+        """
+        Saves the entries that pass the serializer.
+
+        Args:
+            serializer_class: Serializer used to validate and save the data.
+            entries (list): (row, data) tuples of the sheet row and the data to save.
+
+        Returns:
+            tuple: The saved instances and the failed (row, error) tuples.
+        """
+        if not entries:
+            return [], []
+
+        serializer = serializer_class(data=[data for _, data in entries], many=True)
+        if serializer.is_valid():
+            return serializer.save(), []
+
+        failed = [
+            (row, self.format_errors(errors))
+            for (row, _), errors in zip(entries, serializer.errors)
+            if errors
+        ]
+        valid = [data for (_, data), errors in zip(entries, serializer.errors) if not errors]
+        if not valid:
+            return [], failed
+
+        serializer = serializer_class(data=valid, many=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(), failed
+
+
+class ImportJobRunner:
+    """
+    Runs Excel and CSV imports outside the request.
+
+    `submit` stores the upload and records an `import_job` row, so the upload
+    endpoint can answer with the job id right away. A small pool of worker
+    threads claims pending jobs and feeds the rows to the job's `Importer` in
+    chunks of `CHUNK_SIZE`. Every chunk, its failed rows and the job progress
+    are committed in one transaction, so a job whose worker died is resumed
+    after `LOCK_TIMEOUT` from the first chunk that was not committed. A live
+    worker keeps its `ImportJobLease` renewed every `HEARTBEAT_INTERVAL`.
+    """
+
+    MAX_WORKERS = 2
+    CHUNK_SIZE = 500
+    POLL_INTERVAL = 10
+    LOCK_TIMEOUT = timedelta(minutes=10)
+    HEARTBEAT_INTERVAL = LOCK_TIMEOUT.total_seconds() / 5
+    UPLOAD_DIR = "imports"
+
+    def __init__(self):
+        self._threads = []
+        self._thread_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.storage = FileSystemStorage()
+
+    def submit(self, importer, file_obj, user_id: str) -> ImportJob:
+        job_id = str(uuid.uuid4())
+        extension = os.path.splitext(file_obj.name)[1] or ".xlsx"
+        path = self.storage.save(f"{self.UPLOAD_DIR}/{job_id}{extension}", file_obj)
+        job = ImportJob.objects.create(
+            id=job_id,
+            importer=f"{importer.__module__}.{importer.__qualname__}",
+            file=path,
+            created_by_id=user_id,
+        )
+        transaction.on_commit(self.wake)
+        return job
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    def start(self):
+        with self._thread_lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.MAX_WORKERS:
+                thread = threading.Thread(
+                    target=self.run_forever, name="import-job-worker", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def run_forever(self):
+        while True:
+            try:
+                close_old_connections()
+                processed = self.run_next()
+            except Exception as e:
+                logger.error(f"Import job worker failed: {e}")
+                processed = False
+
+            if not processed:
+                self._wake.wait(self.POLL_INTERVAL)
+                self._wake.clear()
+
+    def claim(self):
+        now = timezone.now().replace(microsecond=0)
+        with transaction.atomic():
+            job = (
+                ImportJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ImportJobStatus.PENDING.value)
+                    | Q(status=ImportJobStatus.PROCESSING.value, locked_at__lte=now - self.LOCK_TIMEOUT)
+                )
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+
+            job.status = ImportJobStatus.PROCESSING.value
+            job.locked_at = now
+            job.started_at = job.started_at or now
+            job.save(update_fields=["status", "locked_at", "started_at", "updated_at"])
+        return job
+
+    def run_next(self) -> bool:
+        """
+        Claims and runs one job.
+
+        Returns:
+            bool: True if a job was claimed.
+        """
+        if (job := self.claim()) is None:
+            return False
+
+        with ImportJobLease(job, self.HEARTBEAT_INTERVAL) as lease:
+            try:
+                self.process(job, lease)
+            except LeaseLost:
+                logger.warning(f"Import job {job.id} was reclaimed by another worker")
+            except Exception as e:
+                logger.error(f"Import job {job.id} failed: {e}")
+                self.finish(job, lease, ImportJobStatus.FAILED.value, str(e)[:500])
+        return True
+
+    def process(self, job: ImportJob, lease: ImportJobLease):
+        importer = import_string(job.importer)(job)
+        try:
+            self.import_rows(job, importer, lease)
+        except ImportRejected as e:
+            return self.finish(job, lease, ImportJobStatus.FAILED.value, str(e))
+
+        job.total_rows = job.processed_rows
+        self.finish(job, lease, ImportJobStatus.COMPLETED.value)
+
+    def import_rows(self, job: ImportJob, importer: Importer, lease: ImportJobLease):
+        """
+        Streams the rows of the job's file to the importer chunk by chunk,
+        skipping the rows a previous run already committed.
+        """
+        with self.storage.open(job.file, "rb") as file_obj:
+            reader = ImportCSV()
+            rows = reader.read_excel_file(file_obj, job.file)
+            if (header := next(rows, None)) is None:
+                raise ImportRejected("Empty csv file.")
+            importer.check_headers(header)
+
+            # the workbook dimension counts empty rows too, the total is corrected at the end
+            job.total_rows = max(reader.row_count or 0, job.processed_rows)
+            if not lease.update(total_rows=job.total_rows):
+                raise LeaseLost
+
+            start = job.processed_rows
+            for chunk in reader.read_in_chunks(rows, self.CHUNK_SIZE, skip=start):
+                self.import_chunk(job, importer, lease, chunk, start)
+                start += len(chunk)
+
+    def import_chunk(self, job: ImportJob, importer: Importer, lease: ImportJobLease, chunk: list, start: int):
+        with transaction.atomic():
+            failed = importer.import_chunk(chunk)
+            ImportJobError.objects.bulk_create(
+                ImportJobError(
+                    job=job,
+                    row_number=row["row_number"],
+                    row={key: value for key, value in row.items() if key != "row_number"},
+                    error=str(error)[:1000],
+                )
+                for row, error in failed
+            )
+            # checked last, so a reclaimed job rolls the whole chunk back
+            if not lease.update(
+                total_rows=max(job.total_rows, start + len(chunk)),
+                processed_rows=start + len(chunk),
+                success_count=job.success_count + len(chunk) - len(failed),
+                failed_count=job.failed_count + len(failed),
+            ):
+                raise LeaseLost
+        job.refresh_from_db()
+
+    def finish(self, job: ImportJob, lease: ImportJobLease, status: str, error: str = None):
+        if lease.update(
+            release=True,
+            status=status,
+            error=error,
+            total_rows=job.total_rows,
+            finished_at=timezone.now(),
+        ):
+            self.storage.delete(job.file)
+        else:
+            logger.warning(f"Import job {job.id} was reclaimed by another worker")
+
+
+import_job_runner = ImportJobRunner()
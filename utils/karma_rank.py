@@ -0,0 +1,349 @@
+import datetime
+import logging
+import threading
+
+import redis
+from django.db import connection
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.task import Wallet
+from db.user import UserRoleLink
+from utils.types import RoleType
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class KarmaRankIndex:
+    """
+    Global karma rank index kept as Redis sorted sets (member: user id, score: karma).
+
+    One sorted set is kept per board:
+        - all: every wallet, used for the percentile
+        - learner: users who are neither a mentor nor an enabler
+        - mentor / enabler: users holding the verified role
+
+    Ranks are answered with ``ZCOUNT`` over the score range above the user's karma,
+    so a lookup is O(log N) and never touches the wallet table. Users with the same
+    karma share a rank, and the percentile is taken over every wallet.
+
+    Most karma is written outside Django (the Discord bot), so besides the
+    ``Wallet`` / ``UserRoleLink`` signals below, reads refresh the sets at most every
+    ``REFRESH_INTERVAL`` seconds from the wallets updated since the stored watermark
+    (alter-1.57 makes every karma change bump ``wallet.updated_at``). The last
+    ``WATERMARK_OVERLAP`` seconds are read again, so rows committed late by a long
+    transaction are not skipped. The sets are rebuilt from the database every
+    ``REBUILD_INTERVAL`` seconds to pick up role changes made without signals, in a
+    background thread of the one process that gets the lock. Lookups never write to
+    the sets, and fall back to counting wallets while the index is missing or Redis
+    is unavailable.
+    """
+
+    KEY_PREFIX = "karma_rank"
+    ALL = "all"
+    LEARNER = "learner"
+    MENTOR = "mentor"
+    ENABLER = "enabler"
+
+    BOARD_ROLES = {
+        MENTOR: RoleType.MENTOR.value,
+        ENABLER: RoleType.ENABLER.value,
+    }
+
+    REFRESH_INTERVAL = 30
+    REBUILD_INTERVAL = 3600
+    WATERMARK_OVERLAP = 300
+    LOCK_TIMEOUT = 300
+
+    def __init__(self):
+        self._rebuilder = None
+        self._rebuilder_lock = threading.Lock()
+
+    @property
+    def client(self) -> redis.Redis:
+        return RedisUtils.get_client()
+
+    def key(self, board: str) -> str:
+        return f"{self.KEY_PREFIX}:{board}"
+
+    def boards_for_roles(self, roles) -> set:
+        """
+        Returns the boards a user belongs to based on their verified role titles.
+        """
+        boards = {self.ALL}
+        boards.update(
+            board for board, title in self.BOARD_ROLES.items() if title in roles
+        )
+        if len(boards) == 1:
+            boards.add(self.LEARNER)
+        return boards
+
+    def boards_for_user(self, user_id: str) -> set:
+        roles = UserRoleLink.objects.filter(
+            user_id=user_id,
+            verified=True,
+            role__title__in=self.BOARD_ROLES.values(),
+        ).values_list("role__title", flat=True)
+        return self.boards_for_roles(set(roles))
+
+    def board_for_roles(self, roles) -> str:
+        boards = self.boards_for_roles(roles)
+        return next((board for board in self.BOARD_ROLES if board in boards), self.LEARNER)
+
+    def role_members(self, user_ids=None) -> dict:
+        """
+        Returns the users holding the verified role of every role board.
+        """
+        links = UserRoleLink.objects.filter(
+            verified=True, role__title__in=self.BOARD_ROLES.values()
+        )
+        if user_ids is not None:
+            links = links.filter(user_id__in=user_ids)
+
+        members = {board: set() for board in self.BOARD_ROLES}
+        for user_id, title in links.values_list("user_id", "role__title"):
+            for board, board_title in self.BOARD_ROLES.items():
+                if title == board_title:
+                    members[board].add(user_id)
+        return members
+
+    def board_wallets(self, board: str):
+        wallets = Wallet.objects.all()
+        if board == self.LEARNER:
+            return wallets.exclude(
+                user_id__in=UserRoleLink.objects.filter(
+                    verified=True, role__title__in=self.BOARD_ROLES.values()
+                ).values("user_id")
+            )
+        if board in self.BOARD_ROLES:
+            return wallets.filter(
+                user_id__in=UserRoleLink.objects.filter(
+                    verified=True, role__title=self.BOARD_ROLES[board]
+                ).values("user_id")
+            )
+        return wallets
+
+    def update(self, user_id: str, karma: int = None, roles=None):
+        """
+        Places the user on the boards they belong to with the given karma
+        and removes them from every other board.
+        """
+        if karma is None:
+            karma = (
+                Wallet.objects.filter(user_id=user_id)
+                .values_list("karma", flat=True)
+                .first()
+            )
+            if karma is None:
+                return self.remove(user_id)
+
+        boards = (
+            self.boards_for_user(user_id)
+            if roles is None
+            else self.boards_for_roles(roles)
+        )
+        with self.client.pipeline() as pipe:
+            for board in (self.ALL, self.LEARNER, *self.BOARD_ROLES):
+                if board in boards:
+                    pipe.zadd(self.key(board), {user_id: karma})
+                else:
+                    pipe.zrem(self.key(board), user_id)
+            pipe.execute()
+
+    def remove(self, user_id: str):
+        with self.client.pipeline() as pipe:
+            for board in (self.ALL, self.LEARNER, *self.BOARD_ROLES):
+                pipe.zrem(self.key(board), user_id)
+            pipe.execute()
+
+    def rank(self, user_id: str, karma: int, roles) -> int:
+        """
+        Returns the 1-based rank of the user on their board; users with the
+        same karma share a rank.
+        """
+        board = self.board_for_roles(roles)
+        try:
+            if self.ensure_fresh():
+                return self.client.zcount(self.key(board), f"({karma}", "+inf") + 1
+        except redis.RedisError as e:
+            logger.warning(f"Karma rank index lookup failed: {e}")
+        return self.board_wallets(board).filter(karma__gt=karma).count() + 1
+
+    def percentile(self, user_id: str, karma: int, roles) -> float:
+        """
+        Returns the share of all wallets whose karma is not below the given karma.
+        """
+        counts = None
+        try:
+            if self.ensure_fresh():
+                with self.client.pipeline() as pipe:
+                    pipe.zcount(self.key(self.ALL), "-inf", f"({karma}")
+                    pipe.zcard(self.key(self.ALL))
+                    counts = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Karma rank index lookup failed: {e}")
+
+        if counts is None:
+            counts = Wallet.objects.filter(karma__lt=karma).count(), Wallet.objects.count()
+        users_count_lt_user_karma, user_count = counts
+
+        return 0 if user_count == 0 else 100 - ((users_count_lt_user_karma * 100) / user_count)
+
+    def ensure_fresh(self) -> bool:
+        """
+        Starts a background rebuild when the index is missing or due, and
+        applies the recent wallet changes.
+
+        Returns:
+            bool: False while the index is missing and lookups have to count wallets.
+        """
+        exists = self.client.exists(self.key(self.ALL))
+        if not exists or self.client.set(self.key("rebuilt"), 1, nx=True, ex=self.REBUILD_INTERVAL):
+            self.start_rebuild()
+        elif self.client.set(self.key("fresh"), 1, nx=True, ex=self.REFRESH_INTERVAL):
+            self.refresh()
+        return bool(exists)
+
+    def start_rebuild(self):
+        with self._rebuilder_lock:
+            if self._rebuilder is None or not self._rebuilder.is_alive():
+                self._rebuilder = threading.Thread(
+                    target=self.rebuild_in_background, name="karma-rank-rebuild", daemon=True
+                )
+                self._rebuilder.start()
+
+    def rebuild_in_background(self):
+        try:
+            # another process already rebuilding is left to it
+            self.rebuild(blocking_timeout=0)
+        except Exception as e:
+            logger.error(f"Karma rank index rebuild failed: {e}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def wallet_watermark():
+        return Wallet.objects.aggregate(watermark=Max("updated_at"))["watermark"]
+
+    def refresh(self):
+        """
+        Re-reads the wallets updated since the stored watermark, minus
+        ``WATERMARK_OVERLAP``, and places them on their boards.
+        """
+        if not self.client.get(self.key("watermark")):
+            return self.start_rebuild()
+
+        # skipped while a rebuild holds the lock, the rebuild covers these wallets
+        lock = self.client.lock(f"{self.KEY_PREFIX}:lock", timeout=self.LOCK_TIMEOUT, blocking_timeout=0)
+        if not lock.acquire():
+            return
+        try:
+            since = datetime.datetime.fromisoformat(self.client.get(self.key("watermark")))
+            wallets = list(
+                Wallet.objects.filter(
+                    updated_at__gte=since - datetime.timedelta(seconds=self.WATERMARK_OVERLAP)
+                ).values_list("user_id", "karma", "updated_at")
+            )
+            if not wallets:
+                return
+
+            role_members = self.role_members([user_id for user_id, _, _ in wallets])
+            with self.client.pipeline() as pipe:
+                for user_id, karma, _ in wallets:
+                    roles = {
+                        self.BOARD_ROLES[board]
+                        for board, members in role_members.items()
+                        if user_id in members
+                    }
+                    boards = self.boards_for_roles(roles)
+                    for board in (self.ALL, self.LEARNER, *self.BOARD_ROLES):
+                        if board in boards:
+                            pipe.zadd(self.key(board), {user_id: karma})
+                        else:
+                            pipe.zrem(self.key(board), user_id)
+                watermark = max(updated_at for _, _, updated_at in wallets)
+                if watermark > since:
+                    pipe.set(self.key("watermark"), watermark.isoformat())
+                pipe.execute()
+        finally:
+            lock.release()
+
+    def rebuild(self, blocking_timeout: float = None) -> bool:
+        """
+        Rebuilds every board from the wallet table into temporary keys and
+        swaps them in atomically, so readers never observe a partial index.
+
+        Returns:
+            bool: False if the lock was not acquired within `blocking_timeout`.
+        """
+        lock = self.client.lock(
+            f"{self.KEY_PREFIX}:lock", timeout=self.LOCK_TIMEOUT, blocking_timeout=blocking_timeout
+        )
+        if not lock.acquire():
+            return False
+        try:
+            watermark = self.wallet_watermark()
+            role_members = self.role_members()
+
+            boards = {board: {} for board in (self.ALL, self.LEARNER, *self.BOARD_ROLES)}
+            for user_id, karma in Wallet.objects.values_list("user_id", "karma").iterator(
+                chunk_size=5000
+            ):
+                boards[self.ALL][user_id] = karma
+                is_learner = True
+                for board, members in role_members.items():
+                    if user_id in members:
+                        boards[board][user_id] = karma
+                        is_learner = False
+                if is_learner:
+                    boards[self.LEARNER][user_id] = karma
+
+            with self.client.pipeline() as pipe:
+                for board, scores in boards.items():
+                    tmp_key = f"{self.key(board)}:rebuild"
+                    pipe.delete(tmp_key)
+                    items = list(scores.items())
+                    for start in range(0, len(items), 5000):
+                        pipe.zadd(tmp_key, dict(items[start:start + 5000]))
+                    if scores:
+                        pipe.rename(tmp_key, self.key(board))
+                    else:
+                        pipe.delete(self.key(board))
+                pipe.set(self.key("watermark"), watermark.isoformat() if watermark else "")
+                pipe.set(self.key("rebuilt"), 1, ex=self.REBUILD_INTERVAL)
+                pipe.execute()
+        finally:
+            lock.release()
+        return True
+
+
+karma_rank_index = KarmaRankIndex()
+
+
+@receiver(post_save, sender=Wallet)
+def wallet_saved(sender, instance, **kwargs):
+    try:
+        karma_rank_index.update(instance.user_id, instance.karma)
+    except redis.RedisError as e:
+        logger.warning(f"Karma rank index update failed: {e}")
+
+
+@receiver(post_delete, sender=Wallet)
+def wallet_deleted(sender, instance, **kwargs):
+    try:
+        karma_rank_index.remove(instance.user_id)
+    except redis.RedisError as e:
+        logger.warning(f"Karma rank index update failed: {e}")
+
+
+@receiver(post_save, sender=UserRoleLink)
+@receiver(post_delete, sender=UserRoleLink)
+def user_role_changed(sender, instance, **kwargs):
+    if instance.role.title not in KarmaRankIndex.BOARD_ROLES.values():
+        return
+    try:
+        karma_rank_index.update(instance.user_id)
+    except redis.RedisError as e:
+        logger.warning(f"Karma rank index update failed: {e}")
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from io import BytesIO
 from typing import Optional
 
@@ -8,6 +9,30 @@ import time
 image_location = './api/dashboard/karma_voucher/assets/karmacard.png'
 font_location =  './api/dashboard/karma_voucher/fonts/Roboto-Light.ttf'
 
+# (field, position, font size) of every text drawn on the card
+text_layout = (
+    ('name', (135, 250), 60),
+    ('hashtag', (135, 450), 45),
+    ('karma', (920, 135), 45),
+    ('code', (135, 135), 20),
+    ('month', (135, 375), 30),
+)
+
+
+@lru_cache(maxsize=1)
+def get_template():
+    """
+    Returns the voucher card decoded once per process; callers draw on a copy.
+    """
+    with Image.open(image_location) as image:
+        return image.convert('RGB')
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    return ImageFont.truetype(font_location, size=size)
+
+
 def generate_karma_voucher(name, hashtag, karma, code, month):
     """
     Generate a karma voucher for the given users
@@ -17,43 +42,26 @@ def generate_karma_voucher(name, hashtag, karma, code, month):
     :param code:
     :param month:
     :return:
-    """   
-
-
-    image = Image.open(image_location)
-    image = image.convert('RGB')
+    """
+    texts = {'name': name, 'hashtag': hashtag, 'karma': karma, 'code': code, 'month': month}
 
+    image = get_template().copy()
     draw = ImageDraw.Draw(image)
-    x = 135
-    y = 250
-    font1 = ImageFont.truetype(font_location, size=60)
-    draw.text((x, y), name, fill=(255, 255, 255), font=font1)
-
-    x1 = 135
-    y1 = 450
-    font2 = ImageFont.truetype(font_location, size=45)
-    draw.text((x1, y1), hashtag, fill=(255, 255, 255), font=font2)
-
-    x2 = 920
-    y2 = 135
-    font3 = ImageFont.truetype(font_location, size=45)
-    draw.text((x2, y2), karma, fill=(255, 255, 255), font=font3)
-
-    x3 = 135
-    y3 = 135
-    font3 = ImageFont.truetype(font_location, size=20)
-    draw.text((x3, y3), code, fill=(255, 255, 255), font=font3)
-
-    x3 = 135
-    y3 = 375
-    font3 = ImageFont.truetype(font_location, size=30)
-    draw.text((x3, y3), month, fill=(255, 255, 255), font=font3)
+    for field, position, size in text_layout:
+        draw.text(position, texts[field], fill=(255, 255, 255), font=get_font(size))
 
     image_data = BytesIO()
     image.save(image_data, format='JPEG')
     return image_data
 
 
+def render_karma_voucher(name, hashtag, karma, code, month) -> bytes:
+    """
+    `generate_karma_voucher` returning the JPEG bytes, so it can run in a process pool.
+    """
+    return generate_karma_voucher(name, hashtag, karma, code, month).getvalue()
+
+
 def generate_ordered_id(count):
     day = time.strftime('%d')
     month = time.strftime('%m')
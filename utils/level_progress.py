@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import redis
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.task import KarmaActivityLog, Level, TaskList, UserIgLink
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class LevelProgress:
+    """
+    Level -> task completion of users, computed in memory.
+
+    The catalogue of levels and their tasks is the same for every user, so
+    each process keeps it in memory. Changes to `Level` or `TaskList` bump a
+    version counter in Redis that is checked at most every `CHECK_INTERVAL`
+    seconds; the catalogue is also reloaded after `MAX_AGE` seconds to pick
+    up tasks written without signals (bulk inserts, direct database writes).
+
+    A user's progress then costs two queries, their IGs and their completed
+    task ids, whatever the number of levels and tasks, and `matrices`
+    answers for many users with the same two queries.
+    """
+
+    VERSION_KEY = "level_catalogue:version"
+    CHECK_INTERVAL = 5
+    MAX_AGE = 300
+    # levels above this only list the tasks of the user's interest groups
+    IG_LEVEL_ORDER = 4
+
+    def __init__(self):
+        self._catalogue = None
+        self._version = None
+        self._loaded_at = 0
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return self._version
+        try:
+            version = RedisUtils.get_client().get(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Level catalogue version check failed: {e}")
+            version = object()
+        self._checked_at = now
+        return version
+
+    def get_catalogue(self) -> list:
+        """
+        Returns the levels ordered by `level_order`, each as a dict with its
+        tasks.
+        """
+        with self._lock:
+            version = self.current_version()
+            if (
+                self._catalogue is None
+                or version != self._version
+                or time.monotonic() - self._loaded_at > self.MAX_AGE
+            ):
+                self._catalogue = self.load_catalogue()
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._catalogue
+
+    def load_catalogue(self) -> list:
+        tasks = defaultdict(list)
+        for task in TaskList.objects.filter(level__isnull=False).values(
+            "id", "level_id", "title", "discord_link", "hashtag", "karma", "active", "ig__name"
+        ):
+            tasks[task["level_id"]].append(task)
+
+        return [
+            {**level, "tasks": tasks.get(level["id"], [])}
+            for level in Level.objects.order_by("level_order").values("id", "name", "karma", "level_order")
+        ]
+
+    def invalidate(self):
+        with self._lock:
+            self._catalogue = None
+            self._checked_at = 0
+        try:
+            RedisUtils.get_client().incr(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Level catalogue invalidation failed: {e}")
+
+    @staticmethod
+    def completed_task_ids(user_ids) -> dict:
+        completed = defaultdict(set)
+        for user_id, task_id in KarmaActivityLog.objects.filter(
+            user_id__in=user_ids, appraiser_approved=True, task__level__isnull=False
+        ).values_list("user_id", "task_id").distinct():
+            completed[user_id].add(task_id)
+        return completed
+
+    @staticmethod
+    def user_igs(user_ids) -> dict:
+        igs = defaultdict(set)
+        for user_id, ig_name in UserIgLink.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "ig__name"
+        ):
+            igs[user_id].add(ig_name)
+        return igs
+
+    def build_matrix(self, catalogue: list, completed: set, igs: set) -> list:
+        matrix = []
+        for level in catalogue:
+            tasks = []
+            for task in level["tasks"]:
+                if level["level_order"] > self.IG_LEVEL_ORDER and task["ig__name"] not in igs:
+                    continue
+                is_completed = task["id"] in completed
+                if task["active"] or is_completed:
+                    tasks.append(
+                        {
+                            "task_name": task["title"],
+                            "discord_link": task["discord_link"],
+                            "hashtag": task["hashtag"],
+                            "completed": is_completed,
+                            "karma": task["karma"],
+                        }
+                    )
+            matrix.append({"name": level["name"], "tasks": tasks, "karma": level["karma"]})
+        return matrix
+
+    def matrices(self, user_ids, catalogue: list = None) -> dict:
+        """
+        Returns the level/task matrix of every user as {user_id: [levels]}.
+        """
+        user_ids = list(user_ids)
+        catalogue = self.get_catalogue() if catalogue is None else catalogue
+        completed = self.completed_task_ids(user_ids)
+        igs = self.user_igs(user_ids)
+        return {
+            user_id: self.build_matrix(catalogue, completed[user_id], igs[user_id])
+            for user_id in user_ids
+        }
+
+    def matrix(self, user_id: str) -> list:
+        return self.matrices([user_id])[user_id]
+
+    def summaries(self, user_ids) -> dict:
+        """
+        Returns the completed and total task counts of every level per user,
+        as {user_id: [{"level", "name", "completed", "total"}]}.
+        """
+        catalogue = self.get_catalogue()
+        return {
+            user_id: [
+                {
+                    "level": level["level_order"],
+                    "name": level["name"],
+                    "completed": sum(task["completed"] for task in level_matrix["tasks"]),
+                    "total": len(level_matrix["tasks"]),
+                }
+                for level, level_matrix in zip(catalogue, matrix)
+            ]
+            for user_id, matrix in self.matrices(user_ids, catalogue).items()
+        }
+
+
+level_progress = LevelProgress()
+
+
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+@receiver(post_save, sender=TaskList)
+@receiver(post_delete, sender=TaskList)
+def level_catalogue_changed(sender, **kwargs):
+    transaction.on_commit(level_progress.invalidate)
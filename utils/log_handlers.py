@@ -0,0 +1,154 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class SizedTimedRotatingFileHandler(RotatingFileHandler):
+    """
+    `RotatingFileHandler` that also rolls the file over every `interval`
+    seconds, keeping `backup_count` numbered backups (`sql.log.1`, ...).
+
+    Every worker process writes the same files, so before writing the handler
+    reopens the file when another process already rotated it, and skips its
+    own rollover in that case.
+    """
+
+    def __init__(self, filename, max_bytes=0, interval=0, backup_count=0, encoding="utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.interval = interval
+        self.rollover_at = self.compute_rollover(self.file_started_at())
+
+    def file_started_at(self) -> float:
+        try:
+            return os.stat(self.baseFilename).st_mtime
+        except FileNotFoundError:
+            return time.time()
+
+    def compute_rollover(self, started_at: float):
+        return started_at + self.interval if self.interval else None
+
+    def reopen_if_rotated(self) -> bool:
+        if self.stream is None:
+            return False
+        try:
+            rotated = os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            self.stream.close()
+            self.stream = self._open()
+            self.rollover_at = self.compute_rollover(time.time())
+        return rotated
+
+    def shouldRollover(self, record) -> bool:
+        if self.reopen_if_rotated():
+            return False
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self.compute_rollover(time.time())
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    Writes log records to a `SizedTimedRotatingFileHandler` from a background
+    thread.
+
+    The logging call only merges the message arguments and puts the record on
+    a bounded queue; formatting and file writes happen in the `QueueListener`
+    thread of the process. When the queue is full the record is dropped and
+    counted instead of blocking the request.
+    """
+
+    def __init__(
+        self,
+        filename,
+        max_bytes=0,
+        interval=0,
+        backup_count=0,
+        queue_size=10000,
+    ):
+        super().__init__(queue.Queue(queue_size))
+        self.target = SizedTimedRotatingFileHandler(filename, max_bytes, interval, backup_count)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.listener = None
+        self._lock = threading.Lock()
+        self.start()
+        atexit.register(self.stop)
+
+    def start(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+        self.listener = None
+
+    def setFormatter(self, fmt):
+        # formatting happens in the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # the listener thread does not survive a fork, e.g. a preloaded worker
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.Queue(self.queue_size)
+                    self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the `extra` fields of the record (the
+    duration and statement of a sampled query) as keys.
+    """
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        data.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in self.RESERVED and not key.startswith("_")
+        )
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, default=str)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from utils.webhook_dispatcher import discord_webhook_dispatcher
+
+
+class Command(BaseCommand):
+    help = "Delivers queued Discord webhook events; runs until interrupted unless --once is given"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Deliver the due events and exit")
+
+    def handle(self, *args, **options):
+        if not options["once"]:
+            discord_webhook_dispatcher.run_forever()
+
+        dispatched = 0
+        while count := discord_webhook_dispatcher.dispatch_batch():
+            dispatched += count
+        self.stdout.write(self.style.SUCCESS(f"Dispatched {dispatched} webhook events"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from db.user import UserSettings
+from utils.qr_code import profile_qr_code
+
+
+class Command(BaseCommand):
+    help = "Renders the profile QR code of every public profile that has no up to date image"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Re-render images that already exist")
+
+    def handle(self, *args, **options):
+        user_ids = UserSettings.objects.filter(is_public=True).values_list("user_id", flat=True)
+
+        generated = 0
+        for user_id in user_ids.iterator(chunk_size=1000):
+            profile_qr_code.get_or_create(user_id, force=options["force"])
+            generated += 1
+        self.stdout.write(self.style.SUCCESS(f"{generated} profile QR codes up to date"))
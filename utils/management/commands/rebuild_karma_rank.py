@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from utils.karma_rank import karma_rank_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the global karma rank index from the wallet table"
+
+    def handle(self, *args, **options):
+        karma_rank_index.rebuild()
+        self.stdout.write(self.style.SUCCESS("Karma rank index rebuilt"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.search_index import search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search documents of the dashboard lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "entities", nargs="*", help="Entities to rebuild, all of them when omitted"
+        )
+
+    def handle(self, *args, **options):
+        entities = options["entities"] or list(search_index.entities)
+        if unknown := set(entities) - set(search_index.entities):
+            raise CommandError(f"Unknown entities: {', '.join(sorted(unknown))}")
+
+        for name in entities:
+            total = search_index.rebuild(name)
+            self.stdout.write(self.style.SUCCESS(f"{name}: {total} documents indexed"))
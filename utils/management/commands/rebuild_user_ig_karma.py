@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the user_ig_karma rollup from the approved karma activity log"
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("DELETE FROM user_ig_karma")
+            cursor.execute("""
+                INSERT INTO user_ig_karma (user_id, ig_id, karma, updated_at)
+                SELECT kal.user_id, t.ig_id, SUM(kal.karma), now()
+                FROM karma_activity_log kal
+                JOIN task_list t ON t.id = kal.task_id
+                WHERE kal.appraiser_approved = 1 AND t.ig_id IS NOT NULL
+                GROUP BY kal.user_id, t.ig_id
+            """)
+            rows = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(f"User IG karma rebuilt, {rows} rows"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from utils.import_jobs import import_job_runner
+
+
+class Command(BaseCommand):
+    help = "Runs queued Excel import jobs; runs until interrupted unless --once is given"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the queued jobs and exit")
+
+    def handle(self, *args, **options):
+        if not options["once"]:
+            import_job_runner.run_forever()
+
+        processed = 0
+        while import_job_runner.run_next():
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} import jobs"))
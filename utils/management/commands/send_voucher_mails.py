@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from db.task import VoucherLog
+from utils.types import VoucherMailStatus
+from utils.voucher_delivery import voucher_delivery
+
+
+class Command(BaseCommand):
+    help = "Resends the karma voucher mails that failed; --pending also sends the ones never attempted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pending", action="store_true", help="Also send vouchers still pending")
+
+    def handle(self, *args, **options):
+        statuses = [VoucherMailStatus.FAILED.value]
+        if options["pending"]:
+            statuses.append(VoucherMailStatus.PENDING.value)
+
+        voucher_ids = list(
+            VoucherLog.objects.filter(mail_status__in=statuses).values_list("id", flat=True)
+        )
+        failed = voucher_delivery.deliver(voucher_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {len(voucher_ids) - len(failed)} of {len(voucher_ids)} voucher mails")
+        )
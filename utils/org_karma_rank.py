@@ -0,0 +1,368 @@
+import datetime
+import logging
+import threading
+
+import redis
+from django.db import connection
+from django.db.models import Max, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.organization import UserOrganizationLink
+from db.task import Wallet
+from utils.types import OrganizationType
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class OrgKarmaRollup:
+    """
+    Campus karma rolled up through the org -> district -> zone -> state hierarchy.
+
+    A college's karma is the wallet karma of every user linked to it, and each
+    higher level is the sum of the colleges below it. Every level is kept as a
+    Redis sorted set (member: id, score: karma) so ranks are answered with
+    ``ZREVRANK``; colleges are also kept per district and districts per zone for
+the top lists of the district and zonal dashboards.
+
+    Reads refresh the rollup at most every ``REFRESH_INTERVAL`` seconds: only
+    colleges with a user whose wallet changed since the stored watermark, or
+    whose links changed (``dirty`` set), are re-aggregated and the difference
+    is applied to their district, zone and state. The last ``WATERMARK_OVERLAP``
+    seconds are read again, so wallets committed late by a long transaction are
+    not skipped. The rollup is rebuilt from the database every
+    ``REBUILD_INTERVAL`` seconds, in a background thread, to pick up org moves
+    and deletions that leave no wallet trail. Lookups sum the wallets in the
+    database while the rollup is missing or Redis is unavailable.
+    """
+
+    KEY_PREFIX = "org_karma"
+    COLLEGE = "college"
+    DISTRICT = "district"
+    ZONE = "zone"
+    STATE = "state"
+    LEVELS = (COLLEGE, DISTRICT, ZONE, STATE)
+    LEVEL_FIELDS = {
+        COLLEGE: "org_id",
+        DISTRICT: "org__district_id",
+        ZONE: "org__district__zone_id",
+        STATE: "org__district__zone__state_id",
+    }
+
+    REFRESH_INTERVAL = 30
+    REBUILD_INTERVAL = 3600
+    WATERMARK_OVERLAP = 300
+    LOCK_TIMEOUT = 300
+
+    def __init__(self):
+        self._rebuilder = None
+        self._rebuilder_lock = threading.Lock()
+
+    @property
+    def client(self) -> redis.Redis:
+        return RedisUtils.get_client()
+
+    def key(self, *parts) -> str:
+        return ":".join((self.KEY_PREFIX, *parts))
+
+    def district_colleges_key(self, district_id: str) -> str:
+        return self.key(self.DISTRICT, district_id, self.COLLEGE)
+
+    def zone_districts_key(self, zone_id: str) -> str:
+        return self.key(self.ZONE, zone_id, self.DISTRICT)
+
+    def rank(self, level: str, member_id: str) -> int:
+        """
+        Returns the 1-based rank of the college/district/zone/state, None if it
+        has no linked users.
+        """
+        try:
+            if self.ensure_fresh():
+                rank = self.client.zrevrank(self.key(level), member_id)
+                return None if rank is None else rank + 1
+        except redis.RedisError as e:
+            logger.warning(f"Org karma rollup lookup failed: {e}")
+
+        karma = self.db_karma(level, member_id)
+        if karma is None:
+            return None
+        return self.level_totals(level).filter(total_karma__gt=karma).count() + 1
+
+    def karma(self, level: str, member_id: str) -> int:
+        try:
+            if self.ensure_fresh():
+                karma = self.client.zscore(self.key(level), member_id)
+                return None if karma is None else int(karma)
+        except redis.RedisError as e:
+            logger.warning(f"Org karma rollup lookup failed: {e}")
+        return self.db_karma(level, member_id)
+
+    def top(self, key: str, count: int, level: str, **filters) -> dict:
+        """
+        Returns the `count` highest members of the sorted set at `key`, or of
+        `level` narrowed by `filters` when the rollup cannot be read.
+        """
+        try:
+            if self.ensure_fresh():
+                return {
+                    member_id: int(karma)
+                    for member_id, karma in self.client.zrevrange(key, 0, count - 1, withscores=True)
+                }
+        except redis.RedisError as e:
+            logger.warning(f"Org karma rollup lookup failed: {e}")
+
+        field = self.LEVEL_FIELDS[level]
+        return {
+            row[field]: int(row["total_karma"])
+            for row in self.level_totals(level, **filters).order_by("-total_karma")[:count]
+        }
+
+    def top_colleges(self, district_id: str, count: int) -> dict:
+        """
+        Returns the top colleges of a district as an ordered {org_id: karma} dict.
+        """
+        return self.top(
+            self.district_colleges_key(district_id), count, self.COLLEGE, org__district_id=district_id
+        )
+
+    def top_districts(self, zone_id: str, count: int) -> dict:
+        """
+        Returns the top districts of a zone as an ordered {district_id: karma} dict.
+        """
+        return self.top(
+            self.zone_districts_key(zone_id), count, self.DISTRICT, org__district__zone_id=zone_id
+        )
+
+    def ensure_fresh(self) -> bool:
+        """
+        Starts a background rebuild when the rollup is missing or due, and
+        applies the recent wallet and link changes.
+
+        Returns:
+            bool: False while the rollup is missing and lookups have to sum wallets.
+        """
+        exists = self.client.exists(self.key("watermark"))
+        if not exists or self.client.set(self.key("rebuilt"), 1, nx=True, ex=self.REBUILD_INTERVAL):
+            self.start_rebuild()
+        elif self.client.set(self.key("fresh"), 1, nx=True, ex=self.REFRESH_INTERVAL):
+            self.refresh()
+        return bool(exists)
+
+    def start_rebuild(self):
+        with self._rebuilder_lock:
+            if self._rebuilder is None or not self._rebuilder.is_alive():
+                self._rebuilder = threading.Thread(
+                    target=self.rebuild_in_background, name="org-karma-rebuild", daemon=True
+                )
+                self._rebuilder.start()
+
+    def rebuild_in_background(self):
+        try:
+            # another process already rebuilding is left to it
+            self.rebuild(blocking_timeout=0)
+        except Exception as e:
+            logger.error(f"Org karma rollup rebuild failed: {e}")
+        finally:
+            connection.close()
+
+    def level_totals(self, level: str, **filters):
+        """
+        Sums the wallet karma of the college members per member of `level`,
+        straight from the database.
+        """
+        return (
+            UserOrganizationLink.objects.filter(
+                org__org_type=OrganizationType.COLLEGE.value, **filters
+            )
+            .values(self.LEVEL_FIELDS[level])
+            .annotate(total_karma=Coalesce(Sum("user__wallet_user__karma"), 0))
+        )
+
+    def db_karma(self, level: str, member_id: str) -> int:
+        row = self.level_totals(level, **{self.LEVEL_FIELDS[level]: member_id}).first()
+        return None if row is None else int(row["total_karma"])
+
+    def college_totals(self, org_ids=None) -> list:
+        links = UserOrganizationLink.objects.filter(
+            org__org_type=OrganizationType.COLLEGE.value
+        )
+        if org_ids is not None:
+            links = links.filter(org_id__in=org_ids)
+
+        return list(
+            links.values(
+                "org_id",
+                "org__district_id",
+                "org__district__zone_id",
+                "org__district__zone__state_id",
+            ).annotate(total_karma=Sum("user__wallet_user__karma"))
+        )
+
+    @staticmethod
+    def parents(row) -> tuple:
+        return (
+            row["org__district_id"],
+            row["org__district__zone_id"],
+            row["org__district__zone__state_id"],
+        )
+
+    def wallet_watermark(self):
+        return Wallet.objects.aggregate(watermark=Max("updated_at"))["watermark"]
+
+    def rebuild(self, blocking_timeout: float = None) -> bool:
+        """
+        Recomputes every level from the database and replaces the stored
+        rollup in a single transaction.
+
+        Returns:
+            bool: False if the lock was not acquired within `blocking_timeout`.
+        """
+        lock = self.client.lock(
+            self.key("lock"), timeout=self.LOCK_TIMEOUT, blocking_timeout=blocking_timeout
+        )
+        if not lock.acquire():
+            return False
+        try:
+            watermark = self.wallet_watermark()
+            dirty = self.client.smembers(self.key("dirty"))
+
+            levels = {level: {} for level in self.LEVELS}
+            district_colleges = {}
+            zone_districts = {}
+            parents = {}
+            for row in self.college_totals():
+                karma = row["total_karma"] or 0
+                district_id, zone_id, state_id = self.parents(row)
+                levels[self.COLLEGE][row["org_id"]] = karma
+                for level, member_id in (
+                    (self.DISTRICT, district_id), (self.ZONE, zone_id), (self.STATE, state_id)
+                ):
+                    levels[level][member_id] = levels[level].get(member_id, 0) + karma
+                district_colleges.setdefault(district_id, {})[row["org_id"]] = karma
+                districts = zone_districts.setdefault(zone_id, {})
+                districts[district_id] = districts.get(district_id, 0) + karma
+                parents[row["org_id"]] = "|".join(self.parents(row))
+
+            stale_keys = [
+                *self.client.scan_iter(self.district_colleges_key("*")),
+                *self.client.scan_iter(self.zone_districts_key("*")),
+            ]
+            with self.client.pipeline() as pipe:
+                pipe.delete(*stale_keys, *(self.key(level) for level in self.LEVELS), self.key("parents"))
+                for level, scores in levels.items():
+                    if scores:
+                        pipe.zadd(self.key(level), scores)
+                for district_id, scores in district_colleges.items():
+                    pipe.zadd(self.district_colleges_key(district_id), scores)
+                for zone_id, scores in zone_districts.items():
+                    pipe.zadd(self.zone_districts_key(zone_id), scores)
+                if parents:
+                    pipe.hset(self.key("parents"), mapping=parents)
+                if dirty:
+                    pipe.srem(self.key("dirty"), *dirty)
+                pipe.set(self.key("watermark"), watermark.isoformat() if watermark else "")
+                pipe.set(self.key("rebuilt"), 1, ex=self.REBUILD_INTERVAL)
+                pipe.execute()
+        finally:
+            lock.release()
+        return True
+
+    def refresh(self):
+        """
+        Re-aggregates the colleges touched since the last refresh, minus
+        ``WATERMARK_OVERLAP``, and applies the change in their karma to every
+        level above them.
+        """
+        # skipped while a rebuild holds the lock, the rebuild covers these colleges
+        lock = self.client.lock(self.key("lock"), timeout=self.LOCK_TIMEOUT, blocking_timeout=0)
+        if not lock.acquire():
+            return
+        try:
+            since = self.client.get(self.key("watermark"))
+            watermark = self.wallet_watermark()
+            org_ids = self.client.smembers(self.key("dirty"))
+            dirty = set(org_ids)
+
+            if watermark and since:
+                # re-aggregating a college is idempotent, so overlapping reads are harmless
+                user_ids = Wallet.objects.filter(
+                    updated_at__gte=datetime.datetime.fromisoformat(since)
+                    - datetime.timedelta(seconds=self.WATERMARK_OVERLAP)
+                ).values_list("user_id", flat=True)
+                org_ids.update(
+                    UserOrganizationLink.objects.filter(
+                        user_id__in=user_ids, org__org_type=OrganizationType.COLLEGE.value
+                    ).values_list("org_id", flat=True)
+                )
+            if not org_ids:
+                return
+
+            org_ids = list(org_ids)
+            totals = {row["org_id"]: row for row in self.college_totals(org_ids)}
+            with self.client.pipeline() as pipe:
+                for org_id in org_ids:
+                    pipe.zscore(self.key(self.COLLEGE), org_id)
+                pipe.hmget(self.key("parents"), org_ids)
+                *old_karmas, old_parents = pipe.execute()
+
+            with self.client.pipeline() as pipe:
+                for org_id, old_karma, old_parent in zip(org_ids, old_karmas, old_parents):
+                    row = totals.get(org_id)
+                    if old_karma is not None:
+                        # take the college out of its previous parents
+                        district_id, zone_id, state_id = old_parent.split("|")
+                        pipe.zincrby(self.key(self.DISTRICT), -old_karma, district_id)
+                        pipe.zincrby(self.key(self.ZONE), -old_karma, zone_id)
+                        pipe.zincrby(self.key(self.STATE), -old_karma, state_id)
+                        pipe.zincrby(self.zone_districts_key(zone_id), -old_karma, district_id)
+                        pipe.zrem(self.district_colleges_key(district_id), org_id)
+                        pipe.zrem(self.key(self.COLLEGE), org_id)
+                        pipe.hdel(self.key("parents"), org_id)
+                    if row is None:
+                        continue
+
+                    karma = row["total_karma"] or 0
+                    district_id, zone_id, state_id = self.parents(row)
+                    pipe.zadd(self.key(self.COLLEGE), {org_id: karma})
+                    pipe.zadd(self.district_colleges_key(district_id), {org_id: karma})
+                    pipe.zincrby(self.key(self.DISTRICT), karma, district_id)
+                    pipe.zincrby(self.key(self.ZONE), karma, zone_id)
+                    pipe.zincrby(self.key(self.STATE), karma, state_id)
+                    pipe.zincrby(self.zone_districts_key(zone_id), karma, district_id)
+                    pipe.hset(self.key("parents"), org_id, "|".join(self.parents(row)))
+                if dirty:
+                    pipe.srem(self.key("dirty"), *dirty)
+                if watermark:
+                    pipe.set(self.key("watermark"), watermark.isoformat())
+                pipe.execute()
+        finally:
+            lock.release()
+
+    def mark_dirty(self, org_id: str):
+        with self.client.pipeline() as pipe:
+            pipe.sadd(self.key("dirty"), org_id)
+            pipe.delete(self.key("fresh"))
+            pipe.execute()
+
+
+org_karma_rollup = OrgKarmaRollup()
+
+
+@receiver(post_save, sender=Wallet)
+def wallet_saved(sender, instance, **kwargs):
+    # karma awarded in-app is rolled up on the next read instead of after the refresh interval
+    try:
+        org_karma_rollup.client.delete(org_karma_rollup.key("fresh"))
+    except redis.RedisError as e:
+        logger.warning(f"Org karma rollup update failed: {e}")
+
+
+@receiver(post_save, sender=UserOrganizationLink)
+@receiver(post_delete, sender=UserOrganizationLink)
+def user_organization_link_changed(sender, instance, **kwargs):
+    try:
+        org_karma_rollup.mark_dirty(instance.org_id)
+    except redis.RedisError as e:
+        logger.warning(f"Org karma rollup update failed: {e}")
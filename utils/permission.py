@@ -1,20 +1,28 @@
 import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 import jwt
-from django.conf import settings
+import redis
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.http import HttpRequest
-from rest_framework import authentication
 from rest_framework.authentication import get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import BasePermission
 
 from mulearnbackend.settings import SECRET_KEY
-from utils.utils import DateTimeUtils
+from utils.utils import DateTimeUtils, RedisUtils
 from .exception import UnauthorizedAccessException
 from .response import CustomResponse
 
-from db.user import DynamicRole, DynamicUser
+from db.user import DynamicRole, DynamicUser, Role
+
+logger = logging.getLogger(__name__)
 
 
 # def get_current_utc_time():
@@ -66,13 +74,88 @@ class CustomizePermission(BasePermission):
         return f'{self.token_prefix} realm="api"'
 
 
+class VerifiedTokenCache:
+    """
+    Process wide LRU of tokens whose signature has already been verified.
+
+    Entries are keyed by the raw token and dropped once the token's own expiry
+    has passed, so a cached payload is never served for an expired token.
+    """
+
+    MAX_SIZE = 2048
+
+    def __init__(self):
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            if (entry := self._tokens.get(token)) is None:
+                return None
+            payload, expiry = entry
+            if expiry < DateTimeUtils.get_current_utc_time():
+                del self._tokens[token]
+                return None
+            self._tokens.move_to_end(token)
+            return payload
+
+    def set(self, token, payload, expiry):
+        with self._lock:
+            self._tokens[token] = (payload, expiry)
+            self._tokens.move_to_end(token)
+            if len(self._tokens) > self.MAX_SIZE:
+                now = DateTimeUtils.get_current_utc_time()
+                for key in [key for key, (_, exp) in self._tokens.items() if exp < now]:
+                    del self._tokens[key]
+            while len(self._tokens) > self.MAX_SIZE:
+                self._tokens.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache()
+
+
 class JWTUtils:
+    token_prefix = "Bearer"
+
+    @staticmethod
+    def get_token(request):
+        auth_header = get_authorization_header(request).decode("utf-8")
+        if not auth_header or not auth_header.startswith(JWTUtils.token_prefix):
+            raise UnauthorizedAccessException("Invalid token header")
+
+        token = auth_header[len(JWTUtils.token_prefix):].strip()
+        if not token:
+            raise UnauthorizedAccessException("Empty Token")
+        return token
+
+    @staticmethod
+    def decode_token(request):
+        """
+        Returns the verified payload of the request's bearer token.
+
+        The payload is decoded once per request and kept on the request, and
+        tokens that are still valid are shared across requests through
+        `verified_tokens`, so the signature of a token is verified only once.
+        """
+        token = JWTUtils.get_token(request)
+        if (cached := getattr(request, "_jwt_payload", None)) and cached[0] == token:
+            return cached[1]
+
+        if (payload := verified_tokens.get(token)) is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"], verify=True)
+            try:
+                expiry = datetime.strptime(payload.get("expiry"), "%Y-%m-%d %H:%M:%S%z")
+            except (TypeError, ValueError):
+                expiry = None
+            if expiry is not None and expiry >= DateTimeUtils.get_current_utc_time():
+                verified_tokens.set(token, payload, expiry)
+
+        request._jwt_payload = (token, payload)
+        return payload
+
     @staticmethod
     def fetch_role(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
+        payload = JWTUtils.decode_token(request)
         roles = payload.get("roles")
         if roles is None:
             raise Exception(
@@ -82,10 +165,7 @@ class JWTUtils:
 
     @staticmethod
     def fetch_user_id(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
+        payload = JWTUtils.decode_token(request)
         user_id = payload.get("id")
         if user_id is None:
             raise Exception(
@@ -95,10 +175,7 @@ class JWTUtils:
 
     @staticmethod
     def fetch_muid(request):
-        token = authentication.get_authorization_header(request).decode("utf-8").split()
-        payload = jwt.decode(
-            token[1], settings.SECRET_KEY, algorithms=["HS256"], verify=True
-        )
+        payload = JWTUtils.decode_token(request)
         muid = payload.get("muid")
         if muid is None:
             raise Exception(
@@ -108,18 +185,8 @@ class JWTUtils:
 
     @staticmethod
     def is_jwt_authenticated(request):
-        token_prefix = "Bearer"
-        secret_key = SECRET_KEY
         try:
-            auth_header = get_authorization_header(request).decode("utf-8")
-            if not auth_header or not auth_header.startswith(token_prefix):
-                raise UnauthorizedAccessException("Invalid token header")
-
-            token = auth_header[len(token_prefix):].strip()
-            if not token:
-                raise UnauthorizedAccessException("Empty Token")
-
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"], verify=True)
+            payload = JWTUtils.decode_token(request)
 
             user_id = payload.get("id")
             expiry = datetime.strptime(payload.get("expiry"), "%Y-%m-%d %H:%M:%S%z")
@@ -181,16 +248,85 @@ def role_required(roles):
     return decorator
 
 
+class DynamicAccessCache:
+    """
+    Caches the role titles and user ids granted access to each dynamic type.
+
+    Every process keeps its own copy of the grants. Changes to `DynamicRole`,
+    `DynamicUser` or `Role` bump a version counter in Redis; a process checks
+    that counter at most every `CHECK_INTERVAL` seconds and drops its copy
+    when it has moved, so no request waits on the database for authorization.
+    """
+
+    VERSION_KEY = "dynamic_access:version"
+    CHECK_INTERVAL = 5
+
+    def __init__(self):
+        self._grants = {}
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return self._version
+        try:
+            version = RedisUtils.get_client().get(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Dynamic access version check failed: {e}")
+            # without the shared counter only trust grants for one interval
+            version = object()
+        self._checked_at = now
+        return version
+
+    def get(self, type):
+        """
+        Returns a tuple of (role titles, user ids) allowed for the type.
+        """
+        with self._lock:
+            if (version := self.current_version()) != self._version:
+                self._grants = {}
+                self._version = version
+            if (grants := self._grants.get(type)) is None:
+                grants = (
+                    set(DynamicRole.objects.filter(type=type).values_list('role__title', flat=True)),
+                    set(DynamicUser.objects.filter(type=type).values_list('user__id', flat=True)),
+                )
+                self._grants[type] = grants
+            return grants
+
+    def invalidate(self):
+        with self._lock:
+            self._grants = {}
+            self._checked_at = 0
+        try:
+            RedisUtils.get_client().incr(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Dynamic access invalidation failed: {e}")
+
+
+dynamic_access = DynamicAccessCache()
+
+
+@receiver(post_save, sender=DynamicRole)
+@receiver(post_delete, sender=DynamicRole)
+@receiver(post_save, sender=DynamicUser)
+@receiver(post_delete, sender=DynamicUser)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def dynamic_access_changed(sender, **kwargs):
+    transaction.on_commit(dynamic_access.invalidate)
+
+
 def dynamic_role_required(type):
     def decorator(view_func):
         def wrapped_view_func(obj, request, *args, **kwargs):
-            dynamic_roles = DynamicRole.objects.filter(type=type).values_list('role__title', flat=True)
-            roles = set(dynamic_roles)
+            roles, dynamic_users = dynamic_access.get(type)
             for role in JWTUtils.fetch_role(request):
                 if role in roles:
                     response = view_func(obj, request, *args, **kwargs)
                     return response
-            dynamic_users = DynamicUser.objects.filter(type=type).values_list('user__id', flat=True)
             user = JWTUtils.fetch_user_id(request)
             if user in dynamic_users:
                 response = view_func(obj, request, *args, **kwargs)
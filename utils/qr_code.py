@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+logo_location = os.path.join(settings.BASE_DIR, "api", "dashboard", "profile", "assets", "qr_logo.png")
+
+
+class ProfileQrCode:
+    """
+    Profile QR codes with the µLearn logo in the middle.
+
+    Images are content addressed: the file name is a digest of the encoded
+    URL, the logo and `RENDER_VERSION`, so an image is rendered once and
+    reused until one of those changes, and the digest doubles as its ETag.
+    Bump `RENDER_VERSION` when the rendering below changes.
+
+    The logo is read from `logo_location`, shipped with the code, and kept
+    resized in memory. Images are written to a temporary file and renamed
+    into place, so concurrent first renders never expose a partial file.
+    """
+
+    RENDER_VERSION = 1
+    LOGO_WIDTH = 100
+    UPLOAD_DIR = "user/qr"
+
+    def __init__(self):
+        self.storage = FileSystemStorage()
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_logo() -> tuple:
+        """
+        Returns the resized logo and a digest of the logo file.
+        """
+        with open(logo_location, "rb") as logo_file:
+            content = logo_file.read()
+        with Image.open(BytesIO(content)) as logo:
+            width, height = logo.size
+            resized = logo.resize(
+                (ProfileQrCode.LOGO_WIDTH, int(height * ProfileQrCode.LOGO_WIDTH / width))
+            )
+        return resized, hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def profile_url(user_id: str) -> str:
+        return f"{settings.FR_DOMAIN_NAME}/profile/{user_id}"
+
+    def digest(self, data: str) -> str:
+        _, logo_digest = self.get_logo()
+        return hashlib.sha256(
+            f"{self.RENDER_VERSION}|{logo_digest}|{data}".encode()
+        ).hexdigest()[:32]
+
+    def path(self, digest: str) -> str:
+        return f"{self.UPLOAD_DIR}/{digest}.png"
+
+    def render(self, data: str) -> bytes:
+        logo, _ = self.get_logo()
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_H)
+        qr.add_data(data)
+        image = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+        image.paste(
+            logo,
+            ((image.size[0] - logo.size[0]) // 2, (image.size[1] - logo.size[1]) // 2),
+        )
+
+        image_io = BytesIO()
+        image.save(image_io, format="PNG")
+        return image_io.getvalue()
+
+    def write(self, path: str, content: bytes):
+        target = self.storage.path(path)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(content)
+            os.chmod(temp_path, self.storage.file_permissions_mode or 0o644)
+            # atomic, the last of concurrent renders of the same content wins
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get_or_create(self, user_id: str, force: bool = False) -> tuple:
+        """
+        Returns the storage path and digest of the user's profile QR code,
+        rendering it only when no image exists for the current content.
+        """
+        data = self.profile_url(user_id)
+        digest = self.digest(data)
+        path = self.path(digest)
+        if force or not self.storage.exists(path):
+            self.write(path, self.render(data))
+        return path, digest
+
+
+profile_qr_code = ProfileQrCode()
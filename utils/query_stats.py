@@ -0,0 +1,151 @@
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+
+import redis
+
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a request runs more queries than its view's budget and
+    ``QUERY_BUDGET_RAISE`` is set, as it is in tests.
+    """
+
+
+class QueryRecorder:
+    """
+    ``connection.execute_wrapper`` that records every query of one request:
+    how many ran, the time spent in the database and how often each query
+    shape (fingerprint) repeated.
+    """
+
+    IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+    STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+    NUMBER_LITERAL = re.compile(r"\b\d+\b")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    @classmethod
+    def normalize(cls, sql: str) -> str:
+        sql = cls.STRING_LITERAL.sub("?", sql)
+        sql = cls.NUMBER_LITERAL.sub("?", sql)
+        return cls.IN_LIST.sub("(...)", sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.monotonic() - start
+            self.count += 1
+            statement = self.normalize(sql)
+            fingerprint = hashlib.sha1(statement.encode()).hexdigest()[:16]
+            self.fingerprints[fingerprint] += 1
+            self.statements.setdefault(fingerprint, statement)
+
+    def duplicates(self, threshold: int) -> dict:
+        return {
+            fingerprint: count
+            for fingerprint, count in self.fingerprints.items()
+            if count >= threshold
+        }
+
+
+class QueryStats:
+    """
+    Per URL name query statistics kept in Redis.
+
+    Every route has a hash of running totals (requests, queries, db time and
+    the worst request) and a sorted set of the query fingerprints that
+    repeated within a single request, scored by how many times they ran. The
+    normalized SQL of those fingerprints is kept in one shared hash.
+    """
+
+    KEY_PREFIX = "query_stats"
+    DUPLICATE_THRESHOLD = 3
+    TOP_DUPLICATES = 10
+
+    # HSET only when ARGV[2] beats the stored value, so the maximum rides in the pipeline
+    SET_MAX = """
+    local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]))
+    if current == nil or tonumber(ARGV[2]) > current then
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    end
+    """
+
+    @property
+    def client(self) -> redis.Redis:
+        return RedisUtils.get_client()
+
+    def key(self, *parts) -> str:
+        return ":".join((self.KEY_PREFIX, *parts))
+
+    def record(self, route: str, recorder: QueryRecorder):
+        duplicates = recorder.duplicates(self.DUPLICATE_THRESHOLD)
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.key("routes"), route)
+            pipe.hincrby(self.key("route", route), "requests", 1)
+            pipe.hincrby(self.key("route", route), "queries", recorder.count)
+            pipe.hincrbyfloat(self.key("route", route), "db_time_ms", recorder.duration * 1000)
+            pipe.eval(self.SET_MAX, 1, self.key("route", route), "max_queries", recorder.count)
+            if duplicates:
+                pipe.hincrby(self.key("route", route), "requests_with_duplicates", 1)
+                for fingerprint, count in duplicates.items():
+                    pipe.zincrby(self.key("duplicates", route), count, fingerprint)
+                pipe.hset(
+                    self.key("sql"),
+                    mapping={fingerprint: recorder.statements[fingerprint] for fingerprint in duplicates},
+                )
+            pipe.execute()
+
+    def get_stats(self) -> list:
+        routes = sorted(self.client.smembers(self.key("routes")))
+        with self.client.pipeline(transaction=False) as pipe:
+            for route in routes:
+                pipe.hgetall(self.key("route", route))
+                pipe.zrevrange(self.key("duplicates", route), 0, self.TOP_DUPLICATES - 1, withscores=True)
+            results = pipe.execute()
+
+        fingerprints = list({
+            fingerprint
+            for duplicates in results[1::2]
+            for fingerprint, _ in duplicates
+        })
+        statements = dict(zip(fingerprints, self.client.hmget(self.key("sql"), fingerprints))) if fingerprints else {}
+
+        stats = []
+        for route, totals, duplicates in zip(routes, results[::2], results[1::2]):
+            requests = int(totals.get("requests", 0))
+            if not requests:
+                continue
+            stats.append({
+                "route": route,
+                "requests": requests,
+                "avg_queries": round(int(totals.get("queries", 0)) / requests, 2),
+                "max_queries": int(totals.get("max_queries", 0)),
+                "avg_db_time_ms": round(float(totals.get("db_time_ms", 0)) / requests, 2),
+                "requests_with_duplicates": int(totals.get("requests_with_duplicates", 0)),
+                "duplicates": [
+                    {"fingerprint": fingerprint, "count": int(count), "sql": statements.get(fingerprint)}
+                    for fingerprint, count in duplicates
+                ],
+            })
+        return sorted(stats, key=lambda route: route["avg_queries"], reverse=True)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.key("*")))
+        if keys:
+            self.client.delete(*keys)
+
+
+query_stats = QueryStats()
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from db.organization import Country, Department, District, Organization, State, Zone
+from db.task import Channel, InterestGroup, Level, TaskType
+from db.user import Role
+from utils.utils import RedisUtils
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache:
+    """
+    Pre-rendered responses of the dropdown endpoints (locations,
+    organisations, IGs, roles and task lookups), kept in memory per process.
+
+    Every entry holds the JSON body of the success response and its ETag, so
+    a hit costs neither a query nor serialization, and a client sending the
+    ETag back in `If-None-Match` gets a 304 without a body. Changes to the
+    models below bump a version counter in Redis, checked at most every
+    `CHECK_INTERVAL` seconds, that drops every entry; entries also expire
+    after `MAX_AGE` seconds to pick up rows written without signals.
+
+    Keys carry ids taken from the request, so at most `MAX_ENTRIES` entries
+    are kept: expired ones are dropped first, then the least recently used.
+    """
+
+    VERSION_KEY = "reference_data:version"
+    CHECK_INTERVAL = 5
+    MAX_AGE = 600
+    MAX_ENTRIES = 1000
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return self._version
+        try:
+            version = RedisUtils.get_client().get(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Reference data version check failed: {e}")
+            version = object()
+        self._checked_at = now
+        return version
+
+    def get(self, key: tuple, build) -> tuple:
+        """
+        Returns the (body, etag) of the entry, rendering the response data
+        returned by `build` on a miss.
+        """
+        with self._lock:
+            version = self.current_version()
+            if version != self._version:
+                self._entries = OrderedDict()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] < self.MAX_AGE:
+                self._entries.move_to_end(key)
+                return entry[:2]
+
+        body = JSONRenderer().render(
+            {
+                "hasError": False,
+                "statusCode": status.HTTP_200_OK,
+                "message": {"general": []},
+                "response": build(),
+            }
+        )
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self._lock:
+            if self._version == version:
+                self._entries[key] = (body, etag, time.monotonic())
+                self._entries.move_to_end(key)
+                self.evict()
+        return body, etag
+
+    def evict(self):
+        if len(self._entries) <= self.MAX_ENTRIES:
+            return
+        expired_before = time.monotonic() - self.MAX_AGE
+        for key in [key for key, entry in self._entries.items() if entry[2] <= expired_before]:
+            del self._entries[key]
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def response(self, request, key: tuple, build) -> HttpResponse:
+        """
+        Serves the entry as the success response of the view, or a 304 when
+        the client already has it.
+        """
+        body, etag = self.get(key, build)
+        if request.method in ("GET", "HEAD") and etag in self.if_none_match(request):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        # clients keep the body but revalidate it on every use
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    @staticmethod
+    def if_none_match(request) -> set:
+        header = request.headers.get("If-None-Match", "")
+        return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._checked_at = 0
+        try:
+            RedisUtils.get_client().incr(self.VERSION_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Reference data invalidation failed: {e}")
+
+
+reference_data = ReferenceDataCache()
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+@receiver(post_save, sender=Zone)
+@receiver(post_delete, sender=Zone)
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=InterestGroup)
+@receiver(post_delete, sender=InterestGroup)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Channel)
+@receiver(post_delete, sender=Channel)
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+@receiver(post_save, sender=TaskType)
+@receiver(post_delete, sender=TaskType)
+def reference_data_changed(sender, **kwargs):
+    transaction.on_commit(reference_data.invalidate)
@@ -0,0 +1,263 @@
+import datetime
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import QuerySet
+
+from db.organization import Organization
+from db.search import SearchDocument, SearchDocumentStale
+from db.task import TaskList
+from db.user import Role, User, UserRoleLink
+
+logger = logging.getLogger(__name__)
+
+
+class SearchEntity:
+    def __init__(self, name: str, model, fields: list):
+        """
+        Args:
+            name: Name of the entity, stored with its documents.
+            model: The model whose rows are searched.
+            fields: The lookups the document is made of, the `search_fields`
+                of the list endpoints.
+        """
+        self.name = name
+        self.model = model
+        self.fields = fields
+
+
+class SearchIndex:
+    """
+    Full-text search of the dashboard lists.
+
+    Every searchable entity has one document per row in `search_document`:
+    the values of its search fields, joined ones included, concatenated. The
+    table has a FULLTEXT index with the ngram parser, so any part of a word
+    of at least `NGRAM_SIZE` characters can be looked up without the full
+    scan of a leading wildcard LIKE.
+
+    Writes reach the tables from more than this code (bulk_create, queryset
+    updates, other services), so the triggers of alter-1.59 record every
+    row whose document a write changes in `search_document_stale`, in the
+    writing transaction. `narrow` first rewrites the stale documents of the
+    entity, so a document is never behind a committed write when it is
+    searched; with more than `REFRESH_LIMIT` of them waiting it leaves them
+    to a background thread and does not narrow. `rebuild_search_index`
+    rebuilds every document from scratch.
+
+    `narrow` only picks the candidate rows, the list endpoints still apply
+    their `icontains` filters to them, so results stay the same.
+    """
+
+    NGRAM_SIZE = 2
+    CHUNK_SIZE = 500
+    REFRESH_LIMIT = 1000
+
+    def __init__(self):
+        self.entities = {}
+        self._refresher = None
+        self._refresher_lock = threading.Lock()
+
+    def register(self, entity: SearchEntity):
+        self.entities[entity.name] = entity
+
+    @staticmethod
+    def stale_ids(name: str, limit: int) -> list:
+        return list(
+            SearchDocumentStale.objects.filter(entity=name).values_list("entity_id", flat=True)[:limit]
+        )
+
+    def refresh_ids(self, name: str, ids: list):
+        with transaction.atomic():
+            # the marks are removed before the rows are read, so a write committed
+            # after that read marks its row again instead of being lost
+            SearchDocumentStale.objects.filter(entity=name, entity_id__in=ids).delete()
+            self.index(name, ids)
+
+    def refresh(self, name: str) -> bool:
+        """
+        Rewrites the stale documents of the entity.
+
+        Returns:
+            bool: False if the documents are not current, when too many are
+                stale or the refresh failed.
+        """
+        try:
+            ids = self.stale_ids(name, self.REFRESH_LIMIT + 1)
+            # inside a transaction the rows would be read from its snapshot
+            if len(ids) > self.REFRESH_LIMIT or (ids and connection.in_atomic_block):
+                self.start_refresher()
+                return False
+            if ids:
+                self.refresh_ids(name, ids)
+        except DatabaseError as e:
+            logger.warning(f"Search index refresh of {name} failed: {e}")
+            return False
+        return True
+
+    def start_refresher(self):
+        with self._refresher_lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(
+                    target=self.refresh_all, name="search-index-refresher", daemon=True
+                )
+                self._refresher.start()
+
+    def refresh_all(self):
+        try:
+            for name in self.entities:
+                while ids := self.stale_ids(name, self.CHUNK_SIZE):
+                    self.refresh_ids(name, ids)
+        except DatabaseError as e:
+            logger.warning(f"Search index refresh failed: {e}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def format_value(value) -> str:
+        # values are written the way MySQL casts them for `icontains`
+        if isinstance(value, bool):
+            return str(int(value))
+        if isinstance(value, datetime.datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        return str(value)
+
+    def build_documents(self, entity: SearchEntity, ids: list) -> dict:
+        values = defaultdict(dict)
+        for row in entity.model._base_manager.filter(pk__in=ids).values_list("pk", *entity.fields):
+            for value in row[1:]:
+                if value is not None:
+                    values[row[0]][self.format_value(value)] = None
+        return {pk: "\n".join(document) for pk, document in values.items()}
+
+    def index(self, name: str, ids: list):
+        entity = self.entities[name]
+        for start in range(0, len(ids), self.CHUNK_SIZE):
+            chunk = ids[start:start + self.CHUNK_SIZE]
+            documents = self.build_documents(entity, chunk)
+            with connection.cursor() as cursor:
+                if documents:
+                    cursor.executemany(
+                        """
+                        INSERT INTO search_document (entity, entity_id, document, updated_at)
+                        VALUES (%s, %s, %s, now())
+                        ON DUPLICATE KEY UPDATE document = VALUES(document), updated_at = now()
+                        """,
+                        [(name, str(pk), document) for pk, document in documents.items()],
+                    )
+            if missing := [pk for pk in chunk if pk not in documents]:
+                self.remove(name, missing)
+
+    def remove(self, name: str, ids: list):
+        SearchDocument.objects.filter(entity=name, entity_id__in=[str(pk) for pk in ids]).delete()
+
+    def rebuild(self, name: str) -> int:
+        """
+        Rewrites every document of the entity and drops the ones of deleted
+        rows. Returns the number of documents written.
+        """
+        entity = self.entities[name]
+        # every row is rewritten below, the marks written from here on are kept
+        SearchDocumentStale.objects.filter(entity=name).delete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT now()")
+            started_at = cursor.fetchone()[0]
+
+        queryset = entity.model._base_manager.order_by("pk").values_list("pk", flat=True)
+        total = 0
+        ids = list(queryset[:self.CHUNK_SIZE])
+        while ids:
+            self.index(name, ids)
+            total += len(ids)
+            ids = list(queryset.filter(pk__gt=ids[-1])[:self.CHUNK_SIZE])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM search_document WHERE entity = %s AND updated_at < %s", [name, started_at]
+            )
+        return total
+
+    def narrow(self, queryset: QuerySet, name: str, search_query: str) -> QuerySet:
+        """
+        Returns the rows of the queryset whose document contains the search
+        query, or the queryset unchanged when the query has a word shorter
+        than `NGRAM_SIZE`, which the index cannot answer, or the documents
+        could not be brought up to date.
+        """
+        words = search_query.replace('"', " ").split()
+        if not words or min(map(len, words)) < self.NGRAM_SIZE:
+            return queryset
+        if not self.refresh(name):
+            return queryset
+
+        matches = SearchDocument.objects.filter(
+            entity=name, document__match=f'"{" ".join(words)}"'
+        ).values("entity_id")
+        return queryset.filter(pk__in=matches)
+
+
+search_index = SearchIndex()
+
+search_index.register(
+    SearchEntity(
+        "user",
+        User,
+        ["muid", "full_name", "email", "mobile", "user_lvl_link_user__level__name"],
+    )
+)
+search_index.register(
+    SearchEntity(
+        "user_role_link",
+        UserRoleLink,
+        ["user__full_name", "user__mobile", "user__email", "user__muid", "role__title"],
+    )
+)
+search_index.register(
+    SearchEntity(
+        "role",
+        Role,
+        ["id", "title", "description", "updated_by__full_name", "created_by__full_name"],
+    )
+)
+search_index.register(
+    SearchEntity(
+        "organization",
+        Organization,
+        [
+            "title",
+            "code",
+            "affiliation__title",
+            "district__name",
+            "district__zone__name",
+            "district__zone__state__name",
+            "district__zone__state__country__name",
+        ],
+    )
+)
+search_index.register(
+    SearchEntity(
+        "task",
+        TaskList,
+        [
+            "hashtag",
+            "title",
+            "description",
+            "karma",
+            "channel__name",
+            "type__title",
+            "active",
+            "variable_karma",
+            "usage_count",
+            "level__name",
+            "org__title",
+            "ig__name",
+            "event",
+            "updated_at",
+            "updated_by__full_name",
+            "created_by__full_name",
+            "created_at",
+        ],
+    )
+)
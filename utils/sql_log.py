@@ -0,0 +1,57 @@
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("sql")
+
+
+class SqlLog:
+    """
+    ``connection.execute_wrapper`` that logs a sample of the queries of every
+    connection with their duration.
+
+    Queries slower than ``SQL_LOG_SLOW_MS`` (0 disables it) are always logged
+    at WARNING, the others with a probability of ``SQL_LOG_SAMPLE_RATE`` at
+    DEBUG. The decision is taken before anything is formatted, so a query
+    that is not logged only costs the timing.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - start
+            slow = 0 < settings.SQL_LOG_SLOW_MS <= duration * 1000
+            if slow or random.random() < settings.SQL_LOG_SAMPLE_RATE:
+                logger.log(
+                    logging.WARNING if slow else logging.DEBUG,
+                    "(%.3f) %s; args=%s; alias=%s",
+                    duration,
+                    sql,
+                    params,
+                    self.alias,
+                    extra={
+                        "duration_ms": round(duration * 1000, 2),
+                        "sql": sql,
+                        "params": params,
+                        "many": many,
+                        "alias": self.alias,
+                        "slow": slow,
+                    },
+                )
+
+
+@receiver(connection_created)
+def install_sql_log(sender, connection, **kwargs):
+    if not settings.SQL_LOG_SAMPLE_RATE and not settings.SQL_LOG_SLOW_MS:
+        return
+    if not any(isinstance(wrapper, SqlLog) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SqlLog(connection.alias))
@@ -91,6 +91,26 @@ class WebHookCategory(Enum):
     KARMA_INFO = 'karma-info'
 
 
+class WebHookStatus(Enum):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+
+class ImportJobStatus(Enum):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+class VoucherMailStatus(Enum):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+
 class RefferalType(Enum):
     KARMA = 'Karma'
     MUCOIN = 'Mucoin'
@@ -135,6 +155,11 @@ class DiscountTypes(Enum):
     PERCENTAGE = 'percentage'
     AMOUNT = 'amount'
 
+class CountMode(Enum):
+    EXACT = 'exact'
+    CACHED = 'cached'
+    ESTIMATED = 'estimated'
+
 DEFAULT_HACKATHON_FORM_FIELDS = {
     'name': 'system',
     'gender': 'system',
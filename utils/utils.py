@@ -1,21 +1,34 @@
+import base64
 import csv
 import datetime
-import gzip
+import hashlib
 import io
+import json
+import zlib
 from datetime import timedelta
 
 import openpyxl
 import pytz
-import requests
-from decouple import config
+import redis
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import EmailMessage, send_mail
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Q
-from django.db.models.query import QuerySet
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Model, Q
+from django.db.models.query import QuerySet, ValuesIterable
+from django.http import StreamingHttpResponse
 from django.template.loader import render_to_string
 
+from utils.search_index import search_index
+from utils.types import CountMode
+from utils.webhook_dispatcher import discord_webhook_dispatcher
+
+CSV_CHUNK_SIZE = 2000
+COUNT_CACHE_TTL = 60
+
 
 class CommonUtils:
     @staticmethod
@@ -25,6 +38,9 @@ class CommonUtils:
         search_fields,
         sort_fields: dict = None,
         is_pagination: bool = True,
+        keyset: bool = False,
+        count: CountMode = CountMode.EXACT,
+        search_entity: str = None,
     ) -> QuerySet:
         """
         Returns a paginated queryset based on the provided parameters.
@@ -35,6 +51,12 @@ class CommonUtils:
             - search_fields (list): The list of fields to search for.
             - sort_fields (dict, optional): A dictionary mapping sort fields. Defaults to None.
             - is_pagination (bool, optional): Flag indicating whether pagination should be applied. Defaults to True.
+            - keyset (bool, optional): Allows clients to page with the `cursor` query parameter
+              instead of `pageIndex`, see `get_keyset_page`. Defaults to False.
+            - count (CountMode, optional): How the total count is computed, see `get_count`.
+              Defaults to an exact count.
+            - search_entity (str, optional): Name of the `utils.search_index` entity whose
+              full-text index narrows the rows before the `search_fields` filter. Defaults to None.
 
         Returns:
             - QuerySet or dict: The paginated queryset or a dictionary containing the paginated queryset and pagination information.
@@ -52,6 +74,8 @@ class CommonUtils:
             for field in search_fields:
                 query |= Q(**{f"{field}__icontains": search_query})
 
+            if search_entity and isinstance(queryset, QuerySet):
+                queryset = search_index.narrow(queryset, search_entity, search_query)
             queryset = queryset.filter(query)
 
         if sort_by:
@@ -61,8 +85,16 @@ class CommonUtils:
                     sort_field_name = f"-{sort_field_name}"
 
                 queryset = queryset.order_by(sort_field_name)
+
+        if is_pagination and keyset and "cursor" in request.query_params and isinstance(queryset, QuerySet):
+            return CommonUtils.get_keyset_page(
+                queryset, per_page, request.query_params.get("cursor"), count
+            )
+
         if is_pagination:
             paginator = Paginator(queryset, per_page)
+            if isinstance(queryset, QuerySet) and count != CountMode.EXACT:
+                paginator.count = CommonUtils.get_count(queryset, count)
             try:
                 queryset = paginator.page(page)
             except PageNotAnInteger:
@@ -86,24 +118,303 @@ class CommonUtils:
         return queryset
 
     @staticmethod
-    def generate_csv(queryset: QuerySet, csv_name: str) -> HttpResponse:
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{csv_name}.csv"'
-        fieldnames = list(queryset[0].keys())
-        writer = csv.DictWriter(response, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(queryset)
-
-        compressed_response = HttpResponse(
-            gzip.compress(response.content),
-            content_type="text/csv",
+    def get_count(queryset: QuerySet, mode: CountMode = CountMode.EXACT) -> int:
+        """
+        Returns the number of rows of the queryset.
+
+        `CACHED` keeps the count of the exact same query in Redis for
+        `COUNT_CACHE_TTL` seconds. `ESTIMATED` reads the table statistics of
+        MySQL, which are only meaningful for unfiltered querysets, so filtered
+        querysets fall back to the cached count.
+        """
+        if mode == CountMode.EXACT:
+            return queryset.count()
+
+        if mode == CountMode.ESTIMATED and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT table_rows FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = %s",
+                    [queryset.model._meta.db_table],
+                )
+                if (row := cursor.fetchone()) and row[0] is not None:
+                    return int(row[0])
+
+        sql, params = queryset.query.sql_with_params()
+        key = "pagination_count:" + hashlib.sha1(f"{sql}|{params}".encode()).hexdigest()
+        try:
+            if (cached := RedisUtils.get_client().get(key)) is not None:
+                return int(cached)
+        except redis.RedisError:
+            return queryset.count()
+
+        total = queryset.count()
+        try:
+            RedisUtils.get_client().set(key, total, ex=COUNT_CACHE_TTL)
+        except redis.RedisError:
+            pass
+        return total
+
+    @staticmethod
+    def encode_cursor(values: list, direction: str) -> str:
+        payload = json.dumps({"v": values, "d": direction}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """
+        Returns the (values, direction) of a cursor, or None when it is
+        missing or malformed.
+        """
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, direction = payload["v"], payload["d"]
+        except (ValueError, KeyError, TypeError):
+            return None
+        if direction not in ("next", "prev") or not isinstance(values, list) or len(values) != 2:
+            return None
+        return values, direction
+
+    @staticmethod
+    def get_row_value(row, field: str):
+        if isinstance(row, dict):
+            return row.get(field)
+        for part in field.split("__"):
+            try:
+                row = getattr(row, part)
+            except ObjectDoesNotExist:
+                return None
+            if row is None:
+                return None
+        return row.pk if isinstance(row, Model) else row
+
+    @staticmethod
+    def get_keyset_ordering(queryset: QuerySet):
+        """
+        Returns the first ordering field of the queryset other than the
+        primary key, with its "-" prefix, or None.
+        """
+        pk = queryset.model._meta.pk.attname
+        return next(
+            (
+                field
+                for field in (*queryset.query.order_by, *queryset.model._meta.ordering)
+                if isinstance(field, str) and field.lstrip("-") not in ("pk", pk, "?")
+            ),
+            None,
         )
-        compressed_response[
-            "Content-Disposition"
-        ] = f'attachment; filename="{csv_name}.csv"'
-        compressed_response["Content-Encoding"] = "gzip"
 
-        return compressed_response
+    @staticmethod
+    def seek(queryset: QuerySet, field: str, reverse: bool, after: list = None) -> QuerySet:
+        """
+        Orders the queryset by (field, pk), descending when `reverse`, and
+        keeps the rows after the [field value, pk] pair `after`.
+        """
+        pk = queryset.model._meta.pk.attname
+        order_by = [f"-{pk}" if reverse else pk]
+        if field:
+            order_by.insert(0, f"-{field}" if reverse else field)
+        queryset = queryset.order_by(*order_by)
+        if after is None:
+            return queryset
+
+        value, pk_value = after
+        lookup = "lt" if reverse else "gt"
+        if not field:
+            condition = Q(**{f"{pk}__{lookup}": pk_value})
+        elif value is None:
+            condition = Q(**{f"{field}__isnull": True, f"{pk}__{lookup}": pk_value})
+            if not reverse:
+                condition |= Q(**{f"{field}__isnull": False})
+        else:
+            condition = Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"{pk}__{lookup}": pk_value})
+            if reverse:
+                condition |= Q(**{f"{field}__isnull": True})
+        return queryset.filter(condition)
+
+    @staticmethod
+    def get_keyset_page(
+        queryset: QuerySet, per_page: int, cursor: str = None, count: CountMode = CountMode.CACHED
+    ) -> dict:
+        """
+        Returns one page of the queryset located by a cursor instead of an
+        offset, so every page costs the same however deep it is.
+
+        The queryset is ordered by its first ordering field (the `sortBy`
+        field when one was given) and the primary key as a tie breaker. The
+        cursors are opaque tokens holding those two values of the last
+        (`nextCursor`) or first (`prevCursor`) row of the page. NULLs come
+        first in ascending order and last in descending order, as MySQL
+        sorts them.
+
+        `count` defaults to the cached count; pass `CountMode.EXACT` for a
+        fresh count on every page.
+        """
+        pk = queryset.model._meta.pk.attname
+        ordering = CommonUtils.get_keyset_ordering(queryset)
+        descending = bool(ordering) and ordering.startswith("-")
+        field = ordering.lstrip("-") if ordering else None
+
+        decoded = CommonUtils.decode_cursor(cursor)
+        backwards = decoded is not None and decoded[1] == "prev"
+        # walking backwards reads the rows in the opposite order and flips them
+        reverse = descending != backwards
+
+        page_queryset = CommonUtils.seek(queryset, field, reverse, decoded[0] if decoded else None)
+        rows = list(page_queryset[: per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+
+        def row_cursor(row, direction):
+            return CommonUtils.encode_cursor(
+                [
+                    CommonUtils.get_row_value(row, field) if field else None,
+                    CommonUtils.get_row_value(row, "pk" if not isinstance(row, dict) else pk),
+                ],
+                direction,
+            )
+
+        is_next = has_more if not backwards else decoded is not None
+        is_prev = decoded is not None if not backwards else has_more
+        total = CommonUtils.get_count(queryset, count)
+
+        return {
+            "queryset": rows,
+            "pagination": {
+                "count": total,
+                "totalPages": -(-total // per_page) if per_page else 0,
+                "isNext": bool(rows) and is_next,
+                "isPrev": bool(rows) and is_prev,
+                "nextPage": None,
+                "nextCursor": row_cursor(rows[-1], "next") if rows and is_next else None,
+                "prevCursor": row_cursor(rows[0], "prev") if rows and is_prev else None,
+            },
+        }
+
+    @staticmethod
+    def iterate_in_chunks(queryset: QuerySet, chunk_size: int = CSV_CHUNK_SIZE):
+        """
+        Yields the queryset as lists of at most `chunk_size` rows, each fetched
+        with its own query so that only one chunk is held in memory.
+
+        Querysets are walked by keyset on their first ordering field and the
+        primary key (see `seek`), so every chunk costs the same and rows
+        written meanwhile are neither repeated nor skipped; rows tied on the
+        first ordering field come in primary key order. GROUP BY aggregates,
+        sliced querysets, `.values_list()` and DISTINCT `.values()` missing
+        the keyset columns cannot be walked that way and fall back to
+        LIMIT/OFFSET windows.
+
+        Args:
+            - queryset (QuerySet): The queryset to iterate.
+            - chunk_size (int, optional): Rows fetched per query.
+        """
+        pk = queryset.model._meta.pk.attname
+        ordering = CommonUtils.get_keyset_ordering(queryset)
+        field = ordering.lstrip("-") if ordering else None
+        values = queryset._fields
+        # `.values()` rows need the keyset columns, they are dropped again before yielding
+        extra = [name for name in (field, pk) if values and name and name not in values]
+
+        if (
+            queryset.query.group_by
+            or queryset.query.is_sliced
+            or (values and queryset._iterable_class is not ValuesIterable)
+            or (extra and queryset.query.distinct)
+        ):
+            start = 0
+            while chunk := list(queryset[start:start + chunk_size]):
+                yield chunk
+                start += chunk_size
+            return
+
+        if extra:
+            queryset = queryset.values(*values, *extra)
+
+        after = None
+        while True:
+            chunk = list(
+                CommonUtils.seek(queryset, field, bool(ordering) and ordering.startswith("-"), after)[:chunk_size]
+            )
+            if not chunk:
+                return
+            last = chunk[-1]
+            after = [
+                CommonUtils.get_row_value(last, field) if field else None,
+                last[pk] if values else last.pk,
+            ]
+            if extra:
+                for row in chunk:
+                    for name in extra:
+                        del row[name]
+            yield chunk
+
+    @staticmethod
+    def serialize_in_chunks(serializer_class, queryset: QuerySet, context: dict = None):
+        """
+        Serializes a queryset chunk by chunk and yields one row at a time.
+
+        Args:
+            - serializer_class: The serializer used for every row.
+            - queryset (QuerySet): The queryset to serialize.
+            - context (dict, optional): The serializer context.
+        """
+        for chunk in CommonUtils.iterate_in_chunks(queryset):
+            yield from serializer_class(chunk, many=True, context=context or {}).data
+
+    @staticmethod
+    def generate_csv(rows, csv_name: str) -> StreamingHttpResponse:
+        """
+        Streams the rows as a gzip compressed CSV file.
+
+        The header is taken from the first row. Rows are written and compressed
+        incrementally, so memory stays flat however many rows are exported.
+
+        Args:
+            - rows (Iterable[dict]): The rows to export, e.g. `serialize_in_chunks(...)`
+              or a `.values()` queryset.
+            - csv_name (str): The name of the downloaded file.
+        """
+        if isinstance(rows, QuerySet):
+            rows = (row for chunk in CommonUtils.iterate_in_chunks(rows) for row in chunk)
+
+        def stream():
+            row_iterator = iter(rows)
+            compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+            if (first_row := next(row_iterator, None)) is not None:
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=list(first_row.keys()))
+                writer.writeheader()
+                writer.writerow(first_row)
+
+                for count, row in enumerate(row_iterator, start=1):
+                    writer.writerow(row)
+                    if count % CSV_CHUNK_SIZE == 0:
+                        if compressed := compressor.compress(buffer.getvalue().encode()):
+                            yield compressed
+                        buffer.seek(0)
+                        buffer.truncate(0)
+
+                yield compressor.compress(buffer.getvalue().encode())
+            yield compressor.flush()
+
+        async def astream():
+            # the ASGI server needs an async iterator to stream without buffering,
+            # the rows themselves are produced synchronously since they hit the DB
+            chunks = stream()
+            while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+                yield chunk
+
+        response = StreamingHttpResponse(astream(), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{csv_name}.csv"'
+        response["Content-Encoding"] = "gzip"
+
+        return response
 
 
 class DateTimeUtils:
@@ -147,6 +458,31 @@ class DateTimeUtils:
         return start_date, end_date
 
 
+class RedisUtils:
+    """
+    Shared Redis client for the caches and indexes kept outside the database.
+    The client holds a connection pool, so one instance serves the process.
+
+    Reads and connects time out after `REDIS_SOCKET_TIMEOUT` and
+    `REDIS_CONNECT_TIMEOUT` seconds, so an unreachable Redis raises a
+    `RedisError` quickly instead of holding the request.
+    """
+
+    _client = None
+
+    @classmethod
+    def get_client(cls) -> redis.Redis:
+        if cls._client is None:
+            cls._client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                decode_responses=True,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            )
+        return cls._client
+
+
 class _CustomHTTPHandler:
     @staticmethod
     def get_client_ip_address(request):
@@ -160,9 +496,10 @@ class _CustomHTTPHandler:
 
 class DiscordWebhooks:
     @staticmethod
-    def general_updates(category, action, *values) -> str:
+    def general_updates(category, action, *values) -> None:
         """
-        Modify channels and category in Discord
+        Modify channels and category in Discord. The update is queued in the
+        webhook outbox and delivered in the background.
                 Args:
         category(str): Category of webhook
         action(str): action of webhook
@@ -171,25 +508,96 @@ class DiscordWebhooks:
         content = f"{category}<|=|>{action}"
         for value in values:
             content = f"{content}<|=|>{value}"
-        url = config("DISCORD_WEBHOOK_LINK")
-        data = {"content": content}
-        requests.post(url, json=data)
+        discord_webhook_dispatcher.enqueue(content)
 
 
 class ImportCSV:
-    def read_excel_file(self, file_obj):
-        workbook = openpyxl.load_workbook(filename=io.BytesIO(file_obj.read()))
-        sheet = workbook.active
-
-        rows = []
-        for row in sheet.iter_rows(values_only=True):
-            row_dict = {
-                header.value: cell_value for header, cell_value in zip(sheet[1], row)
+    """
+    Reads uploaded .xlsx or .csv files row by row.
+
+    Workbooks are opened read-only, so openpyxl streams the sheet XML instead
+    of loading every cell, and CSV files are decoded as they are read. The
+    file must stay open while the rows are consumed.
+    """
+
+    CHUNK_SIZE = 500
+
+    def __init__(self):
+        self.header = None
+        # number of data rows announced by the workbook, None for CSV files
+        self.row_count = None
+
+    @staticmethod
+    def is_csv(file_name: str) -> bool:
+        return str(file_name).lower().endswith(".csv")
+
+    def excel_rows(self, file_obj):
+        workbook = openpyxl.load_workbook(file_obj, read_only=True)
+        try:
+            sheet = workbook.active
+            if sheet.max_row:
+                self.row_count = max(sheet.max_row - 1, 0)
+            yield from sheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def csv_rows(file_obj):
+        text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+        try:
+            for row in csv.reader(text):
+                yield tuple(value if value != "" else None for value in row)
+        finally:
+            text.detach()
+
+    def read_excel_file(self, file_obj, file_name: str = None):
+        """
+        Yields the rows of the file as dicts keyed by the header row, the
+        header row itself first.
+
+        Args:
+            - file_obj: The uploaded file, opened in binary mode.
+            - file_name (str, optional): Name used to tell CSV files apart, defaults to
+              the name of `file_obj`.
+        """
+        file_name = file_name or getattr(file_obj, "name", "")
+        rows = self.csv_rows(file_obj) if self.is_csv(file_name) else self.excel_rows(file_obj)
+
+        if (header := next(rows, None)) is None:
+            return
+        self.header = list(header)
+        yield dict(zip(self.header, self.header))
+
+        for row in rows:
+            yield {
+                key: row[index] if index < len(row) else None
+                for index, key in enumerate(self.header)
             }
-            rows.append(row_dict)
-        workbook.close()
 
-        return rows
+    def read_in_chunks(self, rows, chunk_size: int = CHUNK_SIZE, skip: int = 0):
+        """
+        Yields the non empty data rows of `read_excel_file` in lists of at
+        most `chunk_size`, every row carrying its sheet row number under
+        `row_number`.
+
+        Args:
+            - rows: The data rows of `read_excel_file`, header row already consumed.
+            - chunk_size (int, optional): Rows per chunk.
+            - skip (int, optional): Number of non empty rows to skip, to resume a read.
+        """
+        chunk = []
+        for row_number, row in enumerate(rows, start=2):
+            if not any(row.values()):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            chunk.append({**row, "row_number": row_number})
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
 
 def send_template_mail(
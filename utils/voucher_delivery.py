@@ -0,0 +1,196 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.mime.image import MIMEImage
+
+import decouple
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from db.task import VoucherLog
+from utils.karma_voucher import render_karma_voucher
+from utils.types import VoucherMailStatus
+
+logger = logging.getLogger(__name__)
+
+
+class VoucherDelivery:
+    """
+    Renders karma vouchers and mails them to their users.
+
+    Vouchers are handled in batches of `BATCH_SIZE`: while a batch is being
+    mailed the next one is already rendering on a process pool, and every
+    batch is sent over one SMTP connection instead of one per voucher. The
+    result of every voucher is stored in `VoucherLog.mail_status`, so failed
+    mails can be resent with the `send_voucher_mails` command.
+
+    Up to `INLINE_RENDER_LIMIT` vouchers are rendered in the calling process,
+    which is cheaper than starting the pool for a single voucher.
+    """
+
+    BATCH_SIZE = 50
+    INLINE_RENDER_LIMIT = 10
+    MAX_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+    subject = "Congratulations on earning Karma points!"
+
+    def __init__(self):
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawned workers only import the renderer, forking would copy the app's threads and connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.MAX_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def reset_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @staticmethod
+    def card_fields(voucher: VoucherLog) -> tuple:
+        time_or_event = f"{voucher.month}/{voucher.week}"
+        if voucher.event:
+            time_or_event = f"{voucher.event}/{voucher.description}"
+        return (
+            str(voucher.user.full_name),
+            voucher.task.hashtag,
+            str(int(voucher.karma)),
+            voucher.code,
+            time_or_event,
+        )
+
+    @staticmethod
+    def render_inline(fields: tuple) -> Future:
+        future = Future()
+        try:
+            future.set_result(render_karma_voucher(*fields))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit_renders(self, vouchers: list, inline: bool) -> list:
+        if not inline:
+            try:
+                pool = self.get_pool()
+                return [pool.submit(render_karma_voucher, *self.card_fields(voucher)) for voucher in vouchers]
+            except BrokenProcessPool:
+                self.reset_pool()
+        return [self.render_inline(self.card_fields(voucher)) for voucher in vouchers]
+
+    def get_image(self, voucher: VoucherLog, render: Future) -> bytes:
+        try:
+            return render.result()
+        except BrokenProcessPool:
+            # a crashed pool worker fails every pending render, redo the voucher here
+            self.reset_pool()
+            return render_karma_voucher(*self.card_fields(voucher))
+
+    def build_message(self, voucher: VoucherLog, image: bytes) -> EmailMessage:
+        full_name = voucher.user.full_name
+        text = f"""Greetings from GTech µLearn!
+
+            Great news! You are just one step away from claiming your internship/contribution Karma points.
+
+            Name: {full_name}
+            Email: {voucher.user.email}
+
+            To claim your karma points copy this `voucher {voucher.code}` and paste it #task-dropbox channel along with your voucher image.
+            """
+        email_obj = EmailMessage(
+            subject=self.subject,
+            body=text,
+            from_email=decouple.config("FROM_MAIL"),
+            to=[voucher.user.email],
+        )
+        attachment = MIMEImage(image)
+        attachment.add_header(
+            'Content-Disposition',
+            'attachment',
+            filename=f'{str(full_name)}.jpg',
+        )
+        email_obj.attach(attachment)
+        return email_obj
+
+    def deliver(self, voucher_ids) -> dict:
+        """
+        Renders and mails the vouchers and records the outcome of each.
+
+        Returns:
+            dict: {voucher_id: error} of the vouchers whose mail failed.
+        """
+        vouchers = list(
+            VoucherLog.objects.filter(id__in=voucher_ids).select_related("user", "task")
+        )
+        batches = [
+            vouchers[start:start + self.BATCH_SIZE]
+            for start in range(0, len(vouchers), self.BATCH_SIZE)
+        ]
+        inline = len(vouchers) <= self.INLINE_RENDER_LIMIT
+
+        failed = {}
+        renders = self.submit_renders(batches[0], inline) if batches else []
+        for index, batch in enumerate(batches):
+            current, renders = renders, []
+            if index + 1 < len(batches):
+                renders = self.submit_renders(batches[index + 1], inline)
+            failed.update(self.send_batch(batch, current))
+        return failed
+
+    def send_batch(self, vouchers: list, renders: list) -> dict:
+        failed = {}
+        messages = []
+        for voucher, render in zip(vouchers, renders):
+            try:
+                messages.append((voucher, self.build_message(voucher, self.get_image(voucher, render))))
+            except Exception as e:
+                failed[voucher.id] = f"Rendering failed: {e}"
+
+        sent = []
+        connection = get_connection()
+        try:
+            connection.open()
+            for voucher, message in messages:
+                try:
+                    connection.send_messages([message])
+                    sent.append(voucher.id)
+                except Exception as e:
+                    failed[voucher.id] = str(e)
+                    # the connection may be unusable after an SMTP error
+                    connection.close()
+                    connection.open()
+        except Exception as e:
+            for voucher, _ in messages:
+                if voucher.id not in sent:
+                    failed.setdefault(voucher.id, str(e))
+        finally:
+            connection.close()
+
+        self.record(sent, failed)
+        return failed
+
+    @staticmethod
+    def record(sent: list, failed: dict):
+        now = timezone.now()
+        if sent:
+            VoucherLog.objects.filter(id__in=sent).update(
+                mail_status=VoucherMailStatus.SENT.value, mail_error=None, mailed_at=now
+            )
+        for voucher_id, error in failed.items():
+            logger.error(f"Voucher mail for {voucher_id} failed: {error}")
+            VoucherLog.objects.filter(id=voucher_id).update(
+                mail_status=VoucherMailStatus.FAILED.value, mail_error=str(error)[:500]
+            )
+
+
+voucher_delivery = VoucherDelivery()
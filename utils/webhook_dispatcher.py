@@ -0,0 +1,180 @@
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+from decouple import config
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from db.webhook import DiscordWebhookOutbox
+from utils.http_client import CircuitOpenError, discord_client
+from utils.types import WebHookStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DiscordWebhookDispatcher:
+    """
+    Outbox based Discord webhook delivery.
+
+    `enqueue` only writes the event to the `discord_webhook_outbox` table, so
+    callers never wait on Discord. A background thread posts the events
+    through the `discord` upstream client, retrying failures with exponential
+    backoff. While its circuit breaker is open the head event is put back
+    without spending an attempt.
+
+    The bot applies category and channel events in the order it receives
+    them (create, delete, create again), so every event is kept and they are
+    delivered strictly in `seq` order with a single event in flight across
+    every process: an event waiting for a retry holds back the ones after it
+    until it is sent or given up on.
+    """
+
+    BATCH_SIZE = 20
+    MAX_ATTEMPTS = 5
+    TIMEOUT = 5
+    POLL_INTERVAL = 5
+    BACKOFF_BASE = timedelta(seconds=10)
+    LOCK_TIMEOUT = timedelta(minutes=5)
+
+    def __init__(self):
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def enqueue(self, content: str):
+        DiscordWebhookOutbox.objects.create(
+            content=content,
+            next_attempt_at=timezone.now(),
+        )
+        transaction.on_commit(self.wake)
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    def start(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.run_forever, name="discord-webhook-dispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def run_forever(self):
+        while True:
+            try:
+                close_old_connections()
+                dispatched = self.dispatch_batch()
+            except Exception as e:
+                logger.error(f"Discord webhook dispatch failed: {e}")
+                dispatched = 0
+
+            if not dispatched:
+                self._wake.wait(self.POLL_INTERVAL)
+                self._wake.clear()
+
+    def claim_next(self):
+        """
+        Claims the oldest undelivered event, or returns None when it is not
+        due yet or another process is delivering it.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            event = (
+                DiscordWebhookOutbox.objects.select_for_update()
+                .filter(status__in=[WebHookStatus.PENDING.value, WebHookStatus.PROCESSING.value])
+                .order_by("seq")
+                .first()
+            )
+            if event is None:
+                return None
+            if event.status == WebHookStatus.PROCESSING.value and event.locked_at > now - self.LOCK_TIMEOUT:
+                return None
+            if event.status == WebHookStatus.PENDING.value and event.next_attempt_at > now:
+                return None
+
+            event.status = WebHookStatus.PROCESSING.value
+            event.locked_at = now
+            event.save(update_fields=["status", "locked_at"])
+        return event
+
+    def dispatch_batch(self) -> int:
+        """
+        Delivers up to `BATCH_SIZE` events in order and records the outcome
+        of each, stopping at the first one that has to be retried.
+
+        Returns:
+            int: The number of events attempted.
+        """
+        attempted = 0
+        while attempted < self.BATCH_SIZE and (event := self.claim_next()) is not None:
+            attempted += 1
+            try:
+                error = self.deliver(event)
+            except CircuitOpenError:
+                self.release(event)
+                break
+            if not self.record(event, error):
+                break
+        return attempted
+
+    def release(self, event):
+        """
+        Puts the event back until the circuit breaker lets a trial through,
+        keeping its attempts.
+        """
+        event.status = WebHookStatus.PENDING.value
+        event.locked_at = None
+        event.next_attempt_at = timezone.now() + timedelta(seconds=discord_client.breaker.reset_timeout)
+        event.save(update_fields=["status", "locked_at", "next_attempt_at"])
+
+    def record(self, event, error: str) -> bool:
+        """
+        Stores the outcome of a delivery attempt.
+
+        Returns:
+            bool: False when the event is waiting for a retry.
+        """
+        event.attempts += 1
+        event.locked_at = None
+        if error is None:
+            event.status = WebHookStatus.SENT.value
+            event.sent_at = timezone.now()
+            event.last_error = None
+        elif event.attempts >= self.MAX_ATTEMPTS:
+            event.status = WebHookStatus.FAILED.value
+            event.last_error = error[:500]
+        else:
+            event.status = WebHookStatus.PENDING.value
+            event.next_attempt_at = timezone.now() + self.BACKOFF_BASE * 2 ** (event.attempts - 1)
+            event.last_error = error[:500]
+        event.save(update_fields=["status", "attempts", "locked_at", "sent_at", "next_attempt_at", "last_error"])
+        return event.status != WebHookStatus.PENDING.value
+
+    def deliver(self, event) -> str:
+        """
+        Posts one event to Discord.
+
+        Returns:
+            str: None if delivered, otherwise the error message.
+
+        Raises:
+            CircuitOpenError: Discord was not called, the breaker is open.
+        """
+        try:
+            response = discord_client.post(
+                config("DISCORD_WEBHOOK_LINK"),
+                json={"content": event.content},
+                timeout=self.TIMEOUT,
+            )
+            response.raise_for_status()
+        except CircuitOpenError:
+            raise
+        except requests.RequestException as e:
+            return str(e)
+        return None
+
+
+discord_webhook_dispatcher = DiscordWebhookDispatcher()